@@ -174,6 +174,10 @@ STATICFILES_DIRS = []
 if (BASE_DIR / "static").exists():
     STATICFILES_DIRS.append(BASE_DIR / "static")
 
+# Uploaded files (CV photos are served through the cv_photo view)
+MEDIA_URL = "/media/"
+MEDIA_ROOT = BASE_DIR / "media"
+
 # =========================
 # AUTH REDIRECTS
 # =========================
@@ -5,8 +5,13 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.utils import timezone
 from .models import Profile, PasswordResetToken, CVTemplate, UserCV
+from .cv_search import RESULTS_PER_PAGE, search_available, search_cvs
+from .cv_versions import cv_content
 import csv
+from django.core.exceptions import PermissionDenied
 from django.http import HttpResponse
+from django.template.response import TemplateResponse
+from django.urls import path
 
 
 # Inline Profile in User Admin
@@ -317,9 +322,10 @@ class UserCVAdmin(admin.ModelAdmin):
     view_cv_link.short_description = "Actions"
 
     def formatted_personal_info(self, obj):
-        if obj.personal_info:
+        personal_info = cv_content(obj)["personal_info"]
+        if personal_info:
             html = '<div style="line-height: 1.8;">'
-            for key, value in obj.personal_info.items():
+            for key, value in personal_info.items():
                 html += f'<strong>{key.replace("_", " ").title()}:</strong> {value}<br>'
             html += "</div>"
             return format_html(html)
@@ -328,26 +334,29 @@ class UserCVAdmin(admin.ModelAdmin):
     formatted_personal_info.short_description = "Personal Information"
 
     def formatted_experience(self, obj):
-        if obj.experience:
+        experience = cv_content(obj)["experience"]
+        if experience:
             return format_html(
-                '<pre style="white-space: pre-wrap;">{}</pre>', str(obj.experience)
+                '<pre style="white-space: pre-wrap;">{}</pre>', str(experience)
             )
         return "-"
 
     formatted_experience.short_description = "Experience Details"
 
     def formatted_education(self, obj):
-        if obj.education:
+        education = cv_content(obj)["education"]
+        if education:
             return format_html(
-                '<pre style="white-space: pre-wrap;">{}</pre>', str(obj.education)
+                '<pre style="white-space: pre-wrap;">{}</pre>', str(education)
             )
         return "-"
 
     formatted_education.short_description = "Education Details"
 
     def formatted_skills(self, obj):
-        if obj.skills:
-            skills_list = obj.skills if isinstance(obj.skills, list) else []
+        skills = cv_content(obj)["skills"]
+        if skills:
+            skills_list = skills if isinstance(skills, list) else []
             return format_html("<div>{}</div>", ", ".join(skills_list))
         return "-"
 
@@ -378,6 +387,57 @@ class UserCVAdmin(admin.ModelAdmin):
 
     export_cvs_to_csv.short_description = "Export selected CVs to CSV"
 
+    def get_urls(self):
+        urls = [
+            path(
+                "search/",
+                self.admin_site.admin_view(self.search_view),
+                name="accounts_usercv_search",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def search_view(self, request):
+        """Ranked full-text candidate search (see accounts.cv_search)"""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+
+        query = request.GET.get("q", "").strip()
+        skills_filter = request.GET.get("skills", "").strip()
+        location = request.GET.get("location", "").strip()
+        try:
+            page = max(int(request.GET.get("page", 1)), 1)
+        except ValueError:
+            page = 1
+
+        skills = [skill for skill in skills_filter.split(",") if skill.strip()]
+        # One extra row tells whether there is a next page without a COUNT
+        results = search_cvs(
+            query,
+            skills=skills,
+            location=location,
+            limit=RESULTS_PER_PAGE + 1,
+            offset=(page - 1) * RESULTS_PER_PAGE,
+        )
+        params = request.GET.copy()
+        params.pop("page", None)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Search CVs",
+            "query": query,
+            "skills_filter": skills_filter,
+            "location": location,
+            "searched": bool(query or skills or location),
+            "results": results[:RESULTS_PER_PAGE],
+            "page": page,
+            "has_next": len(results) > RESULTS_PER_PAGE,
+            "page_params": params.urlencode(),
+            "full_text": search_available(),
+        }
+        return TemplateResponse(request, "admin/accounts/usercv/search.html", context)
+
 
 # Customize admin site headers
 admin.site.site_header = "ResuMatch AI Administration"
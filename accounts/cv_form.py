@@ -0,0 +1,155 @@
+"""
+Schema-driven parser for the CV builder form (cv_builder and cv_edit).
+
+Each repeated section is described once in CV_SECTIONS: its output keys,
+the POST column each key comes from, and how values are cleaned. The
+parser walks every section's columns together in one zip pass, runs the
+precompiled template-syntax sanitizer only on values that could contain
+it, enforces the size limits and returns the normalized cv_data.
+"""
+
+import re
+from collections import namedtuple
+from itertools import zip_longest
+
+# Strip Django template syntax from user input (prevent template injection)
+TEMPLATE_SYNTAX_RE = re.compile(r"\{[%#]\s*.*?\s*[%#]\}")
+
+# Form size limits
+MAX_ENTRIES = 100  # per repeated section
+MAX_FIELD_LENGTH = 10000  # characters per field
+
+PERSONAL_FIELDS = ["full_name", "email", "phone", "location", "summary"]
+TEMPLATE_CHOICES = ["classic", "modern"]
+
+# keys/columns: output key -> POST column, the first column drives the row
+# count. clean: strip and sanitize every value. required: key that must be
+# non-blank to keep the row, else any non-empty value keeps it.
+Section = namedtuple("Section", ["name", "keys", "columns", "clean", "required"])
+
+CV_SECTIONS = [
+    Section(
+        "experience",
+        ["title", "company", "location", "start", "end", "description"],
+        [
+            "experience_title",
+            "experience_company",
+            "experience_location",
+            "experience_start",
+            "experience_end",
+            "experience_description",
+        ],
+        clean=True,
+        required=None,
+    ),
+    Section(
+        "education",
+        ["degree", "institution", "location", "start", "end", "details"],
+        [
+            "education_degree",
+            "education_institution",
+            "education_location",
+            "education_start",
+            "education_end",
+            "education_details",
+        ],
+        clean=True,
+        required=None,
+    ),
+    Section(
+        "projects",
+        ["name", "link", "description"],
+        ["project_name", "project_link", "project_description"],
+        clean=False,
+        required="name",
+    ),
+]
+
+
+class CVFormError(ValueError):
+    """The submitted form exceeds the CV size limits."""
+
+
+def clean_text(value):
+    """Strip whitespace and template syntax from one field."""
+    value = value.strip()
+    # The regex only matters for values with a "{%" or "{#" in them
+    if "{%" in value or "{#" in value:
+        value = TEMPLATE_SYNTAX_RE.sub("", value)
+    return value
+
+
+def clean_column(values):
+    """clean_text over a whole column, scanning for template syntax once."""
+    values = list(map(str.strip, values))
+    joined = "\n".join(values)
+    if "{%" in joined or "{#" in joined:
+        values = list(map(clean_text, values))
+    return values
+
+
+def _check_length(value, label):
+    if value and len(value) > MAX_FIELD_LENGTH:
+        raise CVFormError(f"{label} is longer than {MAX_FIELD_LENGTH} characters.")
+
+
+def parse_entries(post, section):
+    """Rows of one repeated section, columns read in a single zip pass."""
+    columns = [post.getlist(column) for column in section.columns]
+    count = len(columns[0])
+    if count > MAX_ENTRIES:
+        raise CVFormError(f"Too many {section.name} entries (at most {MAX_ENTRIES}).")
+    # Extra values in the other columns are ignored, missing ones are blank
+    columns = [column[:count] for column in columns]
+    if max(max(map(len, column), default=0) for column in columns) > MAX_FIELD_LENGTH:
+        raise CVFormError(
+            f"{section.name.title()} fields are limited to "
+            f"{MAX_FIELD_LENGTH} characters."
+        )
+    if section.clean:
+        columns = [clean_column(column) for column in columns]
+
+    keys = section.keys
+    rows = zip_longest(*columns, fillvalue="")
+    if section.required:
+        required = keys.index(section.required)
+        return [dict(zip(keys, row)) for row in rows if row[required].strip()]
+    return [dict(zip(keys, row)) for row in rows if any(row)]
+
+
+def parse_skills(post):
+    skills = []
+    for entry in post.getlist("skills"):
+        _check_length(entry, "Skills")
+        skills.extend(skill.strip() for skill in entry.split(",") if skill.strip())
+    if len(skills) > MAX_ENTRIES:
+        raise CVFormError(f"Too many skills (at most {MAX_ENTRIES}).")
+    return skills
+
+
+def parse_cv_form(post, template_choice="classic", profile_photo=""):
+    """
+    Normalized cv_data from the builder's POST data. `template_choice` is
+    the default when the form has none (an unknown one falls back to
+    classic); the photo upload is handled by the
+    view, which passes the current photo key. Raises CVFormError.
+    """
+    personal_info = {}
+    for field in PERSONAL_FIELDS:
+        value = post.get(field) or ""
+        _check_length(value, field.replace("_", " ").title())
+        personal_info[field] = clean_text(value)
+
+    choice = post.get("template_choice", template_choice)
+    if choice not in TEMPLATE_CHOICES:
+        choice = TEMPLATE_CHOICES[0]
+
+    cv_data = {
+        "personal_info": personal_info,
+        "template_choice": choice,
+        "profile_photo": profile_photo,
+    }
+    for section in CV_SECTIONS:
+        cv_data[section.name] = parse_entries(post, section)
+    cv_data["skills"] = parse_skills(post)
+    return cv_data
@@ -0,0 +1,280 @@
+"""
+Full-text candidate search over the latest version of every CV.
+
+On SQLite the text recruiters search (name, summary, experience titles and
+descriptions, skills, projects, location) is kept in an FTS5 table keyed
+by UserCV id, so a search is one ranked MATCH query over an inverted index
+instead of an icontains scan over JSON columns. Like CVSkill, only the
+newest active version of each CV name is indexed (cv_skills.indexed_versions):
+save_cv_version and cv_versions.reindex_name call index_cv(), and deleting
+a version calls remove_cv(). Skill filters use the CVSkill index
+(accounts.cv_skills).
+
+Other databases, or SQLite builds without FTS5, fall back to a slower
+icontains search with the same filters.
+"""
+
+import re
+from collections import namedtuple
+
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .cv_skills import indexed_versions, normalize_skills
+from .models import CVSkill, UserCV
+
+SEARCH_TABLE = "accounts_cv_search"
+# Indexed columns and their bm25 weights, in table order
+SEARCH_COLUMNS = [
+    ("full_name", 2.0),
+    ("titles", 4.0),
+    ("skills", 4.0),
+    ("summary", 1.5),
+    ("descriptions", 1.0),
+    ("projects", 1.0),
+    ("location", 0.5),
+]
+RESULTS_PER_PAGE = 20
+SNIPPET_TOKENS = 16
+# Private-use markers around snippet matches, swapped for <mark> after escaping
+MATCH_START, MATCH_END = "\ue000", "\ue001"
+
+TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# What search_cvs returns per hit. snippet is safe HTML ("" without text)
+SearchResult = namedtuple("SearchResult", ["cv", "score", "snippet"])
+
+_fts_available = {}
+
+
+def search_available():
+    """True when the database has the FTS5 table (SQLite with FTS5)."""
+    alias = connection.alias
+    if alias not in _fts_available:
+        _fts_available[alias] = (
+            connection.vendor == "sqlite"
+            and SEARCH_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[alias]
+
+
+def _join(values):
+    return "\n".join(str(value) for value in values if value)
+
+
+def search_document(content):
+    """Indexed text of a CV, one string per column of SEARCH_COLUMNS."""
+    personal = content.get("personal_info") or {}
+    experience = [e for e in content.get("experience") or [] if isinstance(e, dict)]
+    projects = [p for p in content.get("projects") or [] if isinstance(p, dict)]
+    skills = content.get("skills") or []
+    return [
+        personal.get("full_name") or "",
+        _join(e.get("title") for e in experience),
+        _join(skills if isinstance(skills, list) else []),
+        personal.get("summary") or "",
+        _join(e.get("description") for e in experience),
+        _join(
+            f"{p.get('name') or ''}\n{p.get('description') or ''}" for p in projects
+        ),
+        _join(
+            [personal.get("location")] + [e.get("location") for e in experience]
+        ),
+    ]
+
+
+def remove_cv(cv_id):
+    if search_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [cv_id])
+
+
+def remove_cv_name(user_id, name, keep=None):
+    """Drop the rows of every version of a CV name except `keep`."""
+    if search_available():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN (SELECT id FROM "
+                f"{UserCV._meta.db_table} WHERE user_id = %s AND name = %s "
+                "AND id != %s)",
+                [user_id, name, keep.pk if keep is not None else 0],
+            )
+
+
+def _insert_sql():
+    columns = ", ".join(name for name, _ in SEARCH_COLUMNS)
+    placeholders = ", ".join(["%s"] * (len(SEARCH_COLUMNS) + 1))
+    return f"INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES ({placeholders})"
+
+
+def index_cv(user_cv, content, replace=None):
+    """
+    (Re)index user_cv from its content dict. `replace` is the version it
+    supersedes, which leaves the index.
+    """
+    if not search_available():
+        return
+    stale = [user_cv.pk] + ([replace.pk] if replace is not None else [])
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN "
+            f"({', '.join(['%s'] * len(stale))})",
+            stale,
+        )
+        cursor.execute(_insert_sql(), [user_cv.pk] + search_document(content))
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def build_match(text="", location=""):
+    """
+    FTS5 MATCH expression for a recruiter's query, or "" if there is none.
+    Words and "quoted phrases" must all match, a trailing * makes a word a
+    prefix, and location matches the location column only. User input is
+    always quoted, so it cannot inject FTS5 syntax.
+    """
+    parts = []
+    for phrase, word in TERM_RE.findall(text or ""):
+        if phrase.strip():
+            parts.append(_phrase(phrase.strip()))
+        elif word:
+            prefix = word.endswith("*")
+            word = word.strip("*")
+            if word:
+                parts.append(_phrase(word) + ("*" if prefix else ""))
+    location = " ".join((location or "").split())
+    if location:
+        parts.append(f"location : {_phrase(location)}")
+    return " AND ".join(parts)
+
+
+def _highlight(snippet):
+    html = escape(snippet)
+    return mark_safe(
+        html.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+    )
+
+
+def _skill_filter(skills):
+    """Subquery SQL and params for CVs having every skill, or ("", [])."""
+    if not skills:
+        return "", []
+    sql = (
+        f"SELECT cv_id FROM {CVSkill._meta.db_table} WHERE skill IN "
+        f"({', '.join(['%s'] * len(skills))}) "
+        "GROUP BY cv_id HAVING COUNT(*) = %s"
+    )
+    return sql, [*skills, len(skills)]
+
+
+def _fts_search(match, skills, limit, offset):
+    weights = ", ".join(str(weight) for _, weight in SEARCH_COLUMNS)
+    cv_table = UserCV._meta.db_table
+    sql = [
+        f"SELECT s.rowid, bm25({SEARCH_TABLE}, {weights}) AS score, "
+        f"snippet({SEARCH_TABLE}, -1, %s, %s, '…', {SNIPPET_TOKENS}) "
+        f"FROM {SEARCH_TABLE} s JOIN {cv_table} cv ON cv.id = s.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH %s AND cv.is_active"
+    ]
+    params = [MATCH_START, MATCH_END, match]
+    skill_sql, skill_params = _skill_filter(skills)
+    if skill_sql:
+        sql.append(f"AND cv.id IN ({skill_sql})")
+        params.extend(skill_params)
+    sql.append("ORDER BY score LIMIT %s OFFSET %s")
+    params.extend([limit, offset])
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        return [(cv_id, -score, _highlight(text)) for cv_id, score, text in cursor]
+
+
+def _fallback_search(text, skills, location, limit, offset):
+    queryset = indexed_versions()
+    for phrase, word in TERM_RE.findall(text or ""):
+        term = (phrase or word).strip().strip("*")
+        if term:
+            queryset = queryset.filter(
+                Q(personal_info__icontains=term)
+                | Q(experience__icontains=term)
+                | Q(skills__icontains=term)
+                | Q(projects__icontains=term)
+            )
+    location = " ".join((location or "").split())
+    if location:
+        queryset = queryset.filter(
+            Q(personal_info__location__icontains=location)
+            | Q(experience__icontains=location)
+        )
+    if skills:
+        queryset = queryset.filter(
+            id__in=CVSkill.objects.filter(skill__in=skills)
+            .values("cv_id")
+            .annotate(matched=Count("id"))
+            .filter(matched=len(skills))
+            .values("cv_id")
+        )
+    cv_ids = queryset.order_by("-updated_at").values_list("id", flat=True)
+    return [(cv_id, None, "") for cv_id in cv_ids[offset : offset + limit]]
+
+
+def search_cvs(text="", skills=(), location="", limit=RESULTS_PER_PAGE, offset=0):
+    """
+    Active indexed CVs matching `text`, having all `skills` and located in
+    `location`, best first. Returns a list of SearchResult.
+    """
+    skills = normalize_skills(list(skills))
+    match = build_match(text, location)
+    if not match and not skills:
+        return []
+    if not search_available():
+        hits = _fallback_search(text, skills, location, limit, offset)
+    elif match:
+        hits = _fts_search(match, skills, limit, offset)
+    else:
+        # Skills only: nothing to rank by, newest CVs first
+        hits = _fallback_search("", skills, "", limit, offset)
+
+    cvs = (
+        UserCV.objects.select_related("user")
+        .only(
+            "id",
+            "name",
+            "version",
+            "updated_at",
+            "personal_info",
+            "user__username",
+            "user__email",
+        )
+        .in_bulk([cv_id for cv_id, _, _ in hits])
+    )
+    return [
+        SearchResult(cvs[cv_id], score, snippet)
+        for cv_id, score, snippet in hits
+        if cv_id in cvs
+    ]
+
+
+def rebuild_index(batch_size=1000):
+    """Re-create every row of the FTS5 table; returns the number indexed."""
+    if not search_available():
+        return 0
+    from .cv_versions import cv_content
+
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        batch = []
+        for user_cv in indexed_versions().iterator():
+            batch.append([user_cv.pk] + search_document(cv_content(user_cv)))
+            if len(batch) >= batch_size:
+                cursor.executemany(_insert_sql(), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(_insert_sql(), batch)
+            count += len(batch)
+    return count
@@ -0,0 +1,119 @@
+"""
+Normalized skill index for reverse matching: which CVs know a skill.
+
+Skills otherwise only live in the UserCV.skills JSON list, so finding the
+candidates for a job meant loading and parsing every CV. CVSkill holds one
+row per normalized skill of the newest active version of each CV name
+(see indexed_versions); it is rewritten by save_cv_version and, when a
+version is deleted or soft-deleted, by cv_versions.reindex_name, so a
+job's required skills are matched with one indexed query.
+"""
+
+from django.db.models import Count, Exists, Max, OuterRef
+
+from .models import CVSkill, UserCV
+
+SKILL_MAX_LENGTH = CVSkill._meta.get_field("skill").max_length
+MATCHING_CVS_LIMIT = 20
+
+
+def normalize_skill(skill):
+    """Matching key for a skill: trimmed, lowercased, single-spaced."""
+    if not isinstance(skill, str):
+        return ""
+    return " ".join(skill.lower().split())[:SKILL_MAX_LENGTH]
+
+
+def normalize_skills(skills):
+    """Distinct non-empty matching keys, in first-seen order."""
+    if not isinstance(skills, list):
+        return []
+    return list(dict.fromkeys(filter(None, map(normalize_skill, skills))))
+
+
+def indexed_versions():
+    """
+    Versions held in CVSkill and the search index: active versions with no
+    newer active version of the same CV name.
+    """
+    newer = UserCV.objects.filter(
+        user=OuterRef("user"),
+        name=OuterRef("name"),
+        is_active=True,
+        version__gt=OuterRef("version"),
+    )
+    return UserCV.objects.filter(is_active=True).exclude(Exists(newer))
+
+
+def index_cv_skills(user_cv, skills, replace=None):
+    """
+    Index `skills` for user_cv. `replace` is the version it supersedes,
+    whose rows are dropped since only one version per CV name is indexed.
+    """
+    stale = [user_cv.pk] + ([replace.pk] if replace is not None else [])
+    CVSkill.objects.filter(cv_id__in=stale).delete()
+    CVSkill.objects.bulk_create(
+        [CVSkill(cv=user_cv, skill=skill) for skill in normalize_skills(skills)]
+    )
+
+
+def remove_cv_name_skills(user_id, name, keep=None):
+    """Drop the rows of every version of a CV name except `keep`."""
+    stale = CVSkill.objects.filter(cv__user_id=user_id, cv__name=name)
+    if keep is not None:
+        stale = stale.exclude(cv=keep)
+    stale.delete()
+
+
+def rebuild_skill_index(batch_size=1000):
+    """Re-create every CVSkill row; returns the number of CVs indexed."""
+    from .cv_versions import cv_content
+
+    CVSkill.objects.all().delete()
+    count = 0
+    batch = []
+    for user_cv in indexed_versions().iterator():
+        skills = normalize_skills(cv_content(user_cv)["skills"])
+        batch.extend(CVSkill(cv=user_cv, skill=skill) for skill in skills)
+        count += 1
+        if len(batch) >= batch_size:
+            CVSkill.objects.bulk_create(batch)
+            batch = []
+    CVSkill.objects.bulk_create(batch)
+    return count
+
+
+def best_matching_cvs(job, limit=MATCHING_CVS_LIMIT):
+    """
+    Active CVs (indexed versions) sharing the most skills with the job's
+    required_skills, best first. Returns (user_cv, matched_skills) pairs.
+    """
+    required = normalize_skills(job.required_skills_list)
+    if not required:
+        return []
+
+    # Rank in the database on the (skill, cv) index, then load the winners
+    ranked = list(
+        CVSkill.objects.filter(skill__in=required, cv__is_active=True)
+        .values("cv_id")
+        .annotate(matched=Count("id"), updated=Max("cv__updated_at"))
+        .order_by("-matched", "-updated", "cv_id")[:limit]
+    )
+    if not ranked:
+        return []
+    cv_ids = [row["cv_id"] for row in ranked]
+
+    matched = {cv_id: [] for cv_id in cv_ids}
+    for cv_id, skill in CVSkill.objects.filter(
+        cv_id__in=cv_ids, skill__in=required
+    ).values_list("cv_id", "skill"):
+        matched[cv_id].append(skill)
+    order = {skill: i for i, skill in enumerate(required)}
+
+    cvs = UserCV.objects.select_related("user").only(
+        "id", "name", "version", "updated_at", "user__username", "user__email"
+    ).in_bulk(cv_ids)
+    return [
+        (cvs[cv_id], sorted(matched[cv_id], key=order.__getitem__))
+        for cv_id in cv_ids
+    ]
@@ -0,0 +1,295 @@
+"""
+Delta-encoded CV version history.
+
+Every save of a CV name appends a UserCV version, but instead of a full
+copy a version normally stores a JSON Patch (accounts.json_patch) against
+the previous version. A full snapshot starts a new chain every
+SNAPSHOT_INTERVAL versions, or sooner when the patch would be nearly as
+large as the CV itself. The latest version of each name (is_latest) also
+keeps its full content, so the usual read is a single row; an older
+version is rebuilt from its snapshot with one query. is_latest marks the
+head of the history even when that version was soft-deleted; only
+save_cv_version and ensure_latest set it.
+
+The version indexed for matching and search (accounts.cv_skills and
+accounts.cv_search) is the newest active one, which differs from the
+latest after the latest is soft-deleted (deactivate_version).
+
+Saves whose content hash matches the latest version are skipped.
+"""
+
+import hashlib
+import json
+
+from django.db import transaction
+
+from .cv_search import index_cv, remove_cv_name
+from .cv_skills import index_cv_skills, remove_cv_name_skills
+from .json_patch import apply_patch, make_patch
+from .models import UserCV
+from .skill_extraction import EXTRACTOR_VERSION, infer_skills
+
+# Fields covered by the deltas; template_choice is kept on every row
+CONTENT_FIELDS = [
+    "personal_info",
+    "experience",
+    "education",
+    "skills",
+    "projects",
+    "profile_photo",
+]
+FIELD_DEFAULTS = {
+    "personal_info": dict,
+    "experience": list,
+    "education": list,
+    "skills": list,
+    "projects": list,
+    "profile_photo": str,
+}
+
+# Longest delta chain (versions after a snapshot) before re-snapshotting
+SNAPSHOT_INTERVAL = 50
+# Store a snapshot when the patch is at least this fraction of the content
+SNAPSHOT_DELTA_RATIO = 0.5
+
+
+def json_size(value):
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+def empty_content():
+    return {field: FIELD_DEFAULTS[field]() for field in CONTENT_FIELDS}
+
+
+def content_from_data(cv_data):
+    """The versioned part of a session-style cv_data dict."""
+    return {
+        field: cv_data.get(field) or FIELD_DEFAULTS[field]()
+        for field in CONTENT_FIELDS
+    }
+
+
+def cv_content_hash(content, template_choice):
+    payload = json.dumps(
+        [content, template_choice or "classic"],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stored_content(user_cv):
+    """Content held on the row itself (complete for snapshots and the latest)."""
+    return {
+        field: getattr(user_cv, field) or FIELD_DEFAULTS[field]()
+        for field in CONTENT_FIELDS
+    }
+
+
+def is_materialized(user_cv):
+    return user_cv.delta is None or user_cv.is_latest
+
+
+def cv_content(user_cv):
+    """Full content of any version."""
+    if is_materialized(user_cv):
+        return stored_content(user_cv)
+
+    rows = (
+        UserCV.objects.filter(
+            user_id=user_cv.user_id,
+            name=user_cv.name,
+            version__gte=user_cv.base_version,
+            version__lte=user_cv.version,
+        )
+        .order_by("version")
+        .values_list("version", "delta", *CONTENT_FIELDS)
+    )
+    content = None
+    expected = user_cv.base_version
+    for version, delta, *fields in rows:
+        if version != expected:
+            raise ValueError(f"CV history is missing version {expected}")
+        if content is None:
+            content = dict(zip(CONTENT_FIELDS, fields))
+            content = {f: v or FIELD_DEFAULTS[f]() for f, v in content.items()}
+        else:
+            content = apply_patch(content, delta)
+        expected += 1
+    if content is None or expected != user_cv.version + 1:
+        raise ValueError(f"CV history is missing version {expected}")
+    return content
+
+
+def cv_data_for(user_cv):
+    """Session-style cv_data dict for a saved version."""
+    content = cv_content(user_cv)
+    content["template_choice"] = user_cv.template_choice or "classic"
+    return content
+
+
+def encode_version(previous_content, previous_base, version, content):
+    """
+    (delta, base_version) for storing `content` as `version` after a version
+    with `previous_content` whose chain starts at `previous_base`; the delta
+    is None when the version should be a full snapshot.
+    """
+    if previous_content is None or version - previous_base >= SNAPSHOT_INTERVAL:
+        return None, version
+    delta = make_patch(previous_content, content)
+    if json_size(delta) >= SNAPSHOT_DELTA_RATIO * json_size(content):
+        return None, version
+    return delta, previous_base
+
+
+def dematerialized_fields(user_cv):
+    """Column updates for a version that stops being the latest."""
+    fields = {"is_latest": False}
+    if user_cv.delta is not None:
+        fields.update(empty_content())
+    return fields
+
+
+def save_cv_version(user, name, cv_data, template=None):
+    """
+    Append cv_data as the next version of the user's CV `name`.
+
+    Returns (user_cv, created). When the content matches the latest version
+    nothing is written and that version is returned with created=False.
+    """
+    content = content_from_data(cv_data)
+    template_choice = cv_data.get("template_choice") or "classic"
+    digest = cv_content_hash(content, template_choice)
+    template_id = template.id if template else None
+    # Outside the row lock; an unchanged save hits the content-hash cache
+    inferred_skills = infer_skills(content, digest)
+
+    with transaction.atomic():
+        latest = (
+            UserCV.objects.select_for_update()
+            .filter(user=user, name=name, is_latest=True)
+            .first()
+        )
+        if (
+            latest
+            and latest.is_active
+            and latest.content_hash == digest
+            and latest.template_id == template_id
+        ):
+            return latest, False
+
+        # The version currently indexed, which the new one replaces
+        indexed = latest
+        if latest and not latest.is_active:
+            indexed = indexed_version(user.id, name)
+
+        version = latest.version + 1 if latest else 1
+        delta, base_version = encode_version(
+            stored_content(latest) if latest else None,
+            latest.base_version if latest else None,
+            version,
+            content,
+        )
+        user_cv = UserCV.objects.create(
+            user=user,
+            template=template,
+            name=name,
+            version=version,
+            template_choice=template_choice,
+            content_hash=digest,
+            delta=delta,
+            base_version=base_version,
+            is_latest=True,
+            inferred_skills=inferred_skills,
+            inferred_skills_version=EXTRACTOR_VERSION,
+            **content,
+        )
+        if latest:
+            # update() rather than save(): the old version's updated_at stays
+            UserCV.objects.filter(pk=latest.pk).update(
+                **dematerialized_fields(latest)
+            )
+        index_cv_skills(user_cv, content["skills"], replace=indexed)
+        index_cv(user_cv, content, replace=indexed)
+    return user_cv, True
+
+
+def indexed_version(user_id, name):
+    """The newest active version of a CV name, which is the one indexed."""
+    return (
+        UserCV.objects.filter(user_id=user_id, name=name, is_active=True)
+        .order_by("-version")
+        .first()
+    )
+
+
+def reindex_name(user_id, name):
+    """
+    Index the newest active version of a CV name and drop the index rows
+    of its other versions, after versions were deleted, soft-deleted or
+    added outside save_cv_version.
+    """
+    newest = indexed_version(user_id, name)
+    remove_cv_name_skills(user_id, name, keep=newest)
+    remove_cv_name(user_id, name, keep=newest)
+    if newest is not None:
+        content = cv_content(newest)
+        index_cv_skills(newest, content["skills"])
+        index_cv(newest, content)
+    return newest
+
+
+def deactivate_version(user_cv):
+    """
+    Soft-delete a version. The history keeps it (later deltas may build on
+    it), but matching and search move to the next newest active version.
+    """
+    with transaction.atomic():
+        user_cv.is_active = False
+        user_cv.save()
+        reindex_name(user_cv.user_id, user_cv.name)
+
+
+def detach_version(user_cv):
+    """
+    Before a version row is deleted, turn the next version into a snapshot
+    if it is a delta against it, so the rest of the history still rebuilds.
+    """
+    following = (
+        UserCV.objects.filter(
+            user_id=user_cv.user_id, name=user_cv.name, version__gt=user_cv.version
+        )
+        .order_by("version")
+        .first()
+    )
+    if following is None or following.delta is None:
+        return
+    content = cv_content(following)
+    with transaction.atomic():
+        UserCV.objects.filter(
+            user_id=user_cv.user_id,
+            name=user_cv.name,
+            base_version=following.base_version,
+            version__gt=following.version,
+        ).update(base_version=following.version)
+        UserCV.objects.filter(pk=following.pk).update(
+            delta=None, base_version=following.version, **content
+        )
+
+
+def ensure_latest(user_id, name):
+    """
+    After deletions (or versions added by hand), make sure the newest
+    remaining version is the materialized latest one.
+    """
+    versions = UserCV.objects.filter(user_id=user_id, name=name)
+    head = versions.order_by("-version").values_list("pk", "is_latest").first()
+    if head is None or head[1]:
+        return
+    newest = versions.get(pk=head[0])
+    content = cv_content(newest)
+    with transaction.atomic():
+        for stale in versions.filter(is_latest=True):
+            UserCV.objects.filter(pk=stale.pk).update(**dematerialized_fields(stale))
+        UserCV.objects.filter(pk=newest.pk).update(is_latest=True, **content)
@@ -0,0 +1,380 @@
+"""
+Server-side store for the CV builder's working copy of cv_data.
+
+The session only holds a draft id. The document lives in CVDraft, stored
+compressed (msgpack + zlib when msgpack is installed, compact JSON + zlib
+otherwise), and is cached in front of the database:
+
+- The cache holds what the database holds: the stored (compressed)
+  payload and the patches not yet folded into it, tagged with the draft's
+  revision. Reads check the revision with a one-column query, then fold
+  the cached patches into the decoded payload, else reload both from the
+  database and refresh the cache. The database stays the source of truth,
+  so a per-process cache can never serve another process's stale draft.
+- Autosave requests send JSON Patch operations (accounts.json_patch). Each
+  accepted patch is appended as one CVDraftChange row and to the cached
+  patch list while only the draft's revision counter is updated, so a
+  keystroke-level save writes in proportion to the edit rather than to
+  the CV. The patch is still validated against the folded document, which
+  costs a decode of the payload, but nothing is re-encoded or compressed
+  until every COMPACT_EVERY changes the folded document is written back
+  and the change log cleared.
+
+A draft lives as long as its session: logging out deletes it, and the
+prune_cv_drafts command deletes drafts of sessions that simply expired.
+"""
+
+import json
+import zlib
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .cv_form import (
+    CV_SECTIONS,
+    MAX_ENTRIES,
+    MAX_FIELD_LENGTH,
+    PERSONAL_FIELDS,
+    TEMPLATE_CHOICES,
+    TEMPLATE_SYNTAX_RE,
+)
+from .json_patch import PatchError, apply_patch
+from .models import CVDraft, CVDraftChange
+
+try:
+    import msgpack
+except ImportError:  # optional, compact JSON is used instead
+    msgpack = None
+
+SESSION_KEY = "cv_draft_id"
+LEGACY_SESSION_KEY = "cv_data"  # whole cv_data, before drafts
+
+CACHE_PREFIX = "cv-draft:"
+CACHE_SECONDS = 24 * 60 * 60
+ZLIB_LEVEL = 6
+
+# Fold the change log into the stored document after this many patches
+COMPACT_EVERY = 50
+MAX_PATCH_OPS = 200
+# Drafts untouched for this long are deleted by prune_cv_drafts
+PRUNE_AFTER_DAYS = 30
+
+# Sections a patch may touch, with their types. profile_photo is only
+# ever set by an upload.
+DRAFT_SECTIONS = {
+    "personal_info": dict,
+    "experience": list,
+    "education": list,
+    "skills": list,
+    "projects": list,
+    "template_choice": str,
+}
+ENTRY_SECTIONS = {"experience", "education", "projects"}
+# Keys allowed in personal_info and in the entries of each entry section
+SECTION_KEYS = {
+    "personal_info": set(PERSONAL_FIELDS),
+    **{section.name: set(section.keys) for section in CV_SECTIONS},
+}
+
+# What views get back: the draft's id, revision, the saved CV it was
+# opened from (or None) and its cv_data
+Draft = namedtuple("Draft", ["id", "revision", "cv_id", "data"])
+
+
+class DraftConflict(Exception):
+    """The client patched an older revision than the draft's current one."""
+
+    def __init__(self, draft):
+        super().__init__(f"Draft is at revision {draft.revision}")
+        self.draft = draft
+
+
+# ---- serialization ----
+
+
+def encode_document(document):
+    """Compressed bytes for a cv_data document, tagged with their codec."""
+    if msgpack is not None:
+        body = msgpack.packb(document, use_bin_type=True)
+        return b"m" + zlib.compress(body, ZLIB_LEVEL)
+    body = json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+    return b"j" + zlib.compress(body.encode("utf-8"), ZLIB_LEVEL)
+
+
+def decode_document(blob):
+    blob = bytes(blob)
+    if not blob:
+        return {}
+    codec, body = blob[:1], zlib.decompress(blob[1:])
+    if codec == b"m":
+        if msgpack is None:
+            raise RuntimeError("CV draft was stored with msgpack; install msgpack")
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
+
+
+# ---- cache ----
+
+
+def _cache_key(draft_id):
+    return f"{CACHE_PREFIX}{draft_id}"
+
+
+def _cache_draft(draft_id, revision, payload, patches):
+    """Cache the stored payload and pending patches once the write commits."""
+    entry = (revision, payload, patches)
+    transaction.on_commit(
+        lambda: cache.set(_cache_key(draft_id), entry, CACHE_SECONDS)
+    )
+
+
+def _cached_draft(draft_id, revision):
+    """(payload, patches) cached for `revision` of the draft, or None."""
+    entry = cache.get(_cache_key(draft_id))
+    if entry is not None and entry[0] == revision:
+        return entry[1], entry[2]
+    return None
+
+
+# ---- reads ----
+
+
+def _stored_draft(draft):
+    """(payload, patches) of a draft as stored in the database."""
+    patches = list(draft.changes.values_list("patch", flat=True))
+    return bytes(draft.payload), patches
+
+
+def _fold(payload, patches):
+    """Decoded payload with the pending patches applied."""
+    document = decode_document(payload)
+    for patch in patches:
+        document = apply_patch(document, patch, in_place=True)
+    return document
+
+
+def load_draft(draft_id, user):
+    """Draft for `draft_id` owned by `user`, or None."""
+    if not draft_id:
+        return None
+    meta = (
+        CVDraft.objects.filter(id=draft_id, user=user)
+        .values_list("revision", "cv_id")
+        .first()
+    )
+    if meta is None:
+        return None
+    revision, cv_id = meta
+    stored = _cached_draft(draft_id, revision)
+    if stored is None:
+        draft = CVDraft.objects.get(id=draft_id)
+        revision, cv_id = draft.revision, draft.cv_id
+        stored = _stored_draft(draft)
+        _cache_draft(draft_id, revision, *stored)
+    return Draft(draft_id, revision, cv_id, _fold(*stored))
+
+
+def session_draft(request):
+    """
+    The session's draft, or None. A session from before drafts existed has
+    its cv_data moved into a new draft on the way.
+    """
+    draft = load_draft(request.session.get(SESSION_KEY), request.user)
+    legacy = request.session.pop(LEGACY_SESSION_KEY, None)
+    if draft is None and legacy:
+        draft = save_session_draft(request, legacy)
+    return draft
+
+
+def session_cv_data(request):
+    """cv_data of the session's draft ({} without one)."""
+    draft = session_draft(request)
+    return draft.data if draft else {}
+
+
+# ---- writes ----
+
+
+def save_session_draft(request, cv_data, cv=None):
+    """Replace the session's draft with cv_data, creating one if needed."""
+    draft_id = request.session.get(SESSION_KEY)
+    cv_id = cv.id if cv else None
+    payload = encode_document(cv_data)
+    with transaction.atomic():
+        draft = None
+        if draft_id:
+            draft = (
+                CVDraft.objects.select_for_update()
+                .filter(id=draft_id, user=request.user)
+                .only("id", "revision")
+                .first()
+            )
+        if draft is None:
+            draft = CVDraft.objects.create(
+                user=request.user, cv_id=cv_id, payload=payload
+            )
+            request.session[SESSION_KEY] = draft.id
+        else:
+            draft.changes.all().delete()
+            draft.revision += 1
+            CVDraft.objects.filter(pk=draft.pk).update(
+                cv_id=cv_id,
+                payload=payload,
+                revision=draft.revision,
+                base_revision=draft.revision,
+                updated_at=timezone.now(),
+            )
+        _cache_draft(draft.id, draft.revision, payload, [])
+    return Draft(draft.id, draft.revision, cv_id, cv_data)
+
+
+def discard_session_draft(request):
+    """Delete the session's draft (and its change log), e.g. on logout."""
+    draft_id = request.session.pop(SESSION_KEY, None)
+    if draft_id and request.user.is_authenticated:
+        CVDraft.objects.filter(id=draft_id, user=request.user).delete()
+        cache.delete(_cache_key(draft_id))
+
+
+def prune_drafts(days=PRUNE_AFTER_DAYS, dry_run=False):
+    """
+    Delete drafts not updated for `days` days, whose sessions are long
+    gone. Returns the number of drafts (that would be) deleted.
+    """
+    stale = CVDraft.objects.filter(updated_at__lt=timezone.now() - timedelta(days))
+    if dry_run:
+        return stale.count()
+    deleted = stale.delete()[1]
+    return deleted.get(CVDraft._meta.label, 0)
+
+
+def clean_value(value):
+    """Strip template syntax from every string in a patch value."""
+    if isinstance(value, str):
+        return TEMPLATE_SYNTAX_RE.sub("", value)
+    if isinstance(value, list):
+        return [clean_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): clean_value(item) for key, item in value.items()}
+    return value
+
+
+def check_patch(patch):
+    """
+    Validate a client patch and clean its values in place. Returns the set
+    of top-level sections it touches.
+    """
+    if not isinstance(patch, list) or not patch:
+        raise PatchError("A patch must be a non-empty list of operations")
+    if len(patch) > MAX_PATCH_OPS:
+        raise PatchError(f"At most {MAX_PATCH_OPS} operations per autosave")
+    sections = set()
+    for op in patch:
+        if not isinstance(op, dict) or op.get("op") not in ("add", "remove", "replace"):
+            raise PatchError(f"Unsupported operation: {op!r}")
+        path = op.get("path")
+        section = ""
+        if isinstance(path, str) and path.startswith("/"):
+            section = path.split("/")[1]
+        if section not in DRAFT_SECTIONS:
+            raise PatchError(f"Path not allowed: {path!r}")
+        if path == f"/{section}" and op["op"] == "remove":
+            raise PatchError(f"Cannot remove {section}")
+        if "value" in op:
+            op["value"] = clean_value(op["value"])
+        sections.add(section)
+    return sections
+
+
+def _check_fields(fields, section):
+    """Known keys with string values (None in older drafts), within limits."""
+    if not set(fields) <= SECTION_KEYS[section]:
+        raise PatchError(f"Unknown {section} field")
+    _check_strings(fields.values(), section)
+
+
+def _check_strings(values, section):
+    for value in values:
+        if value is not None and not isinstance(value, str):
+            raise PatchError(f"{section} values must be strings")
+        if value and len(value) > MAX_FIELD_LENGTH:
+            raise PatchError(
+                f"{section} fields are limited to {MAX_FIELD_LENGTH} characters"
+            )
+
+
+def check_sections(document, sections):
+    """
+    The touched sections must keep the shape the templates expect and stay
+    within the builder form's limits (accounts.cv_form).
+    """
+    for section in sections:
+        value = document.get(section)
+        if not isinstance(value, DRAFT_SECTIONS[section]):
+            raise PatchError(f"{section} has the wrong type")
+        if isinstance(value, list) and len(value) > MAX_ENTRIES:
+            raise PatchError(f"Too many {section} entries (at most {MAX_ENTRIES})")
+        if section == "personal_info":
+            _check_fields(value, section)
+        elif section in ENTRY_SECTIONS:
+            if not all(isinstance(e, dict) for e in value):
+                raise PatchError(f"{section} entries must be objects")
+            for entry in value:
+                _check_fields(entry, section)
+        elif section == "skills":
+            if not all(isinstance(s, str) for s in value):
+                raise PatchError("skills must be strings")
+            _check_strings(value, section)
+        elif value not in TEMPLATE_CHOICES:
+            raise PatchError(f"Unknown template: {value!r}")
+
+
+def autosave(user, draft_id, revision, patch):
+    """
+    Apply a client patch made against `revision` of the draft and return
+    the new revision. Raises CVDraft.DoesNotExist, DraftConflict or
+    PatchError.
+    """
+    sections = check_patch(patch)
+    with transaction.atomic():
+        # Lock the row without reading the stored document
+        draft = (
+            CVDraft.objects.select_for_update()
+            .only("id", "revision", "base_revision")
+            .get(id=draft_id, user=user)
+        )
+        if revision != draft.revision:
+            raise DraftConflict(load_draft(draft_id, user))
+
+        # Validate against the current document before anything is stored
+        stored = _cached_draft(draft.id, draft.revision)
+        if stored is None:
+            stored = _stored_draft(draft)
+        payload, patches = stored
+        document = _fold(payload, patches)
+        apply_patch(document, patch, in_place=True)
+        check_sections(document, sections)
+
+        new_revision = draft.revision + 1
+        if new_revision - draft.base_revision >= COMPACT_EVERY:
+            payload, patches = encode_document(document), []
+            draft.changes.all().delete()
+            CVDraft.objects.filter(pk=draft.pk).update(
+                payload=payload,
+                revision=new_revision,
+                base_revision=new_revision,
+                updated_at=timezone.now(),
+            )
+        else:
+            patches = patches + [patch]
+            CVDraftChange.objects.create(
+                draft=draft, revision=new_revision, patch=patch
+            )
+            CVDraft.objects.filter(pk=draft.pk).update(
+                revision=new_revision, updated_at=timezone.now()
+            )
+        _cache_draft(draft.id, new_revision, payload, patches)
+    return new_revision
@@ -0,0 +1,137 @@
+"""
+Minimal JSON Patch (RFC 6902) support for CV documents.
+
+make_patch() produces the add/remove/replace operations that turn one JSON
+document into another, descending into dicts and lists so an edit to one
+experience entry costs one small operation instead of a copy of the CV.
+apply_patch() applies such a list to a document and returns the result.
+"""
+
+import copy
+
+
+class PatchError(ValueError):
+    """The patch is malformed or does not apply to the document."""
+
+
+def _escape(token):
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_patch(old, new, path=""):
+    """List of operations that turn `old` into `new`."""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            ops.extend(make_patch(old[i], new[i], f"{path}/{i}"))
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+        return ops
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def _split(path):
+    if path == "":
+        return []
+    if not path.startswith("/"):
+        raise PatchError(f"Invalid path: {path!r}")
+    return [_unescape(token) for token in path[1:].split("/")]
+
+
+def _list_index(container, token, allow_end=False):
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != "0" and token.startswith("0")):
+        raise PatchError(f"Invalid list index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise PatchError(f"List index out of range: {index}")
+    return index
+
+
+def _resolve(doc, tokens):
+    for token in tokens:
+        if isinstance(doc, dict):
+            if token not in doc:
+                raise PatchError(f"Missing key: {token!r}")
+            doc = doc[token]
+        elif isinstance(doc, list):
+            doc = doc[_list_index(doc, token)]
+        else:
+            raise PatchError(f"Cannot descend into {type(doc).__name__}")
+    return doc
+
+
+def apply_patch(doc, patch, in_place=False):
+    """
+    Return `doc` with the operations in `patch` applied. Works on a copy
+    unless in_place=True; an in-place patch that raises PatchError may
+    leave `doc` partly modified.
+    """
+    if not isinstance(patch, list):
+        raise PatchError("A patch must be a list of operations")
+    if not in_place:
+        doc = copy.deepcopy(doc)
+    for op in patch:
+        if not isinstance(op, dict) or "path" not in op:
+            raise PatchError(f"Invalid operation: {op!r}")
+        kind = op.get("op")
+        tokens = _split(op["path"])
+        if kind in ("add", "replace") and "value" not in op:
+            raise PatchError(f"Operation {kind!r} needs a value")
+        if not tokens:
+            if kind in ("add", "replace"):
+                doc = copy.deepcopy(op["value"])
+                continue
+            raise PatchError(f"Cannot {kind} the whole document")
+
+        parent = _resolve(doc, tokens[:-1])
+        last = tokens[-1]
+        if isinstance(parent, dict):
+            if kind == "add":
+                parent[last] = copy.deepcopy(op["value"])
+            elif kind in ("remove", "replace"):
+                if last not in parent:
+                    raise PatchError(f"Missing key: {last!r}")
+                if kind == "remove":
+                    del parent[last]
+                else:
+                    parent[last] = copy.deepcopy(op["value"])
+            else:
+                raise PatchError(f"Unsupported operation: {kind!r}")
+        elif isinstance(parent, list):
+            if kind == "add":
+                index = _list_index(parent, last, allow_end=True)
+                parent.insert(index, copy.deepcopy(op["value"]))
+            elif kind == "remove":
+                del parent[_list_index(parent, last)]
+            elif kind == "replace":
+                parent[_list_index(parent, last)] = copy.deepcopy(op["value"])
+            else:
+                raise PatchError(f"Unsupported operation: {kind!r}")
+        else:
+            raise PatchError(f"Cannot patch into {type(parent).__name__}")
+    return doc
@@ -0,0 +1,93 @@
+"""
+Management command to re-encode saved CV versions as snapshots plus deltas
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.cv_versions import (
+    empty_content,
+    encode_version,
+    json_size,
+    stored_content,
+)
+from accounts.json_patch import apply_patch
+from accounts.models import UserCV
+
+
+class Command(BaseCommand):
+    help = "Store CV version history as periodic snapshots plus JSON deltas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the storage saving without rewriting any version",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        names = (
+            UserCV.objects.values_list("user_id", "name")
+            .order_by("user_id", "name")
+            .distinct()
+        )
+
+        before = after = rewritten = 0
+        for user_id, name in names.iterator():
+            with transaction.atomic():
+                sizes, updates = self.compact(user_id, name)
+                if not dry_run:
+                    for pk, fields in updates:
+                        UserCV.objects.filter(pk=pk).update(**fields)
+            before += sizes[0]
+            after += sizes[1]
+            rewritten += len(updates)
+
+        saved = (1 - after / before) * 100 if before else 0.0
+        summary = (
+            f"{rewritten} version(s) re-encoded; CV content "
+            f"{before / 1024:.1f} KB -> {after / 1024:.1f} KB ({saved:.0f}% smaller)"
+        )
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f"DRY RUN: {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
+
+    def compact(self, user_id, name):
+        """((bytes before, bytes after), [(pk, column updates)]) for one CV name."""
+        versions = (
+            UserCV.objects.select_for_update()
+            .filter(user_id=user_id, name=name)
+            .order_by("version")
+        )
+        before = after = 0
+        updates = []
+        content = previous_base = previous_version = None
+        for cv in versions:
+            previous = content
+            if previous_version is not None and cv.version != previous_version + 1:
+                # A deleted version left a gap: start a new chain here
+                previous = None
+            previous_version = cv.version
+            if cv.delta is None:
+                content = stored_content(cv)
+            else:
+                content = apply_patch(content, cv.delta)
+            keeps_content = cv.delta is None or cv.is_latest
+            before += json_size(cv.delta) if cv.delta is not None else 0
+            before += json_size(stored_content(cv)) if keeps_content else 0
+
+            delta, base_version = encode_version(
+                previous, previous_base, cv.version, content
+            )
+            previous_base = base_version
+            keeps_content = delta is None or cv.is_latest
+            after += json_size(delta) if delta is not None else 0
+            after += json_size(content) if keeps_content else 0
+
+            if delta != cv.delta or base_version != cv.base_version:
+                fields = {"delta": delta, "base_version": base_version}
+                fields.update(content if keeps_content else empty_content())
+                updates.append((cv.pk, fields))
+        return (before, after), updates
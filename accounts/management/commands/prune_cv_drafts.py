@@ -0,0 +1,33 @@
+"""
+Management command to delete CV builder drafts of expired sessions
+"""
+
+from django.core.management.base import BaseCommand
+
+from accounts.drafts import PRUNE_AFTER_DAYS, prune_drafts
+
+
+class Command(BaseCommand):
+    help = "Delete CV drafts (and their autosaved changes) not updated for N days"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=PRUNE_AFTER_DAYS,
+            help="Delete drafts not updated for this many days",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the drafts that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        days = max(1, options["days"])
+        count = prune_drafts(days=days, dry_run=options["dry_run"])
+        summary = f"{count} CV draft(s) older than {days} day(s)"
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"DRY RUN: would delete {summary}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {summary}"))
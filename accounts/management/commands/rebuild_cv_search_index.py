@@ -0,0 +1,30 @@
+"""
+Management command to rebuild the full-text CV search and skill indexes
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.cv_search import rebuild_index, search_available
+from accounts.cv_skills import rebuild_skill_index
+
+
+class Command(BaseCommand):
+    help = "Re-index the newest active version of every CV for candidate search"
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_skill_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed skills of {count} CV(s)"))
+
+        if not search_available():
+            self.stdout.write(
+                self.style.WARNING(
+                    "This database has no FTS5 search index; searches use "
+                    "icontains queries instead."
+                )
+            )
+            return
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} CV(s)"))
@@ -71,9 +71,11 @@ class AuthenticationNavigationMiddleware:
 
         # Add navigation headers to prevent back button issues
         if response.status_code == 200:
-            response["Cache-Control"] = "no-cache, no-store, must-revalidate"
-            response["Pragma"] = "no-cache"
-            response["Expires"] = "0"
+            # Views with their own caching policy (e.g. CV photos) keep it
+            if not response.has_header("Cache-Control"):
+                response["Cache-Control"] = "no-cache, no-store, must-revalidate"
+                response["Pragma"] = "no-cache"
+                response["Expires"] = "0"
 
             # Add custom header to indicate authentication state
             response["X-Auth-Status"] = (
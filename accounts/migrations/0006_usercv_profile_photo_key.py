@@ -0,0 +1,68 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:52
+
+import base64
+import hashlib
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+DATA_URI_RE = re.compile(r"^data:(?P<mime>[\w/+.-]+)?;base64,(?P<data>.*)$", re.S)
+PHOTO_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/bmp": "bmp",
+}
+
+
+def move_photos_to_storage(apps, schema_editor):
+    """Replace base64 data: URIs with content-hash keys (same layout as accounts.photos)."""
+    UserCV = apps.get_model("accounts", "UserCV")
+    # Versions copy the same photo, so remember the last one converted
+    last_value, last_key = None, ""
+    cv_ids = list(
+        UserCV.objects.exclude(profile_photo="").values_list("id", flat=True)
+    )
+    for cv_id in cv_ids:
+        value = UserCV.objects.values_list("profile_photo", flat=True).get(id=cv_id)
+        if value == last_value:
+            key = last_key
+        else:
+            key = ""
+            match = DATA_URI_RE.match(value)
+            if match:
+                try:
+                    data = base64.b64decode(match.group("data"))
+                except (ValueError, TypeError):
+                    data = None
+                if data:
+                    mime = (match.group("mime") or "").lower()
+                    extension = PHOTO_EXTENSIONS.get(mime, "png")
+                    key = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+                    path = f"cv_photos/{key[:2]}/{key}"
+                    if not default_storage.exists(path):
+                        default_storage.save(path, ContentFile(data))
+            elif len(value) <= 80:
+                key = value  # already a key
+            last_value, last_key = value, key
+        UserCV.objects.filter(id=cv_id).update(profile_photo=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_alter_usercv_options_usercv_is_active_usercv_name_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_photos_to_storage, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='usercv',
+            name='profile_photo',
+            field=models.CharField(blank=True, max_length=80),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:22
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+# Same fields and hash as accounts.cv_versions
+CONTENT_FIELDS = [
+    "personal_info",
+    "experience",
+    "education",
+    "skills",
+    "projects",
+    "profile_photo",
+]
+FIELD_DEFAULTS = {
+    "personal_info": dict,
+    "experience": list,
+    "education": list,
+    "skills": list,
+    "projects": list,
+    "profile_photo": str,
+}
+
+
+def index_versions(apps, schema_editor):
+    """
+    Existing versions all hold full copies: record each as its own snapshot,
+    hash its content and flag the newest version of every CV name. The
+    compact_cv_versions command re-encodes this history as deltas.
+    """
+    UserCV = apps.get_model("accounts", "UserCV")
+    newest = {}
+    for cv_id, user_id, name, version in UserCV.objects.values_list(
+        "id", "user_id", "name", "version"
+    ):
+        key = (user_id, name)
+        if key not in newest or version > newest[key][1]:
+            newest[key] = (cv_id, version)
+    latest_ids = {cv_id for cv_id, _ in newest.values()}
+    index_fields = ["content_hash", "base_version", "is_latest"]
+
+    batch = []
+    rows = UserCV.objects.only("id", "version", "template_choice", *CONTENT_FIELDS)
+    for cv in rows.iterator():
+        content = {
+            field: getattr(cv, field) or FIELD_DEFAULTS[field]()
+            for field in CONTENT_FIELDS
+        }
+        payload = json.dumps(
+            [content, cv.template_choice or "classic"],
+            sort_keys=True,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        cv.content_hash = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        cv.base_version = cv.version
+        cv.is_latest = cv.id in latest_ids
+        batch.append(cv)
+        if len(batch) >= 500:
+            UserCV.objects.bulk_update(batch, index_fields)
+            batch = []
+    if batch:
+        UserCV.objects.bulk_update(batch, index_fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_usercv_profile_photo_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercv',
+            name='base_version',
+            field=models.IntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='usercv',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='usercv',
+            name='delta',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='usercv',
+            name='is_latest',
+            field=models.BooleanField(db_index=True, default=True),
+        ),
+        migrations.RunPython(index_versions, migrations.RunPython.noop),
+    ]
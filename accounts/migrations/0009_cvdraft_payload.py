@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:33
+
+import json
+import zlib
+
+from django.db import migrations, models
+
+
+def compress_drafts(apps, schema_editor):
+    """Store each draft's JSON document compressed (the JSON codec of accounts.drafts)."""
+    CVDraft = apps.get_model("accounts", "CVDraft")
+    for draft in CVDraft.objects.only("id", "data").iterator():
+        body = json.dumps(draft.data, ensure_ascii=False, separators=(",", ":"))
+        payload = b"j" + zlib.compress(body.encode("utf-8"), 6)
+        CVDraft.objects.filter(id=draft.id).update(payload=payload)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_cvdraft'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cvdraft',
+            name='payload',
+            field=models.BinaryField(default=bytes),
+        ),
+        migrations.RunPython(compress_drafts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='cvdraft',
+            name='data',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SKILL_MAX_LENGTH = 100
+
+
+def index_skills(apps, schema_editor):
+    """Index the skills of the latest version of every CV name."""
+    UserCV = apps.get_model("accounts", "UserCV")
+    CVSkill = apps.get_model("accounts", "CVSkill")
+    batch = []
+    rows = UserCV.objects.filter(is_latest=True).values_list("id", "skills")
+    for cv_id, skills in rows.iterator():
+        if not isinstance(skills, list):
+            continue
+        # Same normalization as accounts.cv_skills.normalize_skill
+        keys = (
+            " ".join(skill.lower().split())[:SKILL_MAX_LENGTH]
+            for skill in skills
+            if isinstance(skill, str)
+        )
+        batch.extend(
+            CVSkill(cv_id=cv_id, skill=key) for key in dict.fromkeys(keys) if key
+        )
+        if len(batch) >= 1000:
+            CVSkill.objects.bulk_create(batch)
+            batch = []
+    CVSkill.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_cvdraft_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CVSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('cv', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_index', to='accounts.usercv')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'cv'], name='accounts_cv_skill_34500c_idx')],
+                'unique_together': {('cv', 'skill')},
+            },
+        ),
+        migrations.RunPython(index_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,89 @@
+from django.db import migrations, OperationalError
+
+# Same table and columns as accounts.cv_search
+SEARCH_TABLE = "accounts_cv_search"
+SEARCH_COLUMNS = [
+    "full_name",
+    "titles",
+    "skills",
+    "summary",
+    "descriptions",
+    "projects",
+    "location",
+]
+
+
+def _join(values):
+    return "\n".join(str(value) for value in values if value)
+
+
+def search_document(cv):
+    personal = cv.personal_info if isinstance(cv.personal_info, dict) else {}
+    experience = [e for e in cv.experience or [] if isinstance(e, dict)]
+    projects = [p for p in cv.projects or [] if isinstance(p, dict)]
+    skills = cv.skills if isinstance(cv.skills, list) else []
+    return [
+        personal.get("full_name") or "",
+        _join(e.get("title") for e in experience),
+        _join(skills),
+        personal.get("summary") or "",
+        _join(e.get("description") for e in experience),
+        _join(
+            f"{p.get('name') or ''}\n{p.get('description') or ''}" for p in projects
+        ),
+        _join(
+            [personal.get("location")] + [e.get("location") for e in experience]
+        ),
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    """
+    FTS5 table over the latest version of every CV. Only on SQLite, and
+    only if it was built with FTS5; otherwise accounts.cv_search falls
+    back to icontains queries.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    UserCV = apps.get_model("accounts", "UserCV")
+    columns = ", ".join(SEARCH_COLUMNS)
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                f"{columns}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+        except OperationalError:
+            return  # SQLite without FTS5
+        insert = (
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {columns}) VALUES "
+            f"({', '.join(['%s'] * (len(SEARCH_COLUMNS) + 1))})"
+        )
+        rows = UserCV.objects.filter(is_latest=True).only(
+            "id", "personal_info", "experience", "skills", "projects"
+        )
+        batch = []
+        for cv in rows.iterator():
+            batch.append([cv.id] + search_document(cv))
+            if len(batch) >= 1000:
+                cursor.executemany(insert, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert, batch)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0010_cvskill"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
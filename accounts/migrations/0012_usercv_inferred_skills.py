@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_cv_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usercv',
+            name='inferred_skills',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='usercv',
+            name='inferred_skills_version',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 11:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0012_usercv_inferred_skills'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usercv',
+            name='is_latest',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.db import models
 from django.contrib.auth.models import User
@@ -73,8 +74,22 @@ class UserCV(models.Model):
     education = models.JSONField(default=list)
     skills = models.JSONField(default=list)
     projects = models.JSONField(default=list)
-    profile_photo = models.TextField(blank=True)  # Base64 encoded image
+    # Content-hash key of the photo in storage (see accounts.photos)
+    profile_photo = models.CharField(max_length=80, blank=True)
     template_choice = models.CharField(max_length=20, default="classic")
+    # Version storage (see accounts.cv_versions): a version is either a full
+    # snapshot (delta is None) or a JSON Patch against the previous version.
+    # The content fields above are only filled for snapshots and for the
+    # latest version of each CV name.
+    content_hash = models.CharField(max_length=64, blank=True)
+    delta = models.JSONField(null=True, blank=True)
+    base_version = models.IntegerField(default=1)  # snapshot this version builds on
+    # Set by accounts.cv_versions only; rows added elsewhere start as history
+    is_latest = models.BooleanField(default=False, db_index=True)
+    # Skills found in the free-text sections but not in `skills`, extracted
+    # once per version (see accounts.skill_extraction)
+    inferred_skills = models.JSONField(default=list, blank=True)
+    inferred_skills_version = models.CharField(max_length=16, blank=True)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -94,3 +109,97 @@ class UserCV(models.Model):
             )["max_version"]
             or 0
         )
+
+
+class CVSkill(models.Model):
+    """
+    One normalized skill of the newest active version of a CV, for reverse
+    matching (see accounts.cv_skills).
+    """
+
+    cv = models.ForeignKey(UserCV, on_delete=models.CASCADE, related_name="skill_index")
+    skill = models.CharField(max_length=100)
+
+    class Meta:
+        unique_together = ["cv", "skill"]
+        indexes = [models.Index(fields=["skill", "cv"])]
+
+    def __str__(self):
+        return f"{self.skill} (CV {self.cv_id})"
+
+
+class CVDraft(models.Model):
+    """The CV builder's working copy of cv_data (see accounts.drafts)."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Saved version being edited, if the draft was opened from one
+    cv = models.ForeignKey(UserCV, on_delete=models.SET_NULL, null=True, blank=True)
+    # Compressed cv_data as of base_revision (see accounts.drafts)
+    payload = models.BinaryField(default=bytes)
+    base_revision = models.IntegerField(default=0)
+    revision = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username}'s CV draft (rev {self.revision})"
+
+
+class CVDraftChange(models.Model):
+    """One autosaved JSON Patch, not yet folded into CVDraft.payload."""
+
+    draft = models.ForeignKey(CVDraft, on_delete=models.CASCADE, related_name="changes")
+    revision = models.IntegerField()
+    patch = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["revision"]
+        unique_together = ["draft", "revision"]
+
+
+@receiver(pre_delete, sender=UserCV)
+def detach_cv_version(sender, instance, **kwargs):
+    # Later versions may be stored as deltas against this one
+    from .cv_versions import detach_version
+
+    detach_version(instance)
+
+
+@receiver(post_save, sender=UserCV)
+def adopt_cv_version(sender, instance, created, **kwargs):
+    # save_cv_version creates rows as the latest and indexes them itself;
+    # rows added elsewhere (admin, shell) are fitted into the history here
+    if not created or instance.is_latest:
+        return
+    from .cv_versions import ensure_latest, reindex_name
+
+    ensure_latest(instance.user_id, instance.name)
+    reindex_name(instance.user_id, instance.name)
+
+
+@receiver(post_delete, sender=UserCV)
+def keep_latest_cv_version(sender, instance, **kwargs):
+    from .cv_search import remove_cv
+    from .cv_versions import ensure_latest, reindex_name
+
+    remove_cv(instance.pk)
+    ensure_latest(instance.user_id, instance.name)
+    # Only the newest active version is indexed
+    newer = UserCV.objects.filter(
+        user_id=instance.user_id,
+        name=instance.name,
+        is_active=True,
+        version__gt=instance.version,
+    )
+    if instance.is_active and not newer.exists():
+        reindex_name(instance.user_id, instance.name)
+
+
+@receiver(user_logged_out)
+def discard_cv_draft(sender, request, user, **kwargs):
+    # The draft belongs to the session that is ending
+    from .drafts import discard_session_draft
+
+    if request is not None:
+        discard_session_draft(request)
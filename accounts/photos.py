@@ -0,0 +1,262 @@
+"""
+Content-addressed storage for CV profile photos.
+
+Uploads are written once through Django's default storage under the
+SHA-256 of their bytes. UserCV rows and the session only keep the key
+("<sha256>.<ext>"), so identical photos shared by CV versions or users
+are stored a single time.
+
+Pages use resized variants rather than the upload: each photo is
+decoded, oriented, downsized and recompressed into the sizes the
+templates display (PREVIEW_SIZE for HTML, PDF_SIZE for WeasyPrint),
+cached in storage next to the original under the same hash. Large
+uploads are resized on a background thread so the request returns
+immediately.
+"""
+
+import base64
+import hashlib
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+PHOTO_DIR = "cv_photos"
+
+# Longest side in pixels of the resized variants
+PREVIEW_SIZE = 300
+PDF_SIZE = 600
+PHOTO_SIZES = (PREVIEW_SIZE, PDF_SIZE)
+VARIANT_QUALITY = 85
+
+# Uploads larger than this are resized off the request thread
+BACKGROUND_RESIZE_BYTES = 512 * 1024
+VARIANT_WAIT_SECONDS = 15
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cv-photo")
+_pending = {}  # key -> Future of render_variants
+_pending_lock = threading.Lock()
+
+# Pillow format of the decoded bytes -> key extension, extension -> MIME
+PHOTO_EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "GIF": "gif",
+    "WEBP": "webp",
+    "BMP": "bmp",
+}
+CONTENT_TYPES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "bmp": "image/bmp",
+}
+
+PHOTO_KEY_RE = re.compile(r"^[0-9a-f]{64}\.(?:jpg|png|gif|webp|bmp)$")
+DATA_URI_RE = re.compile(r"^data:(?P<mime>[\w/+.-]+)?;base64,(?P<data>.*)$", re.S)
+
+
+def is_photo_key(value):
+    return bool(value) and PHOTO_KEY_RE.match(value) is not None
+
+
+def photo_path(key):
+    """Storage path of a photo; fanned out by hash prefix."""
+    return f"{PHOTO_DIR}/{key[:2]}/{key}"
+
+
+def photo_extension(data):
+    """
+    Key extension for photo bytes, from the format Pillow detects in them
+    rather than what the client claimed. None if it is not a supported
+    image.
+    """
+    try:
+        image_format = Image.open(BytesIO(data)).format
+    except Exception:
+        return None
+    return PHOTO_EXTENSIONS.get(image_format)
+
+
+def store_photo(data, extension=None):
+    """
+    Save photo bytes (once) and return their key. Without an extension it
+    is detected from the bytes; undecodable ones are stored as PNG, like
+    the old data: URIs.
+    """
+    extension = extension or photo_extension(data) or "png"
+    key = f"{hashlib.sha256(data).hexdigest()}.{extension}"
+    path = photo_path(key)
+    if not default_storage.exists(path):
+        default_storage.save(path, ContentFile(data))
+    return key
+
+
+def store_uploaded_photo(uploaded_file):
+    """
+    Store an UploadedFile from request.FILES, start its variants and
+    return its key. Raises ValueError if the file is not an image.
+    """
+    data = uploaded_file.read()
+    try:
+        # Header-only check; the full decode happens in render_variants
+        image = Image.open(BytesIO(data))
+        extension = PHOTO_EXTENSIONS.get(image.format)
+        image.verify()
+    except Exception as e:
+        raise ValueError("Uploaded file is not a supported image") from e
+    if extension is None:
+        raise ValueError("Uploaded file is not a supported image")
+    key = store_photo(data, extension)
+    if len(data) > BACKGROUND_RESIZE_BYTES:
+        schedule_variants(key)
+    else:
+        render_variants(key)
+    return key
+
+
+def variant_path(key, size):
+    stem = key.rsplit(".", 1)[0]
+    return f"{PHOTO_DIR}/variants/{stem[:2]}/{stem}_{size}.jpg"
+
+
+def render_variants(key):
+    """
+    Decode, orient, downsize and recompress a stored photo into every size
+    in PHOTO_SIZES that is not cached yet. Returns False if the photo
+    could not be decoded.
+    """
+    missing = [
+        size
+        for size in PHOTO_SIZES
+        if not default_storage.exists(variant_path(key, size))
+    ]
+    if not missing:
+        return True
+    try:
+        with open_photo(key) as f:
+            image = Image.open(f)
+            # JPEG can decode at a reduced scale directly, much faster
+            image.draft("RGB", (max(missing), max(missing)))
+            image = ImageOps.exif_transpose(image)
+            image.load()
+    except Exception as e:
+        logger.warning("Could not decode CV photo %s: %s", key, e)
+        return False
+
+    # JPEG has no alpha channel: flatten transparent images onto white
+    if image.mode in ("RGBA", "LA") or "transparency" in image.info:
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, "white")
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    else:
+        image = image.convert("RGB")
+
+    for size in sorted(missing, reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(
+            buffer, "JPEG", quality=VARIANT_QUALITY, optimize=True, progressive=True
+        )
+        path = variant_path(key, size)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(buffer.getvalue()))
+    return True
+
+
+def schedule_variants(key):
+    """Render the variants on the background pool (once per key at a time)."""
+    with _pending_lock:
+        if key in _pending:
+            return _pending[key]
+        future = _executor.submit(render_variants, key)
+        _pending[key] = future
+
+    def forget(_):
+        with _pending_lock:
+            _pending.pop(key, None)
+
+    future.add_done_callback(forget)
+    return future
+
+
+def photo_variant_path(key, size):
+    """
+    Storage path of a resized variant, rendering it if needed (waiting for
+    a background render in progress). None if the photo can't be decoded.
+    """
+    path = variant_path(key, size)
+    if default_storage.exists(path):
+        return path
+    with _pending_lock:
+        future = _pending.get(key)
+    try:
+        ok = future.result(timeout=VARIANT_WAIT_SECONDS) if future else False
+    except Exception:
+        ok = False
+    if not ok:
+        ok = render_variants(key)
+    return path if ok else None
+
+
+def photo_key_from_value(value):
+    """
+    Normalize a stored profile_photo value to a key. Legacy base64 data:
+    URIs (old rows and sessions) are moved into storage on the way.
+    """
+    if not value:
+        return ""
+    if is_photo_key(value):
+        return value
+    match = DATA_URI_RE.match(value)
+    if match:
+        try:
+            data = base64.b64decode(match.group("data"))
+        except (ValueError, TypeError):
+            return ""
+        return store_photo(data)
+    return ""
+
+
+def open_photo(key):
+    return default_storage.open(photo_path(key), "rb")
+
+
+def photo_url(key, size=PREVIEW_SIZE):
+    if not is_photo_key(key):
+        return ""
+    return f"{reverse('cv_photo', args=[key])}?size={size}"
+
+
+def photo_data_uri(key, size=PDF_SIZE):
+    """Inline data: URI for renderers that cannot fetch URLs (PDF export)."""
+    if not is_photo_key(key):
+        return ""
+    path = photo_variant_path(key, size)
+    try:
+        with default_storage.open(path or photo_path(key), "rb") as f:
+            encoded = base64.b64encode(f.read()).decode("ascii")
+    except OSError:
+        return ""
+    content_type = "image/jpeg" if path else CONTENT_TYPES[key.rsplit(".", 1)[1]]
+    return f"data:{content_type};base64,{encoded}"
+
+
+def with_photo_src(cv_data, inline=False):
+    """
+    Copy of cv_data whose profile_photo is usable as an <img src>: the
+    preview-size photo URL, or an inline PDF-size data: URI when inline=True.
+    """
+    key = photo_key_from_value(cv_data.get("profile_photo"))
+    src = photo_data_uri(key) if inline else photo_url(key)
+    return {**cv_data, "profile_photo": src}
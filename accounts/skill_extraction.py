@@ -0,0 +1,241 @@
+"""
+Skills inferred from a CV's free text (summary, experience, education
+details and projects), on top of the comma-separated skills field.
+
+The whole vocabulary is compiled into one prefix-factored pattern, so a
+CV is scanned in a single regex pass with word boundaries that substring
+checks lack ("java" is not found in "javascript", nor "go" in "good").
+Extraction runs once per saved version: save_cv_version stores the result
+on the UserCV row together with EXTRACTOR_VERSION, and results are also
+cached by content hash, so identical content is never re-scanned.
+job_recommendations reads the stored result.
+"""
+
+import re
+
+from django.core.cache import cache
+
+from .models import UserCV
+
+# Bump whenever SKILL_ALIASES or the matching rules change, so stored
+# inferred skills are recomputed.
+EXTRACTOR_VERSION = "2"
+CACHE_PREFIX = "cv-skills:"
+CACHE_SECONDS = 7 * 24 * 60 * 60
+
+# Canonical skill -> spellings matched case-insensitively
+SKILL_ALIASES = {
+    # Programming languages
+    "python": ["python"],
+    "javascript": ["javascript", "ecmascript"],
+    "typescript": ["typescript"],
+    "java": ["java"],
+    "c++": ["c++", "cpp"],
+    "c#": ["c#", "csharp"],
+    "php": ["php"],
+    "ruby": ["ruby"],
+    # Bare "Go" starts too many sentences; only match it with context
+    "go": ["golang", "go language", "go programming"],
+    "kotlin": ["kotlin"],
+    "scala": ["scala"],
+    # Web technologies
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "react": ["react", "react.js", "reactjs"],
+    "react native": ["react native"],
+    "angular": ["angular", "angularjs"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "svelte": ["svelte"],
+    "next.js": ["next.js", "nextjs"],
+    "nuxt": ["nuxt", "nuxt.js"],
+    "node.js": ["node.js", "nodejs"],
+    "express": ["express.js", "expressjs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "spring": ["spring boot"],
+    "graphql": ["graphql"],
+    "rest": ["restful", "rest api", "rest apis"],
+    "microservices": ["microservices", "microservice"],
+    # Databases
+    "sql": ["sql"],
+    "nosql": ["nosql"],
+    "mysql": ["mysql"],
+    "postgresql": ["postgresql", "postgres"],
+    "sqlite": ["sqlite"],
+    "mongodb": ["mongodb", "mongo"],
+    "redis": ["redis"],
+    "oracle": ["oracle"],
+    # Cloud & DevOps
+    "aws": ["aws", "amazon web services"],
+    "azure": ["azure"],
+    "gcp": ["gcp", "google cloud"],
+    "docker": ["docker"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "ansible": ["ansible"],
+    "jenkins": ["jenkins"],
+    "ci/cd": ["ci/cd", "continuous integration"],
+    "linux": ["linux"],
+    "git": ["git", "github", "gitlab"],
+    # Data science
+    "machine learning": ["machine learning"],
+    "deep learning": ["deep learning"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    # Mobile
+    "flutter": ["flutter"],
+    "android": ["android"],
+    "ios": ["ios"],
+    # Practices
+    "agile": ["agile"],
+    "scrum": ["scrum"],
+}
+# Skills that are also ordinary English words only match in these exact
+# spellings ("Rust", not "rust")
+CASE_SENSITIVE_ALIASES = {
+    "rust": ["Rust"],
+    "swift": ["Swift"],
+    "express": ["Express"],
+    "spring": ["Spring"],
+    "rest": ["REST"],
+}
+
+
+def _trie_pattern(spellings):
+    """
+    Alternation with shared prefixes factored out ("java|javascript" ->
+    "java(?:script)?"), so the regex engine does not retry every spelling
+    at every position.
+    """
+    trie = {}
+    for spelling in spellings:
+        node = trie
+        for char in spelling:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        return "(?:" + "|".join(branches) + ")" + ("?" if "" in node else "")
+
+    return build(trie)
+
+
+def _compile(aliases, flags=0):
+    """
+    One pattern over every spelling. Skills like "c++" end in punctuation,
+    so the boundaries are lookarounds rather than \\b; a trailing version
+    number still matches ("python3", "c++17").
+    """
+    spellings = {spelling for names in aliases.values() for spelling in names}
+    body = _trie_pattern(spellings)
+    return re.compile(rf"(?<![\w+#.-])(?:{body})(?![^\W\d]|[+#]|\.\w)", flags)
+
+
+def _lookup(aliases, fold):
+    return {
+        (spelling.lower() if fold else spelling): skill
+        for skill, names in aliases.items()
+        for spelling in names
+    }
+
+
+SKILL_RE = _compile(SKILL_ALIASES, re.IGNORECASE)
+CASE_SENSITIVE_SKILL_RE = _compile(CASE_SENSITIVE_ALIASES)
+_SKILL_BY_SPELLING = _lookup(SKILL_ALIASES, fold=True)
+_SKILL_BY_EXACT_SPELLING = _lookup(CASE_SENSITIVE_ALIASES, fold=False)
+
+
+def free_text(content):
+    """The free-text sections of a CV content dict, as one string."""
+    parts = [(content.get("personal_info") or {}).get("summary")]
+    for key, fields in [
+        ("experience", ["title", "description"]),
+        ("education", ["degree", "details"]),
+        ("projects", ["name", "description"]),
+    ]:
+        for entry in content.get(key) or []:
+            if isinstance(entry, dict):
+                parts.extend(entry.get(field) for field in fields)
+    return "\n".join(part for part in parts if isinstance(part, str) and part)
+
+
+def extract_skills(text):
+    """Canonical skills mentioned in `text`, in order of first mention."""
+    found = {}
+    for match in SKILL_RE.finditer(text):
+        spelling = " ".join(match.group().lower().split())
+        found.setdefault(match.start(), _SKILL_BY_SPELLING[spelling])
+    for match in CASE_SENSITIVE_SKILL_RE.finditer(text):
+        found.setdefault(match.start(), _SKILL_BY_EXACT_SPELLING[match.group()])
+    return list(dict.fromkeys(found[start] for start in sorted(found)))
+
+
+def infer_skills(content, content_hash=""):
+    """
+    Skills found in the free text of `content` but missing from its skills
+    list. Cached by content hash when one is given.
+    """
+    key = f"{CACHE_PREFIX}{EXTRACTOR_VERSION}:{content_hash}"
+    if content_hash:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    explicit = {
+        " ".join(skill.lower().split())
+        for skill in content.get("skills") or []
+        if isinstance(skill, str)
+    }
+    inferred = [
+        skill for skill in extract_skills(free_text(content)) if skill not in explicit
+    ]
+    if content_hash:
+        cache.set(key, inferred, CACHE_SECONDS)
+    return inferred
+
+
+def version_inferred_skills(user_cv):
+    """
+    Inferred skills of a saved version. Versions saved before extraction
+    existed (or with an older EXTRACTOR_VERSION) are extracted once and
+    updated in place.
+    """
+    if user_cv.inferred_skills_version == EXTRACTOR_VERSION:
+        return user_cv.inferred_skills
+    from .cv_versions import cv_content
+
+    inferred = infer_skills(cv_content(user_cv), user_cv.content_hash)
+    UserCV.objects.filter(pk=user_cv.pk).update(
+        inferred_skills=inferred, inferred_skills_version=EXTRACTOR_VERSION
+    )
+    user_cv.inferred_skills = inferred
+    user_cv.inferred_skills_version = EXTRACTOR_VERSION
+    return inferred
+
+
+def saved_inferred_skills(user, cv_data):
+    """
+    Inferred skills for a session cv_data, read from the user's saved
+    version with the same content. A draft that was never saved has none.
+    """
+    from .cv_versions import content_from_data, cv_content_hash
+
+    digest = cv_content_hash(
+        content_from_data(cv_data), cv_data.get("template_choice") or "classic"
+    )
+    user_cv = (
+        UserCV.objects.filter(user=user, content_hash=digest)
+        .order_by("-is_latest", "-version")
+        .first()
+    )
+    return version_inferred_skills(user_cv) if user_cv else []
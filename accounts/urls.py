@@ -11,12 +11,14 @@ urlpatterns = [
     path("reset-password/<str:token>/", views.reset_password, name="reset_password"),
     path("cv-templates/", views.cv_templates, name="cv_templates"),
     path("cv-builder/<int:template_id>/", views.cv_builder, name="cv_builder"),
+    path("cv-autosave/", views.cv_autosave, name="cv_autosave"),
     path("cv-preview/", views.cv_preview, name="cv_preview"),
     path("cv-download/", views.cv_download_pdf, name="cv_download_pdf"),
     path("cv-dashboard/", views.cv_dashboard, name="cv_dashboard"),
     path("cv-edit/<int:cv_id>/", views.cv_edit, name="cv_edit"),
     path("cv-delete/<int:cv_id>/", views.cv_delete, name="cv_delete"),
     path("cv-load/<int:cv_id>/", views.cv_load, name="cv_load"),
+    path("cv-photo/<str:photo_key>/", views.cv_photo, name="cv_photo"),
     # Admin dashboard
     path(
         "admin/dashboard/",
@@ -1,5 +1,3 @@
-import base64
-
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.models import User
@@ -7,22 +5,57 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.core.mail import send_mail
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+from django.db.models import Count, F, Max, Window
+from django.db.models.functions import RowNumber
 from django.utils.crypto import get_random_string
 from django.utils import timezone
 from datetime import timedelta
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
 from django.views.decorators.vary import vary_on_headers
-from .models import PasswordResetToken, UserCV, CVTemplate
+from .models import PasswordResetToken, UserCV, CVTemplate, CVDraft
 from jobs.models import JobApplication
 from .email_utils import send_cv_saved_email, send_job_application_email
+from .cv_form import CVFormError, parse_cv_form
+from .cv_versions import (
+    cv_content,
+    cv_data_for,
+    deactivate_version,
+    save_cv_version,
+)
+from .drafts import (
+    SESSION_KEY as DRAFT_SESSION_KEY,
+    DraftConflict,
+    autosave,
+    save_session_draft,
+    session_cv_data,
+    session_draft,
+)
+from .json_patch import PatchError
+from .photos import (
+    CONTENT_TYPES,
+    PHOTO_KEY_RE,
+    PHOTO_SIZES,
+    photo_key_from_value,
+    photo_path,
+    photo_variant_path,
+    store_uploaded_photo,
+    with_photo_src,
+)
 import re
 from . import views
 from pdf_generator import cv_pdf_response
 import json
 
+# CV names per dashboard page, and versions listed under each name
+DASHBOARD_CVS_PER_PAGE = 10
+DASHBOARD_VERSIONS_PER_CV = 5
+
 
 def validate_person_name(name: str) -> bool:
     """Allow letters, spaces, apostrophes, periods, and hyphens. No digits."""
@@ -490,8 +523,10 @@ def cv_builder(request, template_id):
         },
     }
 
-    # Get existing CV data from session or create empty
-    existing_cv_data = request.session.get("cv_data", {})
+    # Get existing CV data from the draft (with its autosaved edits) or
+    # create empty
+    draft = session_draft(request)
+    existing_cv_data = dict(draft.data) if draft else {}
     if "personal_info" not in existing_cv_data:
         existing_cv_data["personal_info"] = {}
     if "template_choice" not in existing_cv_data:
@@ -502,142 +537,28 @@ def cv_builder(request, template_id):
 
     if request.method == "POST":
         # Handle CV data submission
-        template_choice = request.POST.get(
-            "template_choice",
-            existing_cv_data.get("template_choice", "classic"),
-        )
-        previous_photo = existing_cv_data.get("profile_photo")
-
-        cv_data = {
-            "personal_info": {
-                "full_name": request.POST.get("full_name"),
-                "email": request.POST.get("email"),
-                "phone": request.POST.get("phone"),
-                "location": request.POST.get("location"),
-                "summary": request.POST.get("summary"),
-            },
-            "template_choice": template_choice,
-            "profile_photo": previous_photo,
-            "experience": [],
-            "education": [],
-            "skills": [],
-            "projects": [],
-        }
+        previous_photo = photo_key_from_value(existing_cv_data.get("profile_photo"))
 
-        # Handle optional profile photo
+        try:
+            cv_data = parse_cv_form(
+                request.POST,
+                template_choice=existing_cv_data.get("template_choice", "classic"),
+                profile_photo=previous_photo,
+            )
+        except CVFormError as e:
+            messages.error(request, str(e))
+            return redirect("cv_builder", template_id)
+
+        # Handle optional profile photo (stored once, referenced by hash)
         photo_file = request.FILES.get("profile_photo")
         if photo_file:
             try:
-                mime_type = photo_file.content_type or "image/png"
-                encoded = base64.b64encode(photo_file.read()).decode("utf-8")
-                cv_data["profile_photo"] = f"data:{mime_type};base64,{encoded}"
+                cv_data["profile_photo"] = store_uploaded_photo(photo_file)
             except Exception:
                 cv_data["profile_photo"] = previous_photo
 
-        # Handle multiple experience entries
-        titles = request.POST.getlist("experience_title")
-        descriptions = request.POST.getlist("experience_description")
-        companies = request.POST.getlist("experience_company")
-        locations = request.POST.getlist("experience_location")
-        starts = request.POST.getlist("experience_start")
-        ends = request.POST.getlist("experience_end")
-
-        for i in range(len(titles)):
-            title = titles[i].strip() if i < len(titles) else ""
-            company = companies[i].strip() if i < len(companies) else ""
-            description = descriptions[i].strip() if i < len(descriptions) else ""
-            location = locations[i].strip() if i < len(locations) else ""
-            start = starts[i].strip() if i < len(starts) else ""
-            end = ends[i].strip() if i < len(ends) else ""
-
-            # Clean template syntax from data (prevent template injection)
-            template_pattern = r"\{[%#]\s*.*?\s*[%#]\}"
-            start = re.sub(template_pattern, "", start)
-            end = re.sub(template_pattern, "", end)
-            title = re.sub(template_pattern, "", title)
-            company = re.sub(template_pattern, "", company)
-            description = re.sub(template_pattern, "", description)
-            location = re.sub(template_pattern, "", location)
-
-            if any([title, company, description, location, start, end]):
-                cv_data["experience"].append(
-                    {
-                        "title": title,
-                        "company": company,
-                        "location": location,
-                        "start": start,
-                        "end": end,
-                        "description": description,
-                    }
-                )
-
-        # Handle multiple education entries
-        degrees = request.POST.getlist("education_degree")
-        institutions = request.POST.getlist("education_institution")
-        locations = request.POST.getlist("education_location")
-        starts = request.POST.getlist("education_start")
-        ends = request.POST.getlist("education_end")
-        details = request.POST.getlist("education_details")
-
-        for i in range(len(degrees)):
-            degree = degrees[i].strip() if i < len(degrees) else ""
-            institution = institutions[i].strip() if i < len(institutions) else ""
-            location = locations[i].strip() if i < len(locations) else ""
-            start = starts[i].strip() if i < len(starts) else ""
-            end = ends[i].strip() if i < len(ends) else ""
-            detail = details[i].strip() if i < len(details) else ""
-
-            # Clean template syntax from data (prevent template injection)
-            template_pattern = r"\{[%#]\s*.*?\s*[%#]\}"
-            start = re.sub(template_pattern, "", start)
-            end = re.sub(template_pattern, "", end)
-            degree = re.sub(template_pattern, "", degree)
-            institution = re.sub(template_pattern, "", institution)
-            location = re.sub(template_pattern, "", location)
-            detail = re.sub(template_pattern, "", detail)
-
-            if any([degree, institution, location, start, end, detail]):
-                cv_data["education"].append(
-                    {
-                        "degree": degree,
-                        "institution": institution,
-                        "location": location,
-                        "start": start,
-                        "end": end,
-                        "details": detail,
-                    }
-                )
-
-        # Handle skills
-        skill_entries = request.POST.getlist("skills")
-        parsed_skills = []
-        for entry in skill_entries:
-            parsed_skills.extend(
-                [skill.strip() for skill in entry.split(",") if skill.strip()]
-            )
-        cv_data["skills"] = parsed_skills
-
-        # Handle projects
-        project_names = request.POST.getlist("project_name")
-        project_links = request.POST.getlist("project_link")
-        project_descriptions = request.POST.getlist("project_description")
-
-        for i in range(len(project_names)):
-            if project_names[i].strip():
-                cv_data["projects"].append(
-                    {
-                        "name": project_names[i],
-                        "link": project_links[i] if i < len(project_links) else "",
-                        "description": (
-                            project_descriptions[i]
-                            if i < len(project_descriptions)
-                            else ""
-                        ),
-                    }
-                )
-
-        # Store in session for preview
-        request.session["cv_data"] = cv_data
+        # Store the draft for preview; the session only keeps its id
+        save_session_draft(request, cv_data)
         request.session["template_id"] = template_id
 
         # Save to database
@@ -655,37 +576,24 @@ def cv_builder(request, template_id):
                     },
                 )
 
-                # Get latest version for this CV name
-                latest_cv = (
-                    UserCV.objects.filter(user=request.user, name=cv_name)
-                    .order_by("-version")
-                    .first()
-                )
-
-                new_version = (latest_cv.version + 1) if latest_cv else 1
-
-                # Create new CV version
-                user_cv = UserCV.objects.create(
-                    user=request.user,
-                    template=template_obj,
-                    name=cv_name,
-                    version=new_version,
-                    personal_info=cv_data.get("personal_info", {}),
-                    experience=cv_data.get("experience", []),
-                    education=cv_data.get("education", []),
-                    skills=cv_data.get("skills", []),
-                    projects=cv_data.get("projects", []),
-                    profile_photo=cv_data.get("profile_photo", ""),
-                    template_choice=cv_data.get("template_choice", "classic"),
+                # Append a new version (stored as a delta when possible)
+                user_cv, created = save_cv_version(
+                    request.user, cv_name, cv_data, template=template_obj
                 )
 
-                # Send email notification
-                send_cv_saved_email(request.user, cv_name)
+                if created:
+                    # Send email notification
+                    send_cv_saved_email(request.user, cv_name)
 
-                messages.success(
-                    request,
-                    f"CV '{cv_name}' saved successfully! (Version {new_version})",
-                )
+                    messages.success(
+                        request,
+                        f"CV '{cv_name}' saved successfully! (Version {user_cv.version})",
+                    )
+                else:
+                    messages.info(
+                        request,
+                        f"No changes since version {user_cv.version} of '{cv_name}', nothing new saved.",
+                    )
                 request.session["saved_cv_id"] = user_cv.id
             except Exception as e:
                 messages.warning(
@@ -694,18 +602,59 @@ def cv_builder(request, template_id):
 
         return redirect("cv_preview")
 
+    if draft is None:
+        draft = save_session_draft(request, existing_cv_data)
+
     context = {
         "template": template,
         "cv_data": existing_cv_data,
         "user_data": template["user_data"],
+        "draft": draft,
+        "draft_data": existing_cv_data,
     }
     return render(request, "cv-builder.html", context)
 
 
+@login_required
+@require_POST
+def cv_autosave(request):
+    """
+    Apply a JSON Patch from the builder to the session's CV draft.
+    Body: {"revision": <draft revision the patch was made against>,
+    "patch": [<operations>]}. Answers 409 with the current draft when the
+    client is behind, so it can diff against that instead.
+    """
+    try:
+        payload = json.loads(request.body)
+        revision = int(payload["revision"])
+        patch = payload["patch"]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "Invalid autosave request"}, status=400)
+
+    try:
+        revision = autosave(
+            request.user, request.session.get(DRAFT_SESSION_KEY), revision, patch
+        )
+    except CVDraft.DoesNotExist:
+        return JsonResponse({"error": "No CV draft to save to"}, status=404)
+    except DraftConflict as e:
+        return JsonResponse(
+            {
+                "error": "Draft changed since your last save",
+                "revision": e.draft.revision,
+                "draft": e.draft.data,
+            },
+            status=409,
+        )
+    except PatchError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return JsonResponse({"revision": revision})
+
+
 @login_required
 def cv_preview(request):
     """Preview CV before download"""
-    cv_data = request.session.get("cv_data", {})
+    cv_data = session_cv_data(request)
     template_id = request.session.get("template_id")
 
     if not cv_data:
@@ -723,14 +672,14 @@ def cv_preview(request):
         if key not in cv_data:
             cv_data[key] = []
 
-    context = {"cv_data": cv_data, "template_id": template_id}
+    context = {"cv_data": with_photo_src(cv_data), "template_id": template_id}
     return render(request, "cv-preview.html", context)
 
 
 @login_required
 def cv_download_pdf(request):
     """Generate and download PDF"""
-    cv_data = request.session.get("cv_data", {})
+    cv_data = session_cv_data(request)
     if not cv_data:
         messages.error(request, "No CV data found. Please build your CV first.")
         return redirect("cv_templates")
@@ -752,7 +701,9 @@ def cv_download_pdf(request):
 
     try:
         response = cv_pdf_response(
-            cv_data, filename=filename, template_name=pdf_template
+            with_photo_src(cv_data, inline=True),
+            filename=filename,
+            template_name=pdf_template,
         )
 
         # If response is an error, show message to user
@@ -784,20 +735,45 @@ def cv_download_pdf(request):
 @login_required
 def cv_dashboard(request):
     """User dashboard to manage all saved CVs"""
-    user_cvs = UserCV.objects.filter(user=request.user, is_active=True).order_by(
-        "-updated_at"
-    )
+    user_cvs = UserCV.objects.filter(user=request.user, is_active=True)
 
-    # Group CVs by name to show versions
-    cv_groups = {}
-    for cv in user_cvs:
-        if cv.name not in cv_groups:
-            cv_groups[cv.name] = []
-        cv_groups[cv.name].append(cv)
+    # One row per CV name, grouped in the database, most recently edited first
+    names = (
+        user_cvs.values("name")
+        .annotate(version_count=Count("id"), last_updated=Max("updated_at"))
+        .order_by("-last_updated", "name")
+    )
+    page = Paginator(names, DASHBOARD_CVS_PER_PAGE).get_page(request.GET.get("page"))
+
+    # Newest few versions of each CV on this page, list columns only
+    versions = (
+        user_cvs.filter(name__in=[group["name"] for group in page])
+        .annotate(
+            recency=Window(
+                RowNumber(), partition_by=[F("name")], order_by=F("version").desc()
+            )
+        )
+        .filter(recency__lte=DASHBOARD_VERSIONS_PER_CV)
+        .only("id", "name", "version", "updated_at", "template_choice")
+        .order_by("name", "-version")
+    )
+    by_name = {}
+    for cv in versions:
+        by_name.setdefault(cv.name, []).append(cv)
+
+    cv_groups = [
+        {
+            "name": group["name"],
+            "version_count": group["version_count"],
+            "versions": by_name.get(group["name"], []),
+        }
+        for group in page
+    ]
 
     context = {
         "cv_groups": cv_groups,
-        "total_cvs": user_cvs.count(),
+        "page_obj": page,
+        "total_cvs": page.paginator.count,
     }
     return render(request, "cv-dashboard.html", context)
 
@@ -808,162 +784,52 @@ def cv_edit(request, cv_id):
     user_cv = get_object_or_404(UserCV, id=cv_id, user=request.user)
 
     if request.method == "POST":
-        # Update CV data
-        cv_data = {
-            "personal_info": {
-                "full_name": request.POST.get("full_name"),
-                "email": request.POST.get("email"),
-                "phone": request.POST.get("phone"),
-                "location": request.POST.get("location"),
-                "summary": request.POST.get("summary"),
-            },
-            "template_choice": request.POST.get("template_choice", "classic"),
-            "profile_photo": user_cv.profile_photo,
-            "experience": [],
-            "education": [],
-            "skills": [],
-            "projects": [],
-        }
+        try:
+            cv_data = parse_cv_form(
+                request.POST,
+                profile_photo=photo_key_from_value(
+                    cv_content(user_cv)["profile_photo"]
+                ),
+            )
+        except CVFormError as e:
+            messages.error(request, str(e))
+            return redirect("cv_edit", cv_id)
 
         # Handle profile photo update
         photo_file = request.FILES.get("profile_photo")
         if photo_file:
             try:
-                mime_type = photo_file.content_type or "image/png"
-                encoded = base64.b64encode(photo_file.read()).decode("utf-8")
-                cv_data["profile_photo"] = f"data:{mime_type};base64,{encoded}"
+                cv_data["profile_photo"] = store_uploaded_photo(photo_file)
             except Exception:
                 pass
 
-        # Process experience (same as cv_builder)
-        titles = request.POST.getlist("experience_title")
-        companies = request.POST.getlist("experience_company")
-        locations = request.POST.getlist("experience_location")
-        starts = request.POST.getlist("experience_start")
-        ends = request.POST.getlist("experience_end")
-        descriptions = request.POST.getlist("experience_description")
-
-        for i in range(len(titles)):
-            title = titles[i].strip() if i < len(titles) else ""
-            company = companies[i].strip() if i < len(companies) else ""
-            location = locations[i].strip() if i < len(locations) else ""
-            start = starts[i].strip() if i < len(starts) else ""
-            end = ends[i].strip() if i < len(ends) else ""
-            description = descriptions[i].strip() if i < len(descriptions) else ""
-
-            # Clean template syntax from data (prevent template injection)
-            template_pattern = r"\{[%#]\s*.*?\s*[%#]\}"
-            start = re.sub(template_pattern, "", start)
-            end = re.sub(template_pattern, "", end)
-            title = re.sub(template_pattern, "", title)
-            company = re.sub(template_pattern, "", company)
-            description = re.sub(template_pattern, "", description)
-            location = re.sub(template_pattern, "", location)
-
-            if any([title, company, location, start, end, description]):
-                cv_data["experience"].append(
-                    {
-                        "title": title,
-                        "company": company,
-                        "location": location,
-                        "start": start,
-                        "end": end,
-                        "description": description,
-                    }
-                )
-
-        # Process education
-        degrees = request.POST.getlist("education_degree")
-        institutions = request.POST.getlist("education_institution")
-        edu_locations = request.POST.getlist("education_location")
-        edu_starts = request.POST.getlist("education_start")
-        edu_ends = request.POST.getlist("education_end")
-        edu_details = request.POST.getlist("education_details")
-
-        for i in range(len(degrees)):
-            degree = degrees[i].strip() if i < len(degrees) else ""
-            institution = institutions[i].strip() if i < len(institutions) else ""
-            location = edu_locations[i].strip() if i < len(edu_locations) else ""
-            start = edu_starts[i].strip() if i < len(edu_starts) else ""
-            end = edu_ends[i].strip() if i < len(edu_ends) else ""
-            detail = edu_details[i].strip() if i < len(edu_details) else ""
-
-            # Clean template syntax from data (prevent template injection)
-            template_pattern = r"\{[%#]\s*.*?\s*[%#]\}"
-            start = re.sub(template_pattern, "", start)
-            end = re.sub(template_pattern, "", end)
-            degree = re.sub(template_pattern, "", degree)
-            institution = re.sub(template_pattern, "", institution)
-            location = re.sub(template_pattern, "", location)
-            detail = re.sub(template_pattern, "", detail)
-
-            if any([degree, institution, location, start, end, detail]):
-                cv_data["education"].append(
-                    {
-                        "degree": degree,
-                        "institution": institution,
-                        "location": location,
-                        "start": start,
-                        "end": end,
-                        "details": detail,
-                    }
-                )
-
-        # Process skills
-        skill_entries = request.POST.getlist("skills")
-        parsed_skills = []
-        for entry in skill_entries:
-            parsed_skills.extend(
-                [skill.strip() for skill in entry.split(",") if skill.strip()]
-            )
-        cv_data["skills"] = parsed_skills
-
-        # Process projects
-        project_names = request.POST.getlist("project_name")
-        project_links = request.POST.getlist("project_link")
-        project_descriptions = request.POST.getlist("project_description")
-
-        for i in range(len(project_names)):
-            if project_names[i].strip():
-                cv_data["projects"].append(
-                    {
-                        "name": project_names[i],
-                        "link": project_links[i] if i < len(project_links) else "",
-                        "description": (
-                            project_descriptions[i]
-                            if i < len(project_descriptions)
-                            else ""
-                        ),
-                    }
-                )
+        # Save the edit as the next version; older versions are history
+        # the newer deltas build on, so they are never rewritten in place
+        saved_cv, created = save_cv_version(
+            request.user, user_cv.name, cv_data, template=user_cv.template
+        )
 
-        # Update the CV
-        user_cv.personal_info = cv_data["personal_info"]
-        user_cv.experience = cv_data["experience"]
-        user_cv.education = cv_data["education"]
-        user_cv.skills = cv_data["skills"]
-        user_cv.projects = cv_data["projects"]
-        user_cv.profile_photo = cv_data["profile_photo"]
-        user_cv.template_choice = cv_data["template_choice"]
-        user_cv.save()
-
-        # Update session for preview
-        request.session["cv_data"] = cv_data
+        # Update the draft and session for preview
+        save_session_draft(request, cv_data, cv=saved_cv)
         request.session["template_id"] = user_cv.template.id if user_cv.template else 1
+        request.session["saved_cv_id"] = saved_cv.id
 
-        messages.success(request, "CV updated successfully!")
+        if created:
+            messages.success(
+                request, f"CV updated successfully! (Version {saved_cv.version})"
+            )
+        else:
+            messages.info(request, "No changes to save.")
         return redirect("cv_preview")
 
-    # Load CV data into form
-    cv_data = {
-        "personal_info": user_cv.personal_info or {},
-        "experience": user_cv.experience or [],
-        "education": user_cv.education or [],
-        "skills": user_cv.skills or [],
-        "projects": user_cv.projects or [],
-        "profile_photo": user_cv.profile_photo or "",
-        "template_choice": user_cv.template_choice or "classic",
-    }
+    # Load CV data into form, keeping autosaved edits of this version
+    draft = session_draft(request)
+    if draft is not None and draft.cv_id == user_cv.id:
+        cv_data = draft.data
+    else:
+        cv_data = cv_data_for(user_cv)
+        cv_data["profile_photo"] = photo_key_from_value(cv_data["profile_photo"])
+        draft = save_session_draft(request, cv_data, cv=user_cv)
 
     template = {
         "id": user_cv.template.id if user_cv.template else 1,
@@ -980,6 +846,8 @@ def cv_edit(request, cv_id):
         "cv_data": cv_data,
         "user_cv": user_cv,
         "editing": True,
+        "draft": draft,
+        "draft_data": cv_data,
     }
     return render(request, "cv-builder.html", context)
 
@@ -990,8 +858,7 @@ def cv_delete(request, cv_id):
     user_cv = get_object_or_404(UserCV, id=cv_id, user=request.user)
 
     if request.method == "POST":
-        user_cv.is_active = False
-        user_cv.save()
+        deactivate_version(user_cv)
         messages.success(request, f"CV '{user_cv.name}' deleted successfully!")
         return redirect("cv_dashboard")
 
@@ -1004,19 +871,40 @@ def cv_load(request, cv_id):
     """Load a saved CV into session for preview/edit"""
     user_cv = get_object_or_404(UserCV, id=cv_id, user=request.user)
 
-    cv_data = {
-        "personal_info": user_cv.personal_info or {},
-        "experience": user_cv.experience or [],
-        "education": user_cv.education or [],
-        "skills": user_cv.skills or [],
-        "projects": user_cv.projects or [],
-        "profile_photo": user_cv.profile_photo or "",
-        "template_choice": user_cv.template_choice or "classic",
-    }
+    cv_data = cv_data_for(user_cv)
+    cv_data["profile_photo"] = photo_key_from_value(cv_data["profile_photo"])
 
-    request.session["cv_data"] = cv_data
+    save_session_draft(request, cv_data, cv=user_cv)
     request.session["template_id"] = user_cv.template.id if user_cv.template else 1
     request.session["saved_cv_id"] = user_cv.id
 
     messages.success(request, f"CV '{user_cv.name}' loaded successfully!")
     return redirect("cv_preview")
+
+
+@login_required
+def cv_photo(request, photo_key):
+    """
+    Serve a stored CV photo, resized to ?size= when it is one of the
+    PHOTO_SIZES variants. Keys are content hashes, so cache forever.
+    """
+    if not PHOTO_KEY_RE.match(photo_key):
+        raise Http404("Photo not found")
+
+    path, content_type = None, None
+    size = request.GET.get("size", "")
+    if size.isdigit() and int(size) in PHOTO_SIZES:
+        path = photo_variant_path(photo_key, int(size))
+        content_type = "image/jpeg"
+    if path is None:
+        path = photo_path(photo_key)
+        content_type = CONTENT_TYPES[photo_key.rsplit(".", 1)[1]]
+
+    try:
+        photo = default_storage.open(path, "rb")
+    except OSError:
+        raise Http404("Photo not found")
+
+    response = FileResponse(photo, content_type=content_type)
+    response["Cache-Control"] = "private, max-age=31536000, immutable"
+    return response
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+"""
+Benchmark the dataset fetcher against a local stub of TheMuse and GitHub
+Jobs, so it runs offline and the numbers are reproducible.
+
+The stub serves 20 jobs per TheMuse page and 50 per GitHub page, sleeps
+`latency` ms per request and answers If-None-Match with 304, like the
+real APIs. Runs: one page at a time, concurrent with a cold cache,
+concurrent again with a warm cache, and with a per-source job limit.
+
+Usage:
+    python benchmark_create_dataset.py [jobs] [latency_ms]
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# The response cache directory is read when create_dataset is imported
+WORK_DIR = tempfile.mkdtemp(prefix="dataset-bench-")
+os.environ.setdefault("DATASET_CACHE_DIR", os.path.join(WORK_DIR, "cache"))
+
+import create_dataset  # noqa: E402
+
+MUSE_PAGE_SIZE = 20
+GITHUB_PAGE_SIZE = 50
+
+
+class StubJobsHandler(BaseHTTPRequestHandler):
+    """GET /muse?page=N and /github?page=N, with ETags and fixed latency."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        page = int(parse_qs(url.query).get("page", ["0"])[0])
+        self.server.count(url.path)
+        time.sleep(self.server.latency)
+
+        if url.path == "/muse":
+            body = {
+                "page_count": self.server.muse_pages,
+                "results": [
+                    {
+                        "name": f"Python Developer {page}-{i}",
+                        "company": f"Muse Co {i}",
+                        "contents": "Python, Django and SQL on AWS",
+                    }
+                    for i in range(MUSE_PAGE_SIZE)
+                    if page < self.server.muse_pages
+                ],
+            }
+        elif url.path == "/github":
+            start = page * GITHUB_PAGE_SIZE
+            end = min(start + GITHUB_PAGE_SIZE, self.server.github_jobs)
+            body = [
+                {
+                    "title": f"React Engineer {n}",
+                    "company": f"GitHub Co {n % 50}",
+                    "description": "React, JavaScript and Docker",
+                }
+                for n in range(start, end)
+            ]
+        else:
+            self.send_error(404)
+            return
+
+        etag = f'"{url.path[1:]}-{page}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count_not_modified()
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubJobsServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, muse_pages, github_jobs):
+        super().__init__(("127.0.0.1", 0), StubJobsHandler)
+        self.latency = latency
+        self.muse_pages = muse_pages
+        self.github_jobs = github_jobs
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.not_modified = 0
+
+    def count(self, path):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def count_not_modified(self):
+        with self.lock:
+            self.not_modified += 1
+
+    def take_requests(self):
+        """Requests served since the last call, per path."""
+        with self.lock:
+            requests, self.requests = self.requests, {}
+        return requests
+
+
+@contextmanager
+def stub_server(latency=0.1, muse_pages=250, github_jobs=5000):
+    """Run the stub and point create_dataset at it for the duration."""
+    server = StubJobsServer(latency, muse_pages, github_jobs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    urls = create_dataset.MUSE_API_URL, create_dataset.GITHUB_JOBS_URL
+    create_dataset.MUSE_API_URL = f"{base}/muse"
+    create_dataset.GITHUB_JOBS_URL = f"{base}/github"
+    try:
+        yield server
+    finally:
+        create_dataset.MUSE_API_URL, create_dataset.GITHUB_JOBS_URL = urls
+        server.shutdown()
+        server.server_close()
+
+
+def report(label, server, started, count, cache=None):
+    elapsed = time.perf_counter() - started
+    requests = sum(server.take_requests().values())
+    line = f"{label:<22} {count:>6} jobs {requests:>5} requests {elapsed:>7.2f}s"
+    if cache:
+        line += f"  cache: {cache.hits} hits, {cache.misses} downloads"
+    print(line)
+
+
+def main():
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 100) / 1000
+    # Half the jobs from each source
+    muse_pages = -(-jobs // 2 // MUSE_PAGE_SIZE)
+    github_jobs = jobs - muse_pages * MUSE_PAGE_SIZE
+    max_pages = max(muse_pages, -(-github_jobs // GITHUB_PAGE_SIZE) + 1)
+    output = os.path.join(WORK_DIR, "job_dataset.csv")
+    print(f"Stub: {jobs} jobs, {latency * 1000:.0f} ms per request ({WORK_DIR})")
+
+    with stub_server(latency, muse_pages, github_jobs) as server:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            pages = create_dataset.iter_source_pages(max_pages, executor=executor)
+            rows = create_dataset.iter_dataset_rows(pages)
+            count = create_dataset.write_jobs(rows, output)
+        report("one page at a time", server, started, count)
+
+        for label in ["concurrent, cold cache", "concurrent, warm cache"]:
+            started = time.perf_counter()
+            cache = create_dataset.ResponseCache()
+            pages = create_dataset.iter_source_pages(max_pages, cache=cache)
+            rows = create_dataset.iter_dataset_rows(pages)
+            count = create_dataset.write_jobs(rows, output)
+            report(label, server, started, count, cache)
+
+        started = time.perf_counter()
+        pages = create_dataset.iter_source_pages(max_pages, limit_per_source=100)
+        rows = create_dataset.iter_dataset_rows(pages, limit_per_source=100)
+        count = create_dataset.write_jobs(rows, output)
+        report("limit 100 per source", server, started, count)
+
+
+if __name__ == "__main__":
+    main()
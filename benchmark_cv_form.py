@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Benchmark the CV form parser (accounts.cv_form) against the inline parsing
+cv_builder and cv_edit used to do.
+
+Usage:
+    python benchmark_cv_form.py [entries per section] [repeats]
+"""
+import os
+import random
+import re
+import sys
+import time
+
+import django
+
+# Add the project directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Resumatch.settings")
+django.setup()
+
+from django.http import QueryDict
+
+from accounts.cv_form import parse_cv_form
+
+WORDS = (
+    "designed built led migrated python django react aws kubernetes team "
+    "pipeline latency customers revenue reduced scaled c++ {json}"
+).split()
+# Share of fields carrying template syntax the sanitizer has to strip
+TEMPLATE_SYNTAX_RATE = 0.05
+
+
+def text(rng, words):
+    value = " ".join(rng.choice(WORDS) for _ in range(words))
+    if rng.random() < TEMPLATE_SYNTAX_RATE:
+        value += " {% if user %}{{ user.password }}{% endif %}"
+    return value
+
+
+def make_post(entries):
+    rng = random.Random(42)
+    post = QueryDict(mutable=True)
+    for field in ["full_name", "email", "phone", "location"]:
+        post[field] = text(rng, 2)
+    post["summary"] = text(rng, 80)
+    post["template_choice"] = "modern"
+    for _ in range(entries):
+        for column in [
+            "experience_title",
+            "experience_company",
+            "experience_location",
+            "experience_start",
+            "experience_end",
+        ]:
+            post.appendlist(column, f"  {text(rng, 3)}  ")
+        post.appendlist("experience_description", text(rng, 60))
+        for column in [
+            "education_degree",
+            "education_institution",
+            "education_location",
+            "education_start",
+            "education_end",
+        ]:
+            post.appendlist(column, text(rng, 3))
+        post.appendlist("education_details", text(rng, 20))
+        post.appendlist("project_name", text(rng, 2))
+        post.appendlist("project_link", "https://example.com/" + text(rng, 1))
+        post.appendlist("project_description", text(rng, 30))
+        post.appendlist("skills", ", ".join(rng.sample(WORDS, 4)))
+    return post
+
+
+def legacy_parse(post):
+    """The per-field parsing previously copied into cv_builder and cv_edit."""
+    cv_data = {
+        "personal_info": {
+            "full_name": post.get("full_name"),
+            "email": post.get("email"),
+            "phone": post.get("phone"),
+            "location": post.get("location"),
+            "summary": post.get("summary"),
+        },
+        "template_choice": post.get("template_choice", "classic"),
+        "profile_photo": "",
+        "experience": [],
+        "education": [],
+        "skills": [],
+        "projects": [],
+    }
+
+    titles = post.getlist("experience_title")
+    companies = post.getlist("experience_company")
+    locations = post.getlist("experience_location")
+    starts = post.getlist("experience_start")
+    ends = post.getlist("experience_end")
+    descriptions = post.getlist("experience_description")
+    for i in range(len(titles)):
+        title = titles[i].strip() if i < len(titles) else ""
+        company = companies[i].strip() if i < len(companies) else ""
+        location = locations[i].strip() if i < len(locations) else ""
+        start = starts[i].strip() if i < len(starts) else ""
+        end = ends[i].strip() if i < len(ends) else ""
+        description = descriptions[i].strip() if i < len(descriptions) else ""
+        template_pattern = r"\{[%#]\s*.*?\s*[%#]\}"
+        start = re.sub(template_pattern, "", start)
+        end = re.sub(template_pattern, "", end)
+        title = re.sub(template_pattern, "", title)
+        company = re.sub(template_pattern, "", company)
+        description = re.sub(template_pattern, "", description)
+        location = re.sub(template_pattern, "", location)
+        if any([title, company, location, start, end, description]):
+            cv_data["experience"].append(
+                {
+                    "title": title,
+                    "company": company,
+                    "location": location,
+                    "start": start,
+                    "end": end,
+                    "description": description,
+                }
+            )
+
+    degrees = post.getlist("education_degree")
+    institutions = post.getlist("education_institution")
+    locations = post.getlist("education_location")
+    starts = post.getlist("education_start")
+    ends = post.getlist("education_end")
+    details = post.getlist("education_details")
+    for i in range(len(degrees)):
+        degree = degrees[i].strip() if i < len(degrees) else ""
+        institution = institutions[i].strip() if i < len(institutions) else ""
+        location = locations[i].strip() if i < len(locations) else ""
+        start = starts[i].strip() if i < len(starts) else ""
+        end = ends[i].strip() if i < len(ends) else ""
+        detail = details[i].strip() if i < len(details) else ""
+        template_pattern = r"\{[%#]\s*.*?\s*[%#]\}"
+        start = re.sub(template_pattern, "", start)
+        end = re.sub(template_pattern, "", end)
+        degree = re.sub(template_pattern, "", degree)
+        institution = re.sub(template_pattern, "", institution)
+        location = re.sub(template_pattern, "", location)
+        detail = re.sub(template_pattern, "", detail)
+        if any([degree, institution, location, start, end, detail]):
+            cv_data["education"].append(
+                {
+                    "degree": degree,
+                    "institution": institution,
+                    "location": location,
+                    "start": start,
+                    "end": end,
+                    "details": detail,
+                }
+            )
+
+    parsed_skills = []
+    for entry in post.getlist("skills"):
+        parsed_skills.extend(
+            [skill.strip() for skill in entry.split(",") if skill.strip()]
+        )
+    cv_data["skills"] = parsed_skills
+
+    project_names = post.getlist("project_name")
+    project_links = post.getlist("project_link")
+    project_descriptions = post.getlist("project_description")
+    for i in range(len(project_names)):
+        if project_names[i].strip():
+            cv_data["projects"].append(
+                {
+                    "name": project_names[i],
+                    "link": project_links[i] if i < len(project_links) else "",
+                    "description": (
+                        project_descriptions[i]
+                        if i < len(project_descriptions)
+                        else ""
+                    ),
+                }
+            )
+    return cv_data
+
+
+def timed(label, fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    per_call = (time.perf_counter() - start) / repeats
+    print(f"  {label:<8} {per_call * 1000:8.3f} ms per form")
+    return result
+
+
+def run(entries, repeats):
+    post = make_post(entries)
+    print(f"Parsing a CV form with {entries} entries per section, {repeats} times")
+    expected = timed("inline", lambda: legacy_parse(post), repeats)
+    got = timed("schema", lambda: parse_cv_form(post), repeats)
+    print(f"  matches  {expected == got}")
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 60,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
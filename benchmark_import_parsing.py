@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Benchmark the per-row import parsers against the vectorized column parsers.
+
+Usage:
+    python benchmark_import_parsing.py [rows]
+"""
+import os
+import random
+import sys
+import time
+
+import django
+
+# Add the project directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Set up Django environment
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Resumatch.settings")
+django.setup()
+
+import pandas as pd
+
+from jobs import import_jobs, import_kaggle_dataset
+from jobs import import_parsing
+
+SNIPPETS = [
+    "Senior Python developer in Bangalore, ₹20,000.00 - ₹40,000.00 per month.",
+    "Junior React engineer, Pune. Full-time role with 2+ years experience.",
+    "We are hiring an intern for our Mumbai office (part-time)",
+    "Contract DevOps engineer - AWS, Docker, Kubernetes. Salary: $5000",
+    "Remote data scientist with 3-5 years of machine learning experience",
+    "Lead architect, Hyderabad. Pay €60,000 - €80,000 EUR",
+    "Experienced backend engineer in Chennai; GBP 45000",
+    "Associate QA analyst, Delhi. Full-time.",
+    "Mid level Java developer needed",
+    "Graduate trainee programme",
+]
+SALARIES = ["$50,000 - $80,000", "₹4,00,000", "EUR 60000 to 70000", "", "Competitive"]
+
+
+def make_frame(rows):
+    rng = random.Random(42)
+    descriptions = [
+        " ".join(rng.sample(SNIPPETS, 3)) + f" Req {i}" for i in range(rows)
+    ]
+    return pd.DataFrame(
+        {
+            "title": [f"Engineer {i}" for i in range(rows)],
+            "description": descriptions,
+            "salary": [rng.choice(SALARIES) for _ in range(rows)],
+        }
+    )
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {label:<12} {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def scalar_or_none(fn, *args):
+    try:
+        return fn(*args)
+    except ValueError:
+        return None
+
+
+def run(rows):
+    df = make_frame(rows)
+    desc = df["description"]
+    print(f"Parsing {rows:,} rows")
+
+    print("salary (job_title_des.csv)")
+    per_row = timed("per-row", lambda: [scalar_or_none(import_jobs.parse_salary, d) for d in desc])
+    columns = timed("vectorized", lambda: import_parsing.parse_salary_columns(desc))
+    mismatches = sum(
+        1
+        for expected, got in zip(per_row, columns.itertuples(index=False))
+        if expected is not None and tuple(expected) != tuple(got)
+    )
+    print(f"  mismatches   {mismatches}")
+
+    for label, scalar, vectorized in [
+        ("experience level", import_jobs.parse_experience_level, import_parsing.parse_experience_level_column),
+        ("job type", import_jobs.parse_job_type, import_parsing.parse_job_type_column),
+    ]:
+        print(label)
+        per_row = timed("per-row", lambda: [scalar(d) for d in desc])
+        column = timed("vectorized", lambda: vectorized(desc))
+        print(f"  mismatches   {sum(a != b for a, b in zip(per_row, column))}")
+
+    print("salary (Kaggle jobs.csv)")
+    per_row = timed("per-row", lambda: [import_kaggle_dataset.clean_salary(s) for s in df["salary"]])
+    columns = timed("vectorized", lambda: import_parsing.clean_salary_columns(df["salary"]))
+    mismatches = sum(
+        tuple(a) != tuple(b) for a, b in zip(per_row, columns.itertuples(index=False))
+    )
+    print(f"  mismatches   {mismatches}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -1,36 +1,372 @@
 import requests
 import json
 import csv
+import hashlib
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-
-
-def get_jobs_from_muse():
+from urllib.parse import urlencode, urlsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Base URLs can be pointed at a local stub server for offline runs
+# (benchmark_create_dataset.py runs one)
+MUSE_API_URL = os.environ.get("MUSE_API_URL", "https://www.themuse.com/api/public/jobs")
+GITHUB_JOBS_URL = os.environ.get(
+    "GITHUB_JOBS_URL", "https://jobs.github.com/positions.json"
+)
+
+MAX_WORKERS = 16  # pages fetched at once across all sources
+PER_HOST_LIMIT = 4  # concurrent requests to any one host
+REQUEST_TIMEOUT = (5, 30)  # connect, read seconds
+MAX_RETRIES = 3
+
+# Responses are revalidated with ETag / Last-Modified instead of re-downloaded
+CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", ".dataset_cache")
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+
+def make_session(pool_size=MAX_WORKERS):
+    """Shared session: pooled keep-alive connections and retries with backoff."""
+    retry = Retry(
+        total=MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class HostLimiter:
+    """Cap the number of in-flight requests per host."""
+
+    def __init__(self, per_host=PER_HOST_LIMIT):
+        self.per_host = per_host
+        self.lock = threading.Lock()
+        self.semaphores = {}
+
+    def __call__(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.per_host)
+            return self.semaphores[host]
+
+
+class ResponseCache:
+    """
+    On-disk cache of JSON responses keyed by URL and query.
+
+    Each entry is <key>.body (raw response) plus <key>.meta (URL, ETag,
+    Last-Modified). Entries are revalidated with If-None-Match /
+    If-Modified-Since, so an unchanged page costs a 304 with no body.
+    Once the cache grows past max_bytes the least recently used entries
+    (by body mtime, bumped on every hit) are deleted.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # key -> [size in bytes, last used]
+        self.entries = {}
+        for name in os.listdir(directory):
+            if name.endswith(".body"):
+                key = name[: -len(".body")]
+                meta_path = self._path(key, ".meta")
+                if not os.path.exists(meta_path):
+                    continue
+                body = os.stat(self._path(key, ".body"))
+                size = body.st_size + os.path.getsize(meta_path)
+                self.entries[key] = [size, body.st_mtime]
+        self._evict()
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, key + suffix)
+
+    @staticmethod
+    def key(url, params=None):
+        query = urlencode(sorted((params or {}).items()))
+        return hashlib.sha256(f"{url}?{query}".encode("utf-8")).hexdigest()
+
+    def validators(self, key):
+        """Conditional request headers for a cached entry ({} if none)."""
+        if key not in self.entries:
+            return {}
+        try:
+            with open(self._path(key, ".meta"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def load(self, key):
+        """
+        Cached body of a revalidated (304) entry, marking it recently used.
+        Returns None if the entry was evicted since its validators were read.
+        """
+        try:
+            with open(self._path(key, ".body"), "rb") as f:
+                body = f.read()
+            now = time.time()
+            os.utime(self._path(key, ".body"), (now, now))
+        except FileNotFoundError:
+            return None
+        with self.lock:
+            self.hits += 1
+            if key in self.entries:
+                self.entries[key][1] = now
+        return body
+
+    def miss(self):
+        """Count a lookup that had to download the full page."""
+        with self.lock:
+            self.misses += 1
+
+    def store(self, key, url, response):
+        """Cache a 200 response if the server gave us a validator."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        meta = json.dumps(
+            {"url": response.url or url, "etag": etag, "last_modified": last_modified}
+        ).encode("utf-8")
+        # Write then rename, so readers never see a partial entry
+        for suffix, data in [(".body", response.content), (".meta", meta)]:
+            tmp_path = self._path(key, suffix + f".{threading.get_ident()}.tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key, suffix))
+        with self.lock:
+            self.entries[key] = [len(response.content) + len(meta), time.time()]
+            self._evict()
+
+    def _evict(self):
+        total = sum(size for size, _ in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self.entries.items(), key=lambda e: e[1][1]):
+            for suffix in (".body", ".meta"):
+                try:
+                    os.remove(self._path(key, suffix))
+                except FileNotFoundError:
+                    pass
+            del self.entries[key]
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+class Fetcher:
+    """Pooled session, per-host limits and optional response cache, shared by all pages."""
+
+    def __init__(self, session, limiter=None, cache=None):
+        self.session = session
+        self.limiter = limiter or HostLimiter()
+        self.cache = cache
+
+    def get_json(self, url, params=None):
+        """GET one page as JSON; returns None on any error."""
+        key = ResponseCache.key(url, params) if self.cache else None
+        try:
+            for conditional in (True, False):
+                headers = self.cache.validators(key) if key and conditional else {}
+                with self.limiter(url):
+                    response = self.session.get(
+                        url, params=params, headers=headers, timeout=REQUEST_TIMEOUT
+                    )
+                if response.status_code == 304 and headers:
+                    body = self.cache.load(key)
+                    if body is None:
+                        continue  # evicted meanwhile: fetch the full page
+                    return json.loads(body)
+                if response.status_code == 200:
+                    data = response.json()
+                    if key:
+                        self.cache.miss()
+                        self.cache.store(key, url, response)
+                    return data
+                print(f"Error getting {url} {params or ''}: HTTP {response.status_code}")
+                break
+        except Exception as e:
+            print(f"Error getting {url} {params or ''}: {e}")
+        return None
+
+
+def muse_page(fetcher, page):
+    """One page of TheMuse jobs: (results, page_count)."""
+    data = fetcher.get_json(MUSE_API_URL, {"page": page})
+    if not data:
+        return [], 0
+    return data.get("results", []), data.get("page_count", 0)
+
+
+def github_page(fetcher, page):
+    """One page of GitHub Jobs (50 per page; no page count in the response)."""
+    data = fetcher.get_json(GITHUB_JOBS_URL, {"page": page})
+    return (data if isinstance(data, list) else []), None
+
+
+def get_jobs_from_muse(max_pages=1, session=None, executor=None, cache=None):
     """Get jobs from TheMuse API (free, no key required)"""
-    url = "https://www.themuse.com/api/public/jobs"
-
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("results", [])
-    except Exception as e:
-        print(f"Error getting jobs: {e}")
-
-    return []
+    jobs = fetch_all_sources(max_pages, session, executor, ["muse"], cache)
+    return jobs["muse"]
 
 
-def get_jobs_from_github():
+def get_jobs_from_github(max_pages=1, session=None, executor=None, cache=None):
     """Get jobs from GitHub Jobs API"""
-    url = "https://jobs.github.com/positions.json"
+    jobs = fetch_all_sources(max_pages, session, executor, ["github"], cache)
+    return jobs["github"]
+
+
+SOURCES = {
+    "muse": muse_page,
+    "github": github_page,
+}
+
+
+def iter_source_pages(
+    max_pages=1,
+    session=None,
+    executor=None,
+    sources=None,
+    cache=None,
+    limit_per_source=None,
+):
+    """
+    Yield (source, jobs) for up to max_pages pages per source as soon as
+    each page is available, fetching pages concurrently.
+
+    The first page of each source is fetched in parallel and yielded as
+    soon as it arrives, so a slow source does not hold back the others.
+    Each first page plans the rest of its source: TheMuse reports its page
+    count; GitHub does not, so its next pages are only requested when the
+    first page was full, and its listing ends at the first short page. The
+    remaining pages are interleaved across sources with at most
+    2 * MAX_WORKERS in flight, so memory stays bounded however many pages
+    are fetched. Pages keep their order within each source. Pass a
+    ResponseCache to revalidate previously fetched pages instead of
+    downloading them again.
+
+    With limit_per_source, only as many pages as that many jobs need are
+    scheduled (judging by the size of the first page), and once a source
+    has yielded enough jobs its queued pages are cancelled and no further
+    requests go out for it.
+    """
+    sources = sources or list(SOURCES)
+    own_session = session is None
+    own_executor = executor is None
+    session = session or make_session()
+    executor = executor or ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    fetcher = Fetcher(session, cache=cache)
 
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-    except Exception as e:
-        print(f"Error getting GitHub jobs: {e}")
-
-    return []
+        pending = deque()
+        ended = set()
+        wanted = {name: limit_per_source for name in sources}
+        # Later pages per source, and the sources with pages left in turn
+        queues = {}
+        turns = deque()
+        first_sizes = {}
+        open_ended = set()
+
+        def submit_next():
+            # Round-robin across sources so every host stays busy
+            while turns:
+                name = turns.popleft()
+                if name in ended or not queues[name]:
+                    continue
+                page = queues[name].popleft()
+                if queues[name]:
+                    turns.append(name)
+                pending.append((name, executor.submit(SOURCES[name], fetcher, page)))
+                return
+
+        def fill():
+            while turns and len(pending) < MAX_WORKERS * 2:
+                submit_next()
+
+        def take(name, results):
+            # Count results against the quota; True once the source is full
+            if wanted[name] is None:
+                return False
+            wanted[name] -= len(results)
+            return wanted[name] <= 0
+
+        first = {executor.submit(SOURCES[name], fetcher, 0): name for name in sources}
+        for future in as_completed(first):
+            name = first[future]
+            results, page_count = future.result()
+            first_sizes[name] = len(results)
+            if page_count is None:
+                open_ended.add(name)
+                page_count = max_pages if len(results) >= 50 else 1
+            last_page = min(page_count, max_pages)
+            if limit_per_source is not None and results:
+                last_page = min(last_page, -(-limit_per_source // len(results)))
+            if take(name, results):
+                ended.add(name)
+            else:
+                queues[name] = deque(range(1, last_page))
+                turns.append(name)
+                fill()
+            yield name, results
+
+        while pending:
+            name, future = pending.popleft()
+            if name in ended:
+                future.cancel()
+                fill()
+                continue
+            results = future.result()[0]
+            fill()
+            if name in open_ended and len(results) < first_sizes[name]:
+                ended.add(name)
+            if take(name, results):
+                ended.add(name)
+                for other, queued in pending:
+                    if other == name:
+                        queued.cancel()
+            if results:
+                yield name, results
+    finally:
+        if own_executor:
+            executor.shutdown(cancel_futures=True)
+        if own_session:
+            session.close()
+
+
+def fetch_all_sources(
+    max_pages=1, session=None, executor=None, sources=None, cache=None
+):
+    """Collect iter_source_pages into {source: [jobs]} (kept for small fetches)."""
+    sources = sources or list(SOURCES)
+    jobs = {name: [] for name in sources}
+    pages = iter_source_pages(max_pages, session, executor, sources, cache)
+    for name, results in pages:
+        jobs[name].extend(results)
+    return jobs
 
 
 def extract_skills_from_description(description):
@@ -76,71 +412,136 @@ def extract_skills_from_description(description):
     return found_skills
 
 
-def create_job_dataset():
-    """Create a dataset by combining multiple sources"""
+DATASET_COLUMNS = [
+    "id",
+    "title",
+    "company",
+    "location",
+    "description",
+    "skills",
+    "job_type",
+    "experience_level",
+    "source",
+]
+
+FLUSH_EVERY = 20  # rows; one TheMuse page
+
+
+def normalize_job(job, source=""):
+    """Map a raw job from any source onto the dataset columns (without skills)."""
+    return {
+        "title": job.get("title", "") or job.get("name", ""),
+        "company": job.get("company", "") or job.get("company_name", ""),
+        "location": job.get("location", "") or job.get("location_name", ""),
+        "description": job.get("description", "") or job.get("summary", ""),
+        "job_type": job.get("job_type", "") or "Full-time",
+        "experience_level": job.get("experience_level", "") or "Mid-level",
+        "source": job.get("source", "") or source or "api",
+    }
+
+
+def iter_dataset_rows(pages, limit_per_source=None):
+    """
+    fetch -> normalize -> extract skills: turn (source, jobs) pages into
+    numbered dataset rows one at a time, keeping at most limit_per_source
+    jobs from each source.
+    """
+    kept = {}
+    row_id = 0
+    for source, jobs in pages:
+        for job in jobs:
+            taken = kept.get(source, 0)
+            if limit_per_source is not None and taken >= limit_per_source:
+                break
+            kept[source] = taken + 1
+            row = normalize_job(job, source)
+            skills = extract_skills_from_description(row["description"])
+            row["skills"] = ", ".join(skills)
+            row_id += 1
+            row["id"] = row_id
+            yield row
+
+
+def write_jobs(rows, filename, output_format="csv"):
+    """
+    Write dataset rows as they arrive, as CSV or JSON Lines ("jsonl").
+    The file is flushed every FLUSH_EVERY rows so progress is visible on
+    disk immediately. Returns the number of rows written.
+    """
+    count = 0
+    with open(filename, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        if output_format != "jsonl":
+            writer.writerow(DATASET_COLUMNS)
+
+        for row in rows:
+            if output_format == "jsonl":
+                file.write(json.dumps(row, default=str) + "\n")
+            else:
+                writer.writerow([row[column] for column in DATASET_COLUMNS])
+            count += 1
+            if count % FLUSH_EVERY == 0:
+                file.flush()
+
+    return count
+
+
+def create_job_dataset(
+    max_pages=1,
+    limit_per_source=50,
+    use_cache=True,
+    cache_max_bytes=CACHE_MAX_BYTES,
+    output_format="csv",
+    filename=None,
+    cache_dir=CACHE_DIR,
+):
+    """
+    Create a dataset by combining multiple sources.
+
+    Pages are fetched concurrently and streamed straight to the output
+    file, so memory stays flat however many pages are requested.
+
+    Args:
+        max_pages: Pages fetched per source (TheMuse returns 20 jobs per page)
+        limit_per_source: Keep at most this many jobs per source (None = all)
+        use_cache: Revalidate pages cached in CACHE_DIR instead of re-downloading
+        cache_max_bytes: Size cap of the response cache
+        output_format: "csv" or "jsonl"
+        filename: Output path (default backend/job_dataset.csv or .jsonl)
+        cache_dir: Directory of the response cache
+
+    Returns:
+        Number of jobs written
+    """
     print("Creating job dataset...")
 
-    all_jobs = []
-
-    # Get jobs from TheMuse
-    print("Getting jobs from TheMuse...")
-    muse_jobs = get_jobs_from_muse()
-    all_jobs.extend(muse_jobs[:50])  # Limit to 50 for learning
-
-    # Get jobs from GitHub
-    print("Getting jobs from GitHub...")
-    github_jobs = get_jobs_from_github()
-    all_jobs.extend(github_jobs[:50])  # Limit to 50 for learning
-
-    print(f"Total jobs collected: {len(all_jobs)}")
-
-    # Save to CSV
-    save_to_csv(all_jobs)
+    filename = filename or f"backend/job_dataset.{output_format}"
+    cache = (
+        ResponseCache(directory=cache_dir, max_bytes=cache_max_bytes)
+        if use_cache
+        else None
+    )
+
+    # Fetch TheMuse and GitHub pages concurrently over one pooled session
+    print(f"Getting up to {max_pages} pages each from TheMuse and GitHub...")
+    pages = iter_source_pages(
+        max_pages=max_pages, cache=cache, limit_per_source=limit_per_source
+    )
+    rows = iter_dataset_rows(pages, limit_per_source=limit_per_source)
+    count = write_jobs(rows, filename, output_format=output_format)
+    if cache:
+        print(f"  cache: {cache.hits} pages unchanged (304), {cache.misses} downloaded")
+
+    print(f"Total jobs collected: {count}")
+    print(f"Dataset saved to {filename}")
 
-    return all_jobs
+    return count
 
 
 def save_to_csv(jobs):
     """Save jobs to CSV file"""
     filename = "backend/job_dataset.csv"
-
-    with open(filename, "w", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-
-        # Write header
-        writer.writerow(
-            [
-                "id",
-                "title",
-                "company",
-                "location",
-                "description",
-                "skills",
-                "job_type",
-                "experience_level",
-                "source",
-            ]
-        )
-
-        # Write job data
-        for i, job in enumerate(jobs):
-            description = job.get("description", "") or job.get("summary", "")
-            skills = extract_skills_from_description(description)
-
-            writer.writerow(
-                [
-                    i + 1,
-                    job.get("title", "") or job.get("name", ""),
-                    job.get("company", "") or job.get("company_name", ""),
-                    job.get("location", "") or job.get("location_name", ""),
-                    description,
-                    ", ".join(skills),
-                    job.get("job_type", "") or "Full-time",
-                    job.get("experience_level", "") or "Mid-level",
-                    job.get("source", "") or "api",
-                ]
-            )
-
+    write_jobs(iter_dataset_rows([("", jobs)]), filename)
     print(f"Dataset saved to {filename}")
 
 
@@ -178,13 +579,48 @@ def create_user_skills_dataset():
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the sample job datasets")
+    parser.add_argument(
+        "--pages", type=int, default=1, help="Pages to fetch per source"
+    )
+    parser.add_argument(
+        "--limit-per-source",
+        type=int,
+        default=50,
+        help="Jobs kept per source (0 = keep all)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Download every page again"
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="Write CSV or JSON Lines",
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=CACHE_MAX_BYTES // (1024 * 1024),
+        help="Size cap of the on-disk response cache",
+    )
+    args = parser.parse_args()
+
     # Create the datasets
-    create_job_dataset()
+    create_job_dataset(
+        max_pages=args.pages,
+        limit_per_source=args.limit_per_source or None,
+        use_cache=not args.no_cache,
+        cache_max_bytes=args.cache_size_mb * 1024 * 1024,
+        output_format=args.format,
+    )
     create_user_skills_dataset()
 
     print("\nDatasets created successfully!")
     print("Files created:")
-    print("- backend/job_dataset.csv")
+    print(f"- backend/job_dataset.{args.format}")
     print("- backend/user_skills_dataset.csv")
     print("\nYou can now use these datasets to learn ML!")
 
@@ -1,5 +1,9 @@
 from django.contrib import admin
-from .models import Job, JobMatchScore, JobApplication
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+
+from accounts.cv_skills import best_matching_cvs, normalize_skills
+from .models import CatalogChange, Job, JobMatchScore, JobApplication
 
 
 @admin.register(Job)
@@ -14,7 +18,7 @@ class JobAdmin(admin.ModelAdmin):
     ]
     list_filter = ["is_active", "experience_level", "job_type", "created_at"]
     search_fields = ["title", "company", "description", "location"]
-    readonly_fields = ["created_at", "updated_at"]
+    readonly_fields = ["created_at", "updated_at", "matching_cvs"]
     list_editable = ["is_active"]
 
     fieldsets = (
@@ -31,8 +35,41 @@ class JobAdmin(admin.ModelAdmin):
             "Metadata",
             {"fields": ("posted_date", "is_active", "created_at", "updated_at")},
         ),
+        ("Matching CVs", {"fields": ("matching_cvs",)}),
     )
 
+    def matching_cvs(self, obj):
+        if obj is None or obj.pk is None:
+            return "-"
+        matches = best_matching_cvs(obj)
+        if not matches:
+            return "No active CV has any of the required skills."
+        required = len(normalize_skills(obj.required_skills_list))
+        rows = format_html_join(
+            "",
+            '<tr><td><a href="{}">{}</a></td><td>{} (v{})</td>'
+            "<td>{}/{}</td><td>{}</td></tr>",
+            (
+                (
+                    reverse("admin:accounts_usercv_change", args=[cv.id]),
+                    cv.user.email or cv.user.username,
+                    cv.name,
+                    cv.version,
+                    len(skills),
+                    required,
+                    ", ".join(skills),
+                )
+                for cv, skills in matches
+            ),
+        )
+        return format_html(
+            "<table><tr><th>Candidate</th><th>CV</th><th>Matched</th>"
+            "<th>Skills</th></tr>{}</table>",
+            rows,
+        )
+
+    matching_cvs.short_description = "Best matching CVs"
+
 
 @admin.register(JobMatchScore)
 class JobMatchScoreAdmin(admin.ModelAdmin):
@@ -50,3 +87,18 @@ class JobApplicationAdmin(admin.ModelAdmin):
     search_fields = ["user__username", "user__email", "job__title", "job__company"]
     readonly_fields = ["applied_at", "updated_at"]
     ordering = ["-applied_at"]
+
+
+@admin.register(CatalogChange)
+class CatalogChangeAdmin(admin.ModelAdmin):
+    list_display = ["version", "source", "created_at"]
+    list_filter = ["source", "created_at"]
+    readonly_fields = [
+        "version",
+        "source",
+        "inserted_ids",
+        "updated_ids",
+        "deactivated_ids",
+        "created_at",
+    ]
+    ordering = ["-version"]
@@ -0,0 +1,69 @@
+"""
+Catalog version and change feed (see CatalogChange).
+
+Every committed import batch and every sync deactivation appends a
+CatalogChange entry. Consumers remember the version they were built from
+and call changes_since() to get just the jobs to re-index or drop.
+"""
+
+from collections import namedtuple
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from jobs.models import CatalogChange, Job
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+QUERY_CHUNK_SIZE = 500
+
+# Net effect of the log after some version: `upserted_ids` were inserted,
+# updated or reactivated, `deactivated_ids` should be dropped from indexes.
+CatalogDelta = namedtuple("CatalogDelta", ["version", "upserted_ids", "deactivated_ids"])
+
+
+def current_catalog_version():
+    """Latest catalog version, 0 before the first logged change."""
+    return CatalogChange.objects.aggregate(version=Max("version"))["version"] or 0
+
+
+def record_catalog_change(source, inserted_ids=(), updated_ids=(), deactivated_ids=()):
+    """Append a change entry; returns None when there is nothing to record."""
+    if not (inserted_ids or updated_ids or deactivated_ids):
+        return None
+    return CatalogChange.objects.create(
+        source=source,
+        inserted_ids=list(inserted_ids),
+        updated_ids=list(updated_ids),
+        deactivated_ids=list(deactivated_ids),
+    )
+
+
+def changes_since(version):
+    """Fold every entry newer than `version` into one CatalogDelta."""
+    latest = version
+    upserted = set()
+    deactivated = set()
+    entries = CatalogChange.objects.filter(version__gt=version).order_by("version")
+    for entry in entries.iterator():
+        latest = entry.version
+        changed = set(entry.inserted_ids) | set(entry.updated_ids)
+        upserted |= changed
+        deactivated -= changed
+        upserted -= set(entry.deactivated_ids)
+        deactivated |= set(entry.deactivated_ids)
+    return CatalogDelta(latest, sorted(upserted), sorted(deactivated))
+
+
+def deactivate_jobs(job_ids, source=""):
+    """Mark jobs inactive and log them as one catalog change (one transaction)."""
+    job_ids = list(job_ids)
+    if not job_ids:
+        return None
+    now = timezone.now()
+    with transaction.atomic():
+        for start in range(0, len(job_ids), QUERY_CHUNK_SIZE):
+            Job.objects.filter(
+                id__in=job_ids[start : start + QUERY_CHUNK_SIZE], is_active=True
+            ).update(is_active=False, updated_at=now)
+        return record_catalog_change(source, deactivated_ids=job_ids)
@@ -5,12 +5,30 @@ Usage:
     python manage.py shell
     from jobs.import_jobs import import_jobs_from_csv
     import_jobs_from_csv()
+
+Or from the command line (prints a JSON throughput summary):
+    python manage.py import_jobs --source titles --path job_title_des.csv
 """
 
 import os
 import re
 import pandas as pd
 from jobs.models import Job
+from jobs.import_pipeline import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    ParsedRow,
+    run_import,
+)
+from jobs.import_parsing import (
+    parse_experience_level_column,
+    parse_job_type_column,
+    parse_location_column,
+    parse_salary_columns,
+)
+
+# CSV header -> attribute name on the rows handed to the import loop
+TITLES_CSV_COLUMNS = {"Job Title": "title", "Job Description": "description"}
 
 
 def extract_skills(description):
@@ -107,7 +125,7 @@ def extract_skills(description):
         if skill in text:
             found_skills.append(skill.title())
 
-    return list(set(found_skills))  # Remove duplicates
+    return sorted(set(found_skills))  # Remove duplicates, stable order
 
 
 def parse_salary(description):
@@ -262,13 +280,88 @@ def extract_company(description, title):
     return "Multiple Companies"
 
 
-def import_jobs_from_csv(csv_path="job_title_des.csv", limit=None):
+def parse_titles_chunk(offset, chunk):
+    """
+    Parse one chunk of job_title_des.csv into ParsedRow records.
+    Does not touch the database, so it can run in a worker process.
+    """
+    # Parse salary, level, job type and location for the whole chunk
+    descriptions = chunk["description"].fillna("")
+    chunk = pd.concat(
+        [
+            chunk.assign(
+                description=descriptions,
+                experience_level=parse_experience_level_column(descriptions),
+                job_type=parse_job_type_column(descriptions),
+                location=parse_location_column(descriptions),
+            ),
+            parse_salary_columns(descriptions),
+        ],
+        axis=1,
+    )
+
+    parsed = []
+    for index, row in enumerate(chunk.itertuples(index=False), start=offset):
+        try:
+            # Skip if title is missing
+            title = row.title if not pd.isna(row.title) else ""
+            if not title or title.strip() == "":
+                parsed.append(ParsedRow(index, None, None))
+                continue
+
+            fields = {
+                "title": title.strip(),
+                "company": extract_company(row.description, title),
+                "location": row.location,
+                "description": row.description,
+                "required_skills": extract_skills(row.description),
+                "experience_level": row.experience_level,
+                "job_type": row.job_type,
+                "salary_min": row.salary_min,
+                "salary_max": row.salary_max,
+                "salary_currency": row.salary_currency,
+                "is_active": True,
+            }
+            parsed.append(ParsedRow(index, fields, None))
+        except Exception as e:
+            parsed.append(ParsedRow(index, None, str(e)))
+    return parsed
+
+
+def import_jobs_from_csv(
+    csv_path="job_title_des.csv",
+    limit=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    workers=1,
+    upsert=False,
+    resume=True,
+    dry_run=False,
+    sync=False,
+    claim_unsourced=False,
+):
     """
     Import jobs from job_title_des.csv file.
 
+    The file is streamed chunk_size rows at a time and each chunk is
+    committed before the next one is read, so memory stays flat.
+
     Args:
-        csv_path: Path to the CSV file
+        csv_path: Path to the CSV file (.csv, .csv.gz, .zip, or a Parquet /
+            Arrow file with the same column names)
         limit: Maximum number of jobs to import (for testing)
+        batch_size: Number of jobs inserted per bulk_create transaction
+        chunk_size: Number of CSV rows read into memory at once
+        workers: Number of processes parsing chunks (database writes always
+            happen in this process)
+        upsert: Match rows on title + company and update changed jobs
+            instead of skipping every title that already exists
+        resume: Continue from the checkpoint left by an interrupted run
+        dry_run: Parse and dedupe the file without writing anything
+        sync: Treat the file as the full catalog: upsert every row, then
+            deactivate jobs from this source that are no longer in it
+        claim_unsourced: With sync, also claim (and so possibly deactivate)
+            jobs that have no source yet, not just the ones the file matches
     """
     # Check if file exists
     if not os.path.exists(csv_path):
@@ -277,102 +370,45 @@ def import_jobs_from_csv(csv_path="job_title_des.csv", limit=None):
         return
 
     print(f"📂 Reading CSV from: {csv_path}")
+    if limit:
+        print(f"⚠️ Limiting to {limit} records for testing")
 
     try:
-        # Read CSV
-        df = pd.read_csv(csv_path)
-        print(f"✅ Found {len(df)} records in dataset")
-
-        # Limit records if specified
-        if limit:
-            df = df.head(limit)
-            print(f"⚠️ Limiting to {limit} records for testing")
-
-        imported_count = 0
-        skipped_count = 0
-        error_count = 0
-
-        # Iterate through rows
-        for index, row in df.iterrows():
-            try:
-                # Get title and description
-                title = str(row["Job Title"]) if not pd.isna(row["Job Title"]) else ""
-                description = (
-                    str(row["Job Description"])
-                    if not pd.isna(row["Job Description"])
-                    else ""
-                )
-
-                # Skip if title is missing
-                if not title or title.strip() == "":
-                    skipped_count += 1
-                    continue
-
-                # Check if already exists (based on title only)
-                if Job.objects.filter(title=title.strip()).exists():
-                    skipped_count += 1
-                    continue
-
-                # Extract information
-                skills_list = extract_skills(description)
-                salary_min, salary_max, currency = parse_salary(description)
-                experience_level = parse_experience_level(description)
-                job_type = parse_job_type(description)
-
-                # Try to extract location (optional)
-                location = ""
-                if "bangalore" in description.lower():
-                    location = "Bangalore"
-                elif "pune" in description.lower():
-                    location = "Pune"
-                elif "mumbai" in description.lower():
-                    location = "Mumbai"
-                elif "delhi" in description.lower():
-                    location = "Delhi"
-                elif "hyderabad" in description.lower():
-                    location = "Hyderabad"
-                elif "chennai" in description.lower():
-                    location = "Chennai"
-
-                # Extract company name
-                company = extract_company(description, title)
-
-                # Create Job object
-                job = Job(
-                    title=title.strip(),
-                    company=company,
-                    location=location,
-                    description=description,
-                    required_skills=skills_list,
-                    experience_level=experience_level,
-                    job_type=job_type,
-                    salary_min=salary_min,
-                    salary_max=salary_max,
-                    salary_currency=currency,
-                    is_active=True,
-                )
-
-                job.save()
-                imported_count += 1
-
-                # Progress indicator
-                if imported_count % 100 == 0:
-                    print(f"   📝 Imported {imported_count} jobs...")
-
-            except Exception as e:
-                error_count += 1
-                print(f"   ⚠️ Error importing row {index}: {e}")
-                continue
+        stats = run_import(
+            "titles",
+            csv_path,
+            TITLES_CSV_COLUMNS,
+            parse_titles_chunk,
+            # Without upsert, skip rows already imported (by title only)
+            dedupe_fields=["title"],
+            limit=limit,
+            batch_size=batch_size,
+            chunk_size=chunk_size,
+            workers=workers,
+            upsert=upsert,
+            resume=resume,
+            dry_run=dry_run,
+            sync=sync,
+            claim_unsourced=claim_unsourced,
+        )
 
         # Summary
         print(f"\n{'='*50}")
         print(f" IMPORT COMPLETE!")
         print(f"{'='*50}")
-        print(f" Imported: {imported_count} jobs")
-        print(f"⏭ Skipped: {skipped_count} jobs")
-        print(f" Errors: {error_count} jobs")
+        print(f" Read: {stats['read']} records")
+        print(f" Imported: {stats['inserted']} jobs ({stats['rows_per_second']:,.0f} rows/s)")
+        if upsert or sync:
+            print(f" Updated: {stats['updated']} jobs")
+            print(f" Unchanged: {stats['unchanged']} jobs")
+        if sync:
+            print(f" Deactivated: {stats['deactivated']} jobs")
+        print(f"⏭ Skipped: {stats['skipped']} jobs")
+        print(f" Errors: {stats['errors']} jobs")
         print(f" Total in database: {Job.objects.count()} jobs")
+        print(f" Catalog version: {stats['catalog_version']}")
         print(f"{'='*50}")
+        return stats
 
     except Exception as e:
         print(f" Error reading CSV: {e}")
@@ -6,6 +6,9 @@ Usage:
     python manage.py shell
     from jobs.import_kaggle_dataset import import_jobs_dataset
     import_jobs_dataset()
+
+Or from the command line (prints a JSON throughput summary):
+    python manage.py import_jobs --source kaggle --path jobs.csv
 """
 
 import os
@@ -14,8 +17,26 @@ import json
 import opendatasets as od
 import pandas as pd
 from jobs.models import Job
+from jobs.import_pipeline import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    ParsedRow,
+    run_import,
+)
+from jobs.import_parsing import clean_salary_columns, kaggle_experience_level_column
 from datetime import datetime
 
+# CSV header -> attribute name on the rows handed to the import loop
+KAGGLE_CSV_COLUMNS = {
+    "Job Title": "title",
+    "Company": "company",
+    "Job Description": "description",
+    "Required Skills": "required_skills",
+    "Location": "location",
+    "Salary": "salary",
+    "Posted Date": "posted_date",
+}
+
 
 def download_kaggle_dataset(
     dataset_url="kshitizregmi/jobs-and-job-description", download_dir="./kaggle_data"
@@ -119,8 +140,8 @@ def extract_skills(description, required_skills):
         if skill in text:
             found_skills.append(skill.title())
 
-    # Remove duplicates
-    return list(set(found_skills))
+    # Remove duplicates, stable order
+    return sorted(set(found_skills))
 
 
 def clean_salary(salary_str):
@@ -173,13 +194,100 @@ def parse_experience_level(title, description):
         return ""
 
 
-def import_jobs_dataset(csv_path=None, limit=None):
+def parse_kaggle_chunk(offset, chunk):
+    """
+    Parse one chunk of the Kaggle jobs.csv into ParsedRow records.
+    Does not touch the database, so it can run in a worker process.
+    """
+    # Clean text columns and parse salary and level for the whole chunk
+    titles = chunk["title"].str.strip()
+    descriptions = chunk["description"].fillna("").str.strip()
+    chunk = pd.concat(
+        [
+            chunk.assign(
+                title=titles,
+                company=chunk["company"].str.strip(),
+                description=descriptions,
+                required_skills=chunk["required_skills"].fillna("").str.strip(),
+                location=chunk["location"].fillna("").str.strip(),
+                experience_level=kaggle_experience_level_column(titles, descriptions),
+            ),
+            clean_salary_columns(chunk["salary"]),
+        ],
+        axis=1,
+    ).drop(columns=["salary"])
+
+    parsed = []
+    for index, row in enumerate(chunk.itertuples(index=False), start=offset):
+        try:
+            # Skip if title or company is missing
+            if pd.isna(row.title) or pd.isna(row.company):
+                parsed.append(ParsedRow(index, None, None))
+                continue
+
+            # Parse posted date if available
+            posted_date = None
+            if not pd.isna(row.posted_date):
+                try:
+                    posted_date = pd.to_datetime(row.posted_date).date()
+                except:
+                    pass
+
+            fields = {
+                "title": row.title,
+                "company": row.company,
+                "location": row.location,
+                "description": row.description,
+                "required_skills": extract_skills(row.description, row.required_skills),
+                "experience_level": row.experience_level,
+                "job_type": "Full-time",  # Default value
+                "salary_min": row.salary_min,
+                "salary_max": row.salary_max,
+                "salary_currency": row.salary_currency,
+                "posted_date": posted_date,
+                "is_active": True,
+            }
+            parsed.append(ParsedRow(index, fields, None))
+        except Exception as e:
+            parsed.append(ParsedRow(index, None, str(e)))
+    return parsed
+
+
+def import_jobs_dataset(
+    csv_path=None,
+    limit=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    workers=1,
+    upsert=False,
+    resume=True,
+    dry_run=False,
+    sync=False,
+    claim_unsourced=False,
+):
     """
     Import jobs from the Kaggle dataset CSV file.
 
+    The file is streamed chunk_size rows at a time and each chunk is
+    committed before the next one is read, so memory stays flat.
+
     Args:
-        csv_path: Path to the CSV file. If None, will look in kaggle_data folder
+        csv_path: Path to the CSV file. If None, will look in kaggle_data folder.
+            The Kaggle zip, .csv.gz and Parquet / Arrow files are read directly,
+            without extracting them first.
         limit: Maximum number of jobs to import (for testing)
+        batch_size: Number of jobs inserted per bulk_create transaction
+        chunk_size: Number of CSV rows read into memory at once
+        workers: Number of processes parsing chunks (database writes always
+            happen in this process)
+        upsert: Update jobs whose content changed since the last import
+            instead of skipping every title + company that already exists
+        resume: Continue from the checkpoint left by an interrupted run
+        dry_run: Parse and dedupe the file without writing anything
+        sync: Treat the file as the full catalog: upsert every row, then
+            deactivate jobs from this source that are no longer in it
+        claim_unsourced: With sync, also claim (and so possibly deactivate)
+            jobs that have no source yet, not just the ones the file matches
     """
     # Find the CSV file
     if csv_path is None:
@@ -188,6 +296,10 @@ def import_jobs_dataset(csv_path=None, limit=None):
             "./kaggle_data/jobs-and-job-description/jobs.csv",
             "./kaggle_data/jobs.csv",
             "./jobs.csv",
+            "./jobs-and-job-description.zip",
+            "./kaggle_data/jobs-and-job-description.zip",
+            "./jobs.csv.gz",
+            "./jobs.parquet",
         ]
 
         for path in possible_paths:
@@ -204,104 +316,47 @@ def import_jobs_dataset(csv_path=None, limit=None):
             return
 
     print(f"Reading CSV from: {csv_path}")
-
-    # Read CSV
-    try:
-        df = pd.read_csv(csv_path)
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        return
-
-    print(f"Found {len(df)} records in dataset")
-
-    # Limit records if specified
     if limit:
-        df = df.head(limit)
         print(f"Limiting to {limit} records for testing")
 
-    imported_count = 0
-    skipped_count = 0
-
     # Clear existing jobs (optional - comment out if you want to keep existing data)
     # Job.objects.all().delete()
     # print("Cleared existing jobs")
 
-    # Iterate through rows
-    for index, row in df.iterrows():
-        try:
-            # Skip if title or company is missing
-            if pd.isna(row.get("Job Title")) or pd.isna(row.get("Company")):
-                skipped_count += 1
-                continue
-
-            title = str(row.get("Job Title", "")).strip()
-            company = str(row.get("Company", "")).strip()
-
-            # Check if already exists
-            if Job.objects.filter(title=title, company=company).exists():
-                skipped_count += 1
-                continue
-
-            # Extract data
-            description = str(row.get("Job Description", "")).strip()
-            required_skills = str(row.get("Required Skills", "")).strip()
-            location = (
-                str(row.get("Location", "")).strip()
-                if not pd.isna(row.get("Location"))
-                else ""
-            )
-
-            # Extract skills
-            skills_list = extract_skills(description, required_skills)
-
-            # Parse experience level
-            experience_level = parse_experience_level(title, description)
-
-            # Parse salary
-            salary_str = (
-                str(row.get("Salary", "")) if not pd.isna(row.get("Salary")) else ""
-            )
-            salary_min, salary_max, currency = clean_salary(salary_str)
-
-            # Parse posted date if available
-            posted_date = None
-            if "Posted Date" in row and not pd.isna(row.get("Posted Date")):
-                try:
-                    posted_date = pd.to_datetime(row.get("Posted Date")).date()
-                except:
-                    pass
-
-            # Create Job object
-            job = Job(
-                title=title,
-                company=company,
-                location=location,
-                description=description,
-                required_skills=skills_list,
-                experience_level=experience_level,
-                job_type="Full-time",  # Default value
-                salary_min=salary_min,
-                salary_max=salary_max,
-                salary_currency=currency,
-                posted_date=posted_date,
-                is_active=True,
-            )
-
-            job.save()
-            imported_count += 1
-
-            if imported_count % 100 == 0:
-                print(f"Imported {imported_count} jobs...")
-
-        except Exception as e:
-            print(f"Error importing row {index}: {e}")
-            skipped_count += 1
-            continue
+    try:
+        stats = run_import(
+            "kaggle",
+            csv_path,
+            KAGGLE_CSV_COLUMNS,
+            parse_kaggle_chunk,
+            # Without upsert, skip rows already imported
+            dedupe_fields=["title", "company"],
+            limit=limit,
+            batch_size=batch_size,
+            chunk_size=chunk_size,
+            workers=workers,
+            upsert=upsert,
+            resume=resume,
+            dry_run=dry_run,
+            sync=sync,
+            claim_unsourced=claim_unsourced,
+        )
+    except Exception as e:
+        print(f"Error reading CSV: {e}")
+        return
 
     print(f"\n✅ Import complete!")
-    print(f"   - Imported: {imported_count} jobs")
-    print(f"   - Skipped: {skipped_count} jobs")
+    print(f"   - Read: {stats['read']} records")
+    print(f"   - Imported: {stats['inserted']} jobs ({stats['rows_per_second']:,.0f} rows/s)")
+    if upsert or sync:
+        print(f"   - Updated: {stats['updated']} jobs")
+        print(f"   - Unchanged: {stats['unchanged']} jobs")
+    if sync:
+        print(f"   - Deactivated: {stats['deactivated']} jobs")
+    print(f"   - Skipped: {stats['skipped'] + stats['errors']} jobs")
     print(f"   - Total in database: {Job.objects.count()} jobs")
+    print(f"   - Catalog version: {stats['catalog_version']}")
+    return stats
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+"""
+Column-wise (vectorized) versions of the importer parsers.
+
+Each function takes whole pandas Series from a CSV chunk and returns the
+parsed columns in a few passes with precompiled regexes and keyword masks,
+instead of calling the scalar parse_* helpers once per row. Results match
+the scalar helpers in import_jobs.py / import_kaggle_dataset.py, except that
+numbers the scalar code cannot convert (e.g. a lone ",") or that overflow the
+salary IntegerFields become None instead of raising.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Largest value that fits the Job.salary_* IntegerFields
+MAX_SALARY = 2**31 - 1
+
+
+def _keyword_pattern(keywords):
+    """Compiled alternation that matches if any keyword is a substring."""
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
+def _as_text(series):
+    """Arrow-backed strings, so contains/lower run in native code."""
+    return series.astype("string[pyarrow]")
+
+
+def _contains(series, pattern):
+    return series.str.contains(pattern, regex=True, na=False).to_numpy(dtype=bool)
+
+
+def _select(series, choices, default):
+    """First matching (pattern, value) wins, mirroring an if/elif chain."""
+    conditions = [_contains(series, pattern) for pattern, _ in choices]
+    values = [value for _, value in choices]
+    return pd.Series(
+        np.select(conditions, values, default=default), index=series.index, dtype=object
+    )
+
+
+def _to_int_or_none(series):
+    """'20,000' -> 20000; unconvertible or out-of-range values -> None."""
+    series = series.astype(object).where(series.notna(), "")
+    numbers = pd.to_numeric(series.str.replace(",", "", regex=False), errors="coerce")
+    numbers = numbers.where(numbers <= MAX_SALARY)
+    return numbers.astype("Int64").astype(object).where(numbers.notna(), None)
+
+
+# ---- import_jobs.py (job_title_des.csv) ----
+
+CURRENCY_CHOICES = [
+    (re.compile("₹|INR"), "INR"),
+    (re.compile("€|EUR"), "EUR"),
+    (re.compile("£|GBP"), "GBP"),
+]
+# Same captures as the scalar patterns; the optional leading currency/space
+# prefix never changes the groups, and dropping it avoids retrying the match
+# at every character.
+SALARY_RANGE_RE = re.compile(r"([\d,]+)\s*-\s*[\₹€£$]?\s*([\d,]+)")
+SALARY_SINGLE_RE = re.compile(r"([\d,]+)")
+DIGIT_RE = re.compile(r"\d")
+DASH_RE = re.compile("-")
+
+EXPERIENCE_CHOICES = [
+    (
+        _keyword_pattern(
+            ["senior", "lead", "principal", "architect", "manager", "director"]
+        ),
+        "Senior",
+    ),
+    (
+        _keyword_pattern(
+            ["junior", "entry", "intern", "trainee", "associate", "graduate", "fresher"]
+        ),
+        "Entry",
+    ),
+    (
+        _keyword_pattern(["mid", "intermediate", "experienced", "2-3 years", "3-5 years"]),
+        "Mid",
+    ),
+    (re.compile(r"\d+\+?\s*(?:year|years)"), "Mid"),
+]
+
+JOB_TYPE_CHOICES = [
+    (re.compile("full-time"), "Full-time"),
+    (re.compile("part-time"), "Part-time"),
+    (re.compile("contract"), "Contract"),
+    (re.compile("remote"), "Remote"),
+]
+
+LOCATION_CHOICES = [
+    (re.compile(city.lower()), city)
+    for city in ["Bangalore", "Pune", "Mumbai", "Delhi", "Hyderabad", "Chennai"]
+]
+
+
+def parse_salary_columns(descriptions):
+    """Vectorized parse_salary: DataFrame of salary_min, salary_max, salary_currency."""
+    text = _as_text(descriptions)
+    currency = _select(text, CURRENCY_CHOICES, "USD")
+
+    # Regex extraction is the expensive part: only rows with a digit can
+    # match at all, only those with a "-" can hold a range, and only rows
+    # without a range fall back to the single-number pattern.
+    has_digit = _contains(text, DIGIT_RE)
+    dashed = has_digit & _contains(text, DASH_RE)
+    ranged = text[dashed].str.extract(SALARY_RANGE_RE).reindex(text.index)
+    has_range = ranged[0].notna()
+    single = text[has_digit & ~has_range.to_numpy()].str.extract(SALARY_SINGLE_RE)
+    single = single[0].reindex(text.index)
+
+    salary_min = _to_int_or_none(ranged[0].where(has_range, single))
+    salary_max = _to_int_or_none(ranged[1].where(has_range))
+    return pd.DataFrame(
+        {
+            "salary_min": salary_min,
+            "salary_max": salary_max,
+            "salary_currency": currency,
+        }
+    )
+
+
+def parse_experience_level_column(descriptions):
+    """Vectorized parse_experience_level for job_title_des.csv descriptions."""
+    return _select(_as_text(descriptions).str.lower(), EXPERIENCE_CHOICES, "")
+
+
+def parse_job_type_column(descriptions):
+    """Vectorized parse_job_type; missing descriptions default to Full-time."""
+    return _select(_as_text(descriptions).str.lower(), JOB_TYPE_CHOICES, "Full-time")
+
+
+def parse_location_column(descriptions):
+    """First known city mentioned in the description, else ''."""
+    return _select(_as_text(descriptions).str.lower(), LOCATION_CHOICES, "")
+
+
+# ---- import_kaggle_dataset.py (jobs.csv) ----
+
+# First two digit runs, same as the first two re.findall(r"\d+[\d,]*") hits
+SALARY_NUMBERS_RE = re.compile(r"(\d+[\d,]*)(?:\D+?(\d+[\d,]*))?")
+
+KAGGLE_EXPERIENCE_CHOICES = [
+    (_keyword_pattern(["senior", "lead", "principal", "architect"]), "Senior"),
+    (_keyword_pattern(["junior", "entry", "intern", "trainee", "associate"]), "Entry"),
+    (_keyword_pattern(["mid", "intermediate", "experienced"]), "Mid"),
+]
+
+
+def clean_salary_columns(salaries):
+    """Vectorized clean_salary: DataFrame of salary_min, salary_max, salary_currency."""
+    text = _as_text(salaries).str.strip()
+    currency = _select(text, CURRENCY_CHOICES, "USD")
+    has_digit = _contains(text, DIGIT_RE)
+    numbers = text[has_digit].str.extract(SALARY_NUMBERS_RE).reindex(text.index)
+    return pd.DataFrame(
+        {
+            "salary_min": _to_int_or_none(numbers[0]),
+            "salary_max": _to_int_or_none(numbers[1]),
+            "salary_currency": currency,
+        }
+    )
+
+
+def kaggle_experience_level_column(titles, descriptions):
+    """Vectorized parse_experience_level(title, description) for the Kaggle CSV."""
+    text = _as_text(titles).fillna("") + " " + _as_text(descriptions).fillna("")
+    return _select(text.str.lower(), KAGGLE_EXPERIENCE_CHOICES, "")
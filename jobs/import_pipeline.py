@@ -0,0 +1,687 @@
+"""
+Shared helpers for the job importers (import_jobs.py, import_kaggle_dataset.py).
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+import zipfile
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import django
+import pandas as pd
+from django.db import connections, transaction
+
+from jobs.catalog import (
+    QUERY_CHUNK_SIZE,
+    current_catalog_version,
+    deactivate_jobs,
+    record_catalog_change,
+)
+from jobs.models import ImportCheckpoint, Job
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CHUNK_SIZE = 10000
+
+# Fields rewritten when an upsert hits an existing source_key
+UPSERT_FIELDS = [
+    "title",
+    "company",
+    "location",
+    "description",
+    "required_skills",
+    "experience_level",
+    "job_type",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "posted_date",
+    "is_active",
+    "content_hash",
+    "source",
+    "updated_at",
+]
+
+# Result of parsing one CSV row. `fields` holds Job field values and is None
+# when the row is skipped; `error` is set when parsing the row failed.
+ParsedRow = namedtuple("ParsedRow", ["index", "fields", "error"])
+
+
+class StageTimer:
+    """
+    Wall-clock seconds spent in each import stage (read, parse, dedupe,
+    write). Stages may nest; time spent in an inner stage is not counted
+    for the outer one, so the stage totals add up to the elapsed time.
+    """
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        now = time.perf_counter()
+        if self._stack:
+            outer, started = self._stack[-1]
+            self.seconds[outer] += now - started
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            name, started = self._stack.pop()
+            self.seconds[name] += now - started
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def iterate(self, name, iterable):
+        """Yield from iterable, counting the time spent producing each item."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process and its workers, or None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max(usage, children) / scale, 1)
+
+
+# Extensions handled by pyarrow instead of pandas.read_csv
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+
+
+def iter_source_chunks(
+    path, columns, chunk_size=DEFAULT_CHUNK_SIZE, limit=None, start=0
+):
+    """
+    Stream any supported source file in chunks, reading only the needed
+    columns. Dispatches on the file extension:
+
+    - .csv, and compressed .csv.gz / .bz2 / .xz, decompressed on the fly
+    - .zip, whose CSV member is streamed without extracting it
+    - .parquet / .pq and Arrow IPC (.arrow / .feather), with column projection
+
+    Same arguments and chunks as iter_csv_chunks.
+    """
+    lower = str(path).lower()
+    if lower.endswith(PARQUET_EXTENSIONS + ARROW_EXTENSIONS):
+        return iter_arrow_chunks(path, columns, chunk_size, limit, start)
+    if lower.endswith(".zip"):
+        return iter_zip_chunks(path, columns, chunk_size, limit, start)
+    return iter_csv_chunks(path, columns, chunk_size, limit, start)
+
+
+def _slice_chunks(frames, columns, start):
+    """Drop rows before `start` and map headers to attribute names."""
+    offset = 0
+    for chunk in frames:
+        end = offset + len(chunk)
+        if end > start:
+            if offset < start:
+                chunk = chunk.iloc[start - offset :]
+            chunk = chunk.reindex(columns=list(columns)).rename(columns=columns)
+            yield max(offset, start), chunk
+        offset = end
+
+
+def iter_csv_chunks(
+    csv_path, columns, chunk_size=DEFAULT_CHUNK_SIZE, limit=None, start=0
+):
+    """
+    Stream a CSV file `chunk_size` rows at a time, reading only the needed
+    columns as strings so memory stays flat regardless of file size.
+    `csv_path` may also be a file object.
+
+    Args:
+        columns: Mapping of CSV header -> attribute name used by the importer.
+            Headers missing from the file come back as all-NaN columns.
+        limit: Stop after this many data rows
+        start: Skip data rows before this offset (used to resume an import)
+
+    Yields:
+        (offset, DataFrame) where offset is the index of the chunk's first row
+    """
+    reader = pd.read_csv(
+        csv_path,
+        usecols=lambda name: name in columns,
+        dtype=str,
+        chunksize=chunk_size,
+        nrows=limit,
+    )
+    yield from _slice_chunks(reader, columns, start)
+
+
+def iter_zip_chunks(
+    zip_path, columns, chunk_size=DEFAULT_CHUNK_SIZE, limit=None, start=0
+):
+    """Stream the (first) CSV member of a zip archive, decompressing as it goes."""
+    with zipfile.ZipFile(zip_path) as archive:
+        members = [
+            info
+            for info in archive.infolist()
+            if info.filename.lower().endswith(".csv") and not info.is_dir()
+        ]
+        if not members:
+            raise ValueError(f"No CSV file found in {zip_path}")
+        with archive.open(members[0]) as member:
+            yield from iter_csv_chunks(member, columns, chunk_size, limit, start)
+
+
+def iter_arrow_chunks(
+    path, columns, chunk_size=DEFAULT_CHUNK_SIZE, limit=None, start=0
+):
+    """
+    Stream a Parquet or Arrow IPC file in record batches, reading only the
+    columns in `columns`. Values are cast to strings so the parse stages
+    see the same input as from a CSV file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    def batches():
+        if str(path).lower().endswith(PARQUET_EXTENSIONS):
+            parquet = pq.ParquetFile(path)
+            names = [name for name in columns if name in parquet.schema_arrow.names]
+            yield from parquet.iter_batches(batch_size=chunk_size, columns=names)
+            return
+        # Memory-mapped, so columns that are not selected are never read
+        with pa.memory_map(str(path)) as source:
+            try:
+                reader = pa.ipc.open_file(source)
+                stream = (reader.get_batch(i) for i in range(reader.num_record_batches))
+            except pa.ArrowInvalid:
+                source.seek(0)
+                stream = pa.ipc.open_stream(source)
+            for batch in stream:
+                names = [name for name in columns if name in batch.schema.names]
+                yield batch.select(names)
+
+    def frames():
+        remaining = limit
+        for batch in batches():
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                batch = batch.slice(0, remaining)
+                remaining -= batch.num_rows
+            strings = pa.table(
+                [array.cast(pa.string()) for array in batch.columns],
+                names=batch.schema.names,
+            )
+            yield strings.to_pandas()
+
+    return _slice_chunks(frames(), columns, start)
+
+
+def iter_parsed_chunks(chunks, parse_chunk, workers=1):
+    """
+    Yield parse_chunk(offset, chunk) for every chunk, in input order.
+
+    With workers > 1 chunks are parsed in a ProcessPoolExecutor while the
+    caller keeps doing the database writes in this process. At most
+    2 * workers chunks are in flight, so memory stays bounded, and results
+    come back in file order, so the import is the same for any worker count.
+    parse_chunk must be a module-level function that does not touch the
+    database.
+    """
+    if workers <= 1:
+        for offset, chunk in chunks:
+            yield parse_chunk(offset, chunk)
+        return
+
+    # Don't let forked workers inherit open database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        pending = deque()
+        for offset, chunk in chunks:
+            pending.append(pool.submit(parse_chunk, offset, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def dedupe_key(*values):
+    """Compact 16-byte hash of the fields that identify a duplicate job."""
+    raw = "\x1f".join(str(v) for v in values)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).digest()
+
+
+def source_key(title, company):
+    """Stable identity of a posting across imports (stored on Job.source_key)."""
+    return dedupe_key(title, company).hex()
+
+
+def content_hash(fields):
+    """Hash of a parsed row's Job field values (stored on Job.content_hash)."""
+    raw = json.dumps(fields, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DedupeIndex:
+    """
+    In-memory set of dedupe keys for jobs already in the database, loaded in
+    one streamed scan. Keys accepted during the run are added too, so
+    duplicates within the same file are caught without per-row queries.
+
+    The source_keys already taken are loaded as well: new jobs are stored
+    with their source_key, so a later upsert or sync run matches them
+    instead of inserting them again, and the key is unique.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        self.keys = set()
+        self.source_keys = set()
+        rows = Job.objects.values_list("source_key", *self.fields).iterator(
+            chunk_size=5000
+        )
+        for key, *values in rows:
+            self.keys.add(dedupe_key(*values))
+            if key:
+                self.source_keys.add(key)
+
+    def add_if_new(self, source_key, *values):
+        """
+        Return True (and remember both keys) if this job has not been seen,
+        neither by its dedupe fields nor by its source_key.
+        """
+        key = dedupe_key(*values)
+        if key in self.keys or source_key in self.source_keys:
+            return False
+        self.keys.add(key)
+        self.source_keys.add(source_key)
+        return True
+
+
+class UpsertIndex:
+    """
+    source_key -> (content_hash, id, is_active, source) for every imported
+    job, loaded in one streamed scan, so the upsert mode only writes rows
+    that are new or changed and sync mode knows which jobs went missing.
+
+    Jobs without a source_key (added by hand, or before keys existed) are
+    adopted: the oldest job per title + company gets its key, as migration
+    0004 does, so upserts update it instead of inserting a copy. Jobs with
+    no source yet are only claimed when a row matches them (classify calls
+    them changed, so the rewrite records the source); with claim_source
+    every one of them is claimed up front, so a sync can deactivate them
+    and unkeyed duplicates of an adopted job count as missing too. Adopted
+    keys and claims are written unless dry_run.
+    """
+
+    def __init__(self, claim_source="", dry_run=False):
+        self.jobs = {}
+        self.seen = set()
+        # (id, is_active, source) of unkeyed duplicates
+        self.unkeyed = []
+        rows = (
+            Job.objects.exclude(source_key=None)
+            .values_list("source_key", "content_hash", "id", "is_active", "source")
+            .iterator(chunk_size=5000)
+        )
+        claimed = []
+        for key, digest, job_id, is_active, source in rows:
+            if claim_source and not source:
+                source = claim_source
+                claimed.append(job_id)
+            self.jobs[bytes.fromhex(key)] = (digest, job_id, is_active, source)
+
+        adopted = []
+        rows = (
+            Job.objects.filter(source_key=None)
+            .order_by("id")
+            .values_list(
+                "title", "company", "content_hash", "id", "is_active", "source"
+            )
+            .iterator(chunk_size=5000)
+        )
+        for title, company, digest, job_id, is_active, source in rows:
+            if claim_source and not source:
+                source = claim_source
+                claimed.append(job_id)
+            raw_key = dedupe_key(title, company)
+            if raw_key in self.jobs:
+                self.unkeyed.append((job_id, is_active, source))
+            else:
+                self.jobs[raw_key] = (digest, job_id, is_active, source)
+                adopted.append(Job(id=job_id, source_key=raw_key.hex()))
+
+        if not dry_run and (adopted or claimed):
+            with transaction.atomic():
+                Job.objects.bulk_update(adopted, ["source_key"], batch_size=1000)
+                for start in range(0, len(claimed), QUERY_CHUNK_SIZE):
+                    Job.objects.filter(
+                        id__in=claimed[start : start + QUERY_CHUNK_SIZE]
+                    ).update(source=claim_source)
+        self.adopted = len(adopted)
+        self.claimed = len(claimed)
+
+    def classify(self, key, digest):
+        """Return "new", "changed", "unchanged" or "duplicate" (seen earlier this run)."""
+        raw_key = bytes.fromhex(key)
+        if raw_key in self.seen:
+            return "duplicate"
+        self.seen.add(raw_key)
+        stored = self.jobs.get(raw_key)
+        if stored is None:
+            return "new"
+        stored_digest, _, is_active, source = stored
+        # A deactivated job that reappears is reactivated by rewriting it,
+        # and a job without a source is claimed by rewriting it
+        if stored_digest == digest and is_active and source:
+            return "unchanged"
+        return "changed"
+
+    def missing_ids(self, source):
+        """
+        Ids of active jobs from `source` whose key was not seen this run,
+        plus its active unkeyed duplicates.
+        """
+        missing = [
+            job_id
+            for key, (_, job_id, is_active, job_source) in self.jobs.items()
+            if is_active and job_source == source and key not in self.seen
+        ]
+        missing.extend(
+            job_id
+            for job_id, is_active, job_source in self.unkeyed
+            if is_active and job_source == source
+        )
+        return missing
+
+
+class JobBatchWriter:
+    """
+    Accumulate unsaved Job objects and insert them with bulk_create,
+    one transaction per batch, instead of one autocommit save() per row.
+
+    With upsert=True rows whose source_key already exists are updated in
+    place (INSERT ... ON CONFLICT (source_key) DO UPDATE). With
+    dry_run=True batches are counted but nothing is written.
+
+    Each committed batch is logged as a CatalogChange in the same
+    transaction.
+    """
+
+    def __init__(
+        self,
+        batch_size=DEFAULT_BATCH_SIZE,
+        upsert=False,
+        dry_run=False,
+        timer=None,
+        source="",
+    ):
+        self.batch_size = max(1, int(batch_size))
+        self.source = source
+        self.upsert = upsert
+        self.dry_run = dry_run
+        self.timer = timer or StageTimer()
+        self.pending = []
+        self.inserted = 0
+        self.updated = 0
+        self.failed = 0
+        self.started = time.perf_counter()
+
+    @property
+    def written(self):
+        return self.inserted + self.updated
+
+    def add(self, job, is_update=False):
+        self.pending.append((job, is_update))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.timer.stage("write"):
+            self._write(self.pending)
+        self.pending = []
+
+    def _write(self, batch):
+        jobs = [job for job, _ in batch]
+        try:
+            if self.dry_run:
+                pass
+            elif self.upsert:
+                with transaction.atomic():
+                    Job.objects.bulk_create(
+                        jobs,
+                        batch_size=self.batch_size,
+                        update_conflicts=True,
+                        unique_fields=["source_key"],
+                        update_fields=UPSERT_FIELDS,
+                    )
+                    self._log_changes(batch)
+            else:
+                with transaction.atomic():
+                    Job.objects.bulk_create(jobs, batch_size=self.batch_size)
+                    self._log_changes(batch)
+        except Exception as e:
+            self.failed += len(batch)
+            print(f"   ⚠️ Error writing batch of {len(batch)} jobs: {e}")
+            return
+        updates = sum(1 for _, is_update in batch if is_update)
+        self.updated += updates
+        self.inserted += len(batch) - updates
+        verb = "Would import" if self.dry_run else "Imported"
+        print(f"   {verb} {self.written} jobs ({self.rows_per_second:,.0f} rows/s)")
+
+    def _log_changes(self, batch):
+        # Backends that can't return ids from bulk_create leave pk unset
+        missing = [
+            job.source_key for job, _ in batch if job.pk is None and job.source_key
+        ]
+        ids = {}
+        for start in range(0, len(missing), QUERY_CHUNK_SIZE):
+            ids.update(
+                Job.objects.filter(
+                    source_key__in=missing[start : start + QUERY_CHUNK_SIZE]
+                ).values_list("source_key", "id")
+            )
+        inserted, updated = [], []
+        for job, is_update in batch:
+            job_id = job.pk or ids.get(job.source_key)
+            if job_id:
+                (updated if is_update else inserted).append(job_id)
+        record_catalog_change(self.source, inserted, updated)
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.perf_counter() - self.started
+        return self.written / elapsed if elapsed > 0 else 0.0
+
+
+def checkpoint_name(label, path):
+    """Checkpoint key for one version of a source file (path, size, mtime)."""
+    stat = os.stat(path)
+    return f"{label}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"[:500]
+
+
+def load_checkpoint(name):
+    checkpoint = ImportCheckpoint.objects.filter(source=name).first()
+    return checkpoint.offset if checkpoint else 0
+
+
+def save_checkpoint(name, offset):
+    ImportCheckpoint.objects.update_or_create(source=name, defaults={"offset": offset})
+
+
+def clear_checkpoint(name):
+    ImportCheckpoint.objects.filter(source=name).delete()
+
+
+def run_import(
+    label,
+    csv_path,
+    columns,
+    parse_chunk,
+    dedupe_fields,
+    limit=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    workers=1,
+    upsert=False,
+    resume=True,
+    dry_run=False,
+    sync=False,
+    claim_unsourced=False,
+):
+    """
+    Stream, parse and write one source file; shared by both importers.
+
+    Without upsert, rows whose dedupe_fields (or source_key) match an
+    existing job are skipped; new jobs still get their source_key and
+    content_hash, so later upsert or sync runs match them. With upsert,
+    rows are matched on source_key (title + company) and only new or
+    changed rows (by content_hash) are written.
+
+    After every committed chunk the processed offset is checkpointed, so a
+    rerun on the same unchanged file resumes where an interrupted run
+    stopped (pass resume=False to start over). A dry run parses and dedupes
+    but writes neither jobs nor checkpoints.
+
+    sync=True implies upsert and treats the file as the complete catalog
+    for this source: once every row is written, active jobs from the same
+    source that were not in the file are deactivated in one transaction.
+    Jobs with no source yet (hand-made or from before sources were
+    recorded) are only claimed when a row in the file matches them, so
+    they are never deactivated; claim_unsourced=True claims all of them
+    for this source first, see UpsertIndex.
+    Sync always reads the whole file, so it cannot be combined with limit
+    and ignores checkpoints.
+
+    Returns a dict of counters (read, inserted, updated, unchanged,
+    skipped, errors, deactivated), the catalog_version before and after
+    the run, overall rows_per_second and elapsed_seconds, and stage_seconds
+    with the time spent reading, parsing, deduping and writing. With
+    workers > 1, parse is the time spent waiting on workers.
+    """
+    if sync and limit:
+        raise ValueError("Sync needs the complete source file; drop the limit")
+    upsert = upsert or sync
+
+    started = time.perf_counter()
+    timer = StageTimer()
+    previous_version = current_catalog_version()
+    checkpoint = checkpoint_name(label, csv_path)
+    start = load_checkpoint(checkpoint) if resume and not sync else 0
+    if start:
+        print(f"   Resuming after row {start}")
+
+    writer = JobBatchWriter(
+        batch_size=batch_size,
+        upsert=upsert,
+        dry_run=dry_run,
+        timer=timer,
+        source=label,
+    )
+    with timer.stage("dedupe"):
+        if upsert:
+            index = UpsertIndex(
+                claim_source=label if sync and claim_unsourced else "",
+                dry_run=dry_run,
+            )
+            if index.adopted or index.claimed:
+                verb = "Would adopt" if dry_run else "Adopted"
+                print(
+                    f"   {verb} {index.adopted} unkeyed jobs, "
+                    f"claimed {index.claimed} jobs without a source"
+                )
+        else:
+            existing = DedupeIndex(dedupe_fields)
+    stats = {"read": 0, "unchanged": 0, "skipped": 0, "errors": 0, "deactivated": 0}
+
+    chunks = timer.iterate(
+        "read",
+        iter_source_chunks(
+            csv_path, columns, chunk_size=chunk_size, limit=limit, start=start
+        ),
+    )
+    for parsed in timer.iterate(
+        "parse", iter_parsed_chunks(chunks, parse_chunk, workers=workers)
+    ):
+        stats["read"] += len(parsed)
+
+        # Writer flushes inside this loop are counted as write, not dedupe
+        with timer.stage("dedupe"):
+            for row in parsed:
+                if row.error:
+                    stats["errors"] += 1
+                    print(f"   ⚠️ Error importing row {row.index}: {row.error}")
+                    continue
+                if row.fields is None:
+                    stats["skipped"] += 1
+                    continue
+
+                key = source_key(row.fields["title"], row.fields["company"])
+                digest = content_hash(row.fields)
+                job = Job(
+                    **row.fields, source_key=key, content_hash=digest, source=label
+                )
+                if upsert:
+                    status = index.classify(key, digest)
+                    if status == "unchanged":
+                        stats["unchanged"] += 1
+                    elif status == "duplicate":
+                        stats["skipped"] += 1
+                    else:
+                        writer.add(job, is_update=(status == "changed"))
+                elif existing.add_if_new(key, *(row.fields[f] for f in dedupe_fields)):
+                    writer.add(job)
+                else:
+                    stats["skipped"] += 1
+
+        # Commit this chunk, then record how far we got
+        writer.flush()
+        if parsed and not writer.failed and not dry_run:
+            with timer.stage("write"):
+                save_checkpoint(checkpoint, parsed[-1].index + 1)
+
+    if not writer.failed and not dry_run:
+        clear_checkpoint(checkpoint)
+
+    if sync:
+        # A row that failed to parse has no key, so its job would look stale
+        if writer.failed or stats["errors"]:
+            print("   ⚠️ Skipping deactivation because some rows failed")
+        else:
+            with timer.stage("write"):
+                missing = index.missing_ids(label)
+                if not dry_run:
+                    deactivate_jobs(missing, source=label)
+            stats["deactivated"] = len(missing)
+            verb = "Would deactivate" if dry_run else "Deactivated"
+            print(f"   {verb} {len(missing)} jobs missing from the source")
+
+    elapsed = time.perf_counter() - started
+    stats.update(
+        inserted=writer.inserted,
+        updated=writer.updated,
+        errors=stats["errors"] + writer.failed,
+        rows_per_second=stats["read"] / elapsed if elapsed > 0 else 0.0,
+        elapsed_seconds=elapsed,
+        stage_seconds=dict(timer.seconds),
+        previous_catalog_version=previous_version,
+        catalog_version=current_catalog_version(),
+    )
+    return stats
@@ -0,0 +1,34 @@
+"""
+Management command to warm the job feature store
+"""
+
+from django.core.management.base import BaseCommand
+
+from jobs.ml.feature_store import refresh_job_features
+
+
+class Command(BaseCommand):
+    help = "Featurize active jobs whose content changed since the last run"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Number of jobs featurized per batch",
+        )
+
+    def handle(self, *args, **options):
+        result = refresh_job_features(chunk_size=options["chunk_size"])
+        if result is None:
+            self.stdout.write(
+                self.style.WARNING("Model artifacts not found. Run train_rf.py first.")
+            )
+            return
+
+        featurized, total = result
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Feature store up to date: {featurized} of {total} jobs re-featurized"
+            )
+        )
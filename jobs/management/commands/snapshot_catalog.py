@@ -0,0 +1,45 @@
+"""
+Management command to export the active job catalog to Parquet
+"""
+
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from jobs.ml.snapshot import SNAPSHOT_COLUMNS, write_catalog_snapshot
+
+
+class Command(BaseCommand):
+    help = "Write active jobs to a compressed columnar snapshot for training"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            type=str,
+            default=str(
+                Path(settings.BASE_DIR) / "jobs" / "ml" / "data" / "catalog.parquet"
+            ),
+            help="Destination Parquet file",
+        )
+
+    def handle(self, *args, **options):
+        output = Path(options["output"])
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output.with_name(output.name + ".tmp")
+
+        rows = (
+            Job.objects.filter(is_active=True)
+            .order_by("id")
+            .values_list(*SNAPSHOT_COLUMNS)
+            .iterator(chunk_size=2000)
+        )
+        count = write_catalog_snapshot(rows, str(tmp_path))
+        # Replace atomically so readers never see a half-written snapshot
+        os.replace(tmp_path, output)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {count} active jobs to {output}")
+        )
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 09:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_jobapplication'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFeatureVector',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feature_vector', serialize=False, to='jobs.job')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('featurizer_version', models.CharField(db_index=True, max_length=64)),
+                ('vector', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:03
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_source_keys(apps, schema_editor):
+    """
+    Give existing jobs the same source_key the importers' upsert mode computes
+    (see jobs.import_pipeline.source_key), so re-imports update them instead
+    of inserting copies. Only the oldest job per title + company gets a key.
+    """
+    Job = apps.get_model("jobs", "Job")
+    seen = set()
+    batch = []
+    for job in Job.objects.order_by("id").only("id", "title", "company").iterator():
+        raw = "\x1f".join([job.title, job.company])
+        key = hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+        if key in seen:
+            continue
+        seen.add(key)
+        job.source_key = key
+        batch.append(job)
+        if len(batch) >= 1000:
+            Job.objects.bulk_update(batch, ["source_key"])
+            batch = []
+    if batch:
+        Job.objects.bulk_update(batch, ["source_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0003_jobfeaturevector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=500, unique=True)),
+                ('offset', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='source_key',
+            field=models.CharField(blank=True, editable=False, max_length=32, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill_source_keys, migrations.RunPython.noop),
+    ]
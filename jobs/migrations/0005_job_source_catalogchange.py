@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 10:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_source_key_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogChange',
+            fields=[
+                ('version', models.BigAutoField(primary_key=True, serialize=False)),
+                ('source', models.CharField(blank=True, max_length=20)),
+                ('inserted_ids', models.JSONField(default=list)),
+                ('updated_ids', models.JSONField(default=list)),
+                ('deactivated_ids', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['version'],
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='source',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+    ]
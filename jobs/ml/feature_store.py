@@ -0,0 +1,251 @@
+"""
+Content-hash keyed store for job feature vectors.
+
+Every job's vector is cached in JobFeatureVector together with a hash of its
+description and skills and a fingerprint of the fitted featurizer. Callers ask
+for a feature matrix and only jobs whose hash (or the featurizer) changed are
+re-featurized, so repeated runs cost proportional to catalog churn.
+
+The store is filled by training, imports and precompute_job_features. Imports
+only refresh the jobs in their catalog changes (jobs.catalog.changes_since)
+and drop the vectors of deactivated jobs. Request handlers read it with
+store=False: missing vectors are computed in memory but never written from a
+GET.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import joblib
+import numpy as np
+from django.conf import settings
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from jobs.catalog import QUERY_CHUNK_SIZE, changes_since
+from jobs.models import Job, JobFeatureVector
+from jobs.ml.features import FEATURIZER_VERSION, load_vocab, transform_jobs
+
+MODELS_DIR = Path(settings.BASE_DIR) / "jobs" / "ml" / "models"
+RF_FILENAME = "rf_model.joblib"
+TFIDF_FILENAME = "tfidf.joblib"
+VOCAB_FILENAME = "skills_vocab.json"
+# featurizer_fingerprint of the saved TF-IDF + vocabulary, written by training
+FINGERPRINT_FILENAME = "featurizer.sha256"
+
+# path -> (mtime, loaded object); artifacts are loaded once per process
+_artifact_cache = {}
+
+
+def job_content_hash(description: str, skills: List[str]) -> str:
+    """Hash of the inputs transform_job actually looks at."""
+    normalized_skills = sorted({str(s).strip().lower() for s in (skills or [])})
+    payload = json.dumps([description or "", normalized_skills], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def featurizer_fingerprint(tfidf: TfidfVectorizer, skills_vocab: List[str]) -> str:
+    """Identify a fitted TF-IDF + skills vocabulary pair."""
+    h = hashlib.sha256()
+    h.update(FEATURIZER_VERSION.encode("utf-8"))
+    h.update(json.dumps(tfidf.vocabulary_, sort_keys=True, default=int).encode("utf-8"))
+    h.update(np.asarray(tfidf.idf_, dtype=np.float64).tobytes())
+    h.update(json.dumps(list(skills_vocab)).encode("utf-8"))
+    return h.hexdigest()
+
+
+def save_fingerprint(fingerprint: str, models_dir: Path = MODELS_DIR) -> None:
+    (Path(models_dir) / FINGERPRINT_FILENAME).write_text(fingerprint + "\n")
+
+
+def _load_artifact(path: Path, loader):
+    """Load `path` once per process, again only when the file changes."""
+    mtime = path.stat().st_mtime_ns
+    cached = _artifact_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, loader(path))
+        _artifact_cache[path] = cached
+    return cached[1]
+
+
+def _fingerprint_for(tfidf_path: Path, vocab_path: Path, models_dir: Path) -> str:
+    tfidf = _load_artifact(tfidf_path, joblib.load)
+    skills_vocab = _load_artifact(vocab_path, lambda p: load_vocab(str(p)))
+    fingerprint_path = models_dir / FINGERPRINT_FILENAME
+    # The saved fingerprint is only trusted if written after the artifacts
+    if fingerprint_path.exists() and fingerprint_path.stat().st_mtime_ns >= max(
+        tfidf_path.stat().st_mtime_ns, vocab_path.stat().st_mtime_ns
+    ):
+        return fingerprint_path.read_text().strip()
+    return featurizer_fingerprint(tfidf, skills_vocab)
+
+
+def load_featurizer(
+    models_dir: Path = MODELS_DIR,
+) -> Optional[Tuple[TfidfVectorizer, List[str], str]]:
+    """
+    (tfidf, skills_vocab, fingerprint) from the saved artifacts, or None if
+    training has not been run. Cached per process until the files change.
+    """
+    models_dir = Path(models_dir)
+    tfidf_path = models_dir / TFIDF_FILENAME
+    vocab_path = models_dir / VOCAB_FILENAME
+    if not tfidf_path.exists() or not vocab_path.exists():
+        return None
+    key = (tfidf_path.stat().st_mtime_ns, vocab_path.stat().st_mtime_ns)
+    cached = _artifact_cache.get(models_dir)
+    if cached is None or cached[0] != key:
+        cached = (
+            key,
+            (
+                _load_artifact(tfidf_path, joblib.load),
+                _load_artifact(vocab_path, lambda p: load_vocab(str(p))),
+                _fingerprint_for(tfidf_path, vocab_path, models_dir),
+            ),
+        )
+        _artifact_cache[models_dir] = cached
+    return cached[1]
+
+
+def load_model(models_dir: Path = MODELS_DIR):
+    """The trained Random Forest, or None; cached like load_featurizer."""
+    rf_path = Path(models_dir) / RF_FILENAME
+    if not rf_path.exists():
+        return None
+    return _load_artifact(rf_path, joblib.load)
+
+
+def pack_vector(vec: np.ndarray) -> bytes:
+    """Store only the non-zero entries: int32 indices followed by float32 values."""
+    idx = np.flatnonzero(vec).astype(np.int32)
+    vals = vec[idx].astype(np.float32)
+    return idx.tobytes() + vals.tobytes()
+
+
+def unpack_vector(blob: bytes, width: int) -> np.ndarray:
+    blob = bytes(blob)
+    n = len(blob) // 8
+    idx = np.frombuffer(blob, dtype=np.int32, count=n)
+    vals = np.frombuffer(blob, dtype=np.float32, count=n, offset=n * 4)
+    vec = np.zeros(width, dtype=float)
+    vec[idx] = vals
+    return vec
+
+
+def get_job_features(
+    jobs,
+    tfidf: TfidfVectorizer,
+    skills_vocab: List[str],
+    fingerprint: Optional[str] = None,
+    store: bool = True,
+) -> Tuple[np.ndarray, int]:
+    """
+    Return (feature matrix in the order of `jobs`, number of jobs re-featurized).
+    Stale or missing vectors are computed in one batch and, with store=True,
+    written back. Pass the fingerprint from load_featurizer to avoid hashing
+    the TF-IDF vocabulary again.
+    """
+    jobs = list(jobs)
+    version = fingerprint or featurizer_fingerprint(tfidf, skills_vocab)
+    width = len(tfidf.vocabulary_) + len(skills_vocab)
+    X = np.zeros((len(jobs), width), dtype=float)
+    if not jobs:
+        return X, 0
+
+    hashes = [job_content_hash(j.description, j.required_skills) for j in jobs]
+
+    stored = {}
+    job_ids = [j.id for j in jobs]
+    for start in range(0, len(job_ids), QUERY_CHUNK_SIZE):
+        rows = JobFeatureVector.objects.filter(
+            job_id__in=job_ids[start : start + QUERY_CHUNK_SIZE],
+            featurizer_version=version,
+        ).values_list("job_id", "content_hash", "vector")
+        for job_id, content_hash, blob in rows:
+            stored[job_id] = (content_hash, blob)
+
+    stale = []
+    for i, job in enumerate(jobs):
+        hit = stored.get(job.id)
+        if hit and hit[0] == hashes[i]:
+            X[i] = unpack_vector(hit[1], width)
+        else:
+            stale.append(i)
+
+    if stale:
+        X[stale] = transform_jobs(
+            [jobs[i].description or "" for i in stale],
+            [jobs[i].required_skills or [] for i in stale],
+            tfidf,
+            skills_vocab,
+        )
+    if stale and store:
+        JobFeatureVector.objects.bulk_create(
+            [
+                JobFeatureVector(
+                    job_id=jobs[i].id,
+                    content_hash=hashes[i],
+                    featurizer_version=version,
+                    vector=pack_vector(X[i]),
+                )
+                for i in stale
+            ],
+            batch_size=QUERY_CHUNK_SIZE,
+            update_conflicts=True,
+            unique_fields=["job"],
+            update_fields=["content_hash", "featurizer_version", "vector", "updated_at"],
+        )
+
+    return X, len(stale)
+
+
+def _jobs_to_refresh(job_ids, chunk_size):
+    jobs_qs = Job.objects.filter(is_active=True).only(
+        "id", "description", "required_skills"
+    )
+    if job_ids is None:
+        yield from jobs_qs.iterator(chunk_size=chunk_size)
+        return
+    for start in range(0, len(job_ids), QUERY_CHUNK_SIZE):
+        yield from jobs_qs.filter(id__in=job_ids[start : start + QUERY_CHUNK_SIZE])
+
+
+def refresh_job_features(
+    chunk_size: int = 2000, models_dir: Path = MODELS_DIR, since: Optional[int] = None
+):
+    """
+    Bring the stored vectors of every active job up to date and drop those
+    of deactivated jobs. With `since` (a catalog version), only the jobs
+    the catalog changed after it are looked at. Returns (re-featurized,
+    total), or None when there are no model artifacts.
+    """
+    featurizer = load_featurizer(models_dir)
+    if featurizer is None:
+        return None
+    tfidf, skills_vocab, fingerprint = featurizer
+
+    if since is None:
+        job_ids = None
+        JobFeatureVector.objects.filter(job__is_active=False).delete()
+    else:
+        delta = changes_since(since)
+        job_ids = delta.upserted_ids
+        dropped = delta.deactivated_ids
+        for start in range(0, len(dropped), QUERY_CHUNK_SIZE):
+            JobFeatureVector.objects.filter(
+                job_id__in=dropped[start : start + QUERY_CHUNK_SIZE]
+            ).delete()
+
+    total = featurized = 0
+    chunk = []
+    for job in _jobs_to_refresh(job_ids, chunk_size):
+        chunk.append(job)
+        if len(chunk) >= chunk_size:
+            featurized += get_job_features(chunk, tfidf, skills_vocab, fingerprint)[1]
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        featurized += get_job_features(chunk, tfidf, skills_vocab, fingerprint)[1]
+        total += len(chunk)
+    return featurized, total
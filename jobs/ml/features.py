@@ -2,8 +2,12 @@ import json
 from typing import List, Dict, Tuple
 
 import numpy as np
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+# Bump whenever transform_job/transform_jobs change their output layout so
+# stored feature vectors are recomputed.
+FEATURIZER_VERSION = "1"
 
 COMMON_SKILLS = [
     "python",
@@ -104,6 +108,50 @@ def transform_job(
     return np.concatenate([desc_vec, skill_vec])
 
 
+def transform_jobs(
+    descriptions: List[str],
+    skills_lists: List[List[str]],
+    tfidf: TfidfVectorizer,
+    skills_vocab: List[str],
+) -> np.ndarray:
+    """Batch version of transform_job: one row per (description, skills) pair."""
+    desc_mat = tfidf.transform([d or "" for d in descriptions]).toarray()
+    skill_mat = skills_incidence(skills_lists, skills_vocab).toarray()
+    return np.hstack([desc_mat, skill_mat])
+
+
+def skills_incidence(
+    skills_lists: List[List[str]], skills_vocab: List[str]
+) -> sparse.csr_matrix:
+    """Binary (len(skills_lists) x len(skills_vocab)) matrix of known skills."""
+    vocab_index = {sk: i for i, sk in enumerate(skills_vocab)}
+    rows, cols = [], []
+    for row, skills in enumerate(skills_lists):
+        for col in {vocab_index.get(str(s).strip().lower()) for s in skills or []}:
+            if col is not None:
+                rows.append(row)
+                cols.append(col)
+    return sparse.csr_matrix(
+        (np.ones(len(rows), dtype=float), (rows, cols)),
+        shape=(len(skills_lists), len(skills_vocab)),
+    )
+
+
+def pair_features(X_jobs, user_matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """
+    Features for every (user, job) pair, user-major: row u * n_jobs + j is
+    X_jobs[j] followed by the user's skill incidence row user_matrix[u].
+    """
+    n_jobs = X_jobs.shape[0]
+    n_users = user_matrix.shape[0]
+    return sparse.hstack(
+        [
+            sparse.vstack([sparse.csr_matrix(X_jobs)] * n_users),
+            sparse.kron(user_matrix, np.ones((n_jobs, 1))),
+        ]
+    ).tocsr()
+
+
 def transform_user(
     user_skills: List[str], tfidf: TfidfVectorizer, skills_vocab: List[str]
 ) -> np.ndarray:
@@ -0,0 +1,92 @@
+"""
+Columnar snapshot of the active job catalog.
+
+`manage.py snapshot_catalog` writes active jobs to a compressed Parquet file so
+training can run from a fixed, repeatable copy of the catalog instead of
+reading the production database through the ORM.
+"""
+
+from collections import namedtuple
+from itertools import islice
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+SNAPSHOT_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "required_skills",
+    "experience_level",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+]
+
+SNAPSHOT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("required_skills", pa.list_(pa.string())),
+        ("experience_level", pa.string()),
+        ("salary_min", pa.int64()),
+        ("salary_max", pa.int64()),
+        ("salary_currency", pa.string()),
+    ]
+)
+
+# Rows per Parquet row group; only one group is held in memory at a time
+ROW_GROUP_SIZE = 10000
+
+# Columns train_rf.py needs; everything else is skipped when reading
+TRAINING_COLUMNS = ["id", "description", "required_skills"]
+
+CatalogJob = namedtuple("CatalogJob", TRAINING_COLUMNS)
+
+
+def write_catalog_snapshot(
+    rows, path: str, row_group_size: int = ROW_GROUP_SIZE
+) -> int:
+    """
+    Stream an iterable of SNAPSHOT_COLUMNS tuples to Parquet, one row group
+    per row_group_size rows; returns the row count.
+    """
+    rows = iter(rows)
+    skills = SNAPSHOT_COLUMNS.index("required_skills")
+    count = 0
+    with pq.ParquetWriter(path, SNAPSHOT_SCHEMA, compression="zstd") as writer:
+        while True:
+            chunk = list(islice(rows, row_group_size))
+            if not chunk:
+                break
+            columns = [list(column) for column in zip(*chunk)]
+            columns[skills] = [
+                [str(s) for s in value] if isinstance(value, list) else []
+                for value in columns[skills]
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=SNAPSHOT_SCHEMA))
+            count += len(chunk)
+    return count
+
+
+def read_catalog_snapshot(
+    path: str, columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Read a snapshot, loading only the requested columns."""
+    return pd.read_parquet(path, engine="pyarrow", columns=columns)
+
+
+def load_training_jobs(path: str) -> List[CatalogJob]:
+    """Lightweight job records (id, description, required_skills) for training."""
+    df = read_catalog_snapshot(path, columns=TRAINING_COLUMNS)
+    return [
+        CatalogJob(
+            int(job_id), description or "", list(skills) if skills is not None else []
+        )
+        for job_id, description, skills in zip(
+            df["id"], df["description"], df["required_skills"]
+        )
+    ]
@@ -22,9 +22,19 @@ from jobs.models import Job
 from jobs.ml.features import (
     build_skills_vocab,
     fit_tfidf,
-    transform_job,
     save_vocab,
+    load_vocab,
+    skills_incidence,
+    pair_features,
+    transform_jobs,
 )  # noqa: E402
+from jobs.ml.feature_store import (  # noqa: E402
+    FINGERPRINT_FILENAME,
+    featurizer_fingerprint,
+    get_job_features,
+    save_fingerprint,
+)
+from jobs.ml.snapshot import load_training_jobs  # noqa: E402
 
 
 MODELS_DIR = BASE_DIR / "jobs" / "ml" / "models"
@@ -32,50 +42,95 @@ MODELS_DIR.mkdir(parents=True, exist_ok=True)
 RF_PATH = MODELS_DIR / "rf_model.joblib"
 TFIDF_PATH = MODELS_DIR / "tfidf.joblib"
 VOCAB_PATH = MODELS_DIR / "skills_vocab.json"
-
-
-def generate_labels(jobs, user_skills=None, k: int = 2):
-    """Heuristic labels: 1 if job shares at least k skills with a given user skill set."""
-    if user_skills is None:
-        user_skills = ["python", "django", "rest", "sql", "javascript", "react"]
-    u_set = {s.strip().lower() for s in user_skills}
-    labels = []
-    for job in jobs:
-        j_set = {str(s).strip().lower() for s in (job.required_skills or [])}
-        overlap = len(u_set.intersection(j_set))
-        labels.append(1 if overlap >= k else 0)
-    return np.array(labels, dtype=int)
-
-
-def main():
-    print("Loading jobs from database...")
-    jobs = list(Job.objects.filter(is_active=True))
+FINGERPRINT_PATH = MODELS_DIR / FINGERPRINT_FILENAME
+
+
+# Synthetic user profiles used to label (persona, job) training pairs.
+# Skills must come from COMMON_SKILLS so they are always in the vocabulary.
+SYNTHETIC_PERSONAS = [
+    ["python", "django", "rest", "sql", "javascript", "react"],
+    ["python", "flask", "api", "postgresql", "docker", "git"],
+    ["javascript", "typescript", "react", "next.js", "html", "css"],
+    ["javascript", "angular", "typescript", "html", "css", "rest"],
+    ["javascript", "vue", "nuxt", "html", "css", "git"],
+    ["node.js", "express", "mongodb", "javascript", "api", "graphql"],
+    ["java", "spring", "microservices", "mysql", "rest", "docker"],
+    ["c#", "sql", "azure", "api", "microservices", "agile"],
+    ["php", "mysql", "html", "css", "javascript", "git"],
+    ["ruby", "postgresql", "redis", "rest", "git", "agile"],
+    ["go", "kubernetes", "docker", "microservices", "linux", "redis"],
+    ["aws", "terraform", "docker", "kubernetes", "ci/cd", "linux"],
+    ["azure", "ansible", "jenkins", "ci/cd", "linux", "git"],
+    ["gcp", "kubernetes", "terraform", "python", "linux", "ci/cd"],
+    ["python", "machine learning", "pandas", "numpy", "scikit-learn", "sql"],
+    ["python", "deep learning", "tensorflow", "pytorch", "numpy", "gcp"],
+    ["sql", "postgresql", "oracle", "python", "pandas", "aws"],
+    ["android", "kotlin", "java", "git", "rest", "agile"],
+    ["ios", "swift", "git", "rest", "agile", "scrum"],
+    ["flutter", "react native", "javascript", "android", "ios", "api"],
+    ["c++", "linux", "git", "python", "rust", "agile"],
+    ["agile", "scrum", "jenkins", "git", "sql", "api"],
+]
+
+
+def generate_labels(jobs, skills_vocab, personas=None, k: int = 2):
+    """
+    Heuristic labels for every (persona, job) pair, persona-major.
+    A pair is 1 if the job shares at least k skills with the persona.
+    """
+    if personas is None:
+        personas = SYNTHETIC_PERSONAS
+    job_skills = skills_incidence([j.required_skills or [] for j in jobs], skills_vocab)
+    persona_skills = skills_incidence(personas, skills_vocab)
+    overlap = (persona_skills @ job_skills.T).toarray()
+    return (overlap >= k).astype(int).ravel()
+
+
+def main(reuse_featurizer: bool = False, snapshot: str = None):
+    if snapshot:
+        print(f"Loading jobs from snapshot {snapshot}...")
+        jobs = load_training_jobs(snapshot)
+    else:
+        print("Loading jobs from database...")
+        jobs = list(Job.objects.filter(is_active=True))
     if not jobs:
         print("No jobs found. Import jobs first.")
         return
 
     print(f"Jobs loaded: {len(jobs)}")
-    descriptions = [j.description or "" for j in jobs]
 
-    print("Building skills vocabulary and TF-IDF...")
-    skills_vocab = build_skills_vocab(jobs)
-    tfidf = fit_tfidf(descriptions)
+    if reuse_featurizer and TFIDF_PATH.exists() and VOCAB_PATH.exists():
+        # Keeping the fitted featurizer stable lets the feature store reuse
+        # vectors for every job that did not change since the last run.
+        print("Reusing existing skills vocabulary and TF-IDF...")
+        tfidf = joblib.load(TFIDF_PATH)
+        skills_vocab = load_vocab(str(VOCAB_PATH))
+    else:
+        print("Building skills vocabulary and TF-IDF...")
+        skills_vocab = build_skills_vocab(jobs)
+        tfidf = fit_tfidf([j.description or "" for j in jobs])
 
     print("Transforming jobs to feature matrix...")
-    X = np.vstack(
-        [
-            transform_job(
-                j.description or "", j.required_skills or [], tfidf, skills_vocab
-            )
-            for j in jobs
-        ]
-    )
-    y = generate_labels(jobs)
+    if snapshot:
+        # Stay off the database entirely when training from a snapshot
+        X = transform_jobs(
+            [j.description for j in jobs],
+            [j.required_skills for j in jobs],
+            tfidf,
+            skills_vocab,
+        )
+    else:
+        X, featurized = get_job_features(jobs, tfidf, skills_vocab)
+        print(f"Feature store: {featurized} of {len(jobs)} jobs re-featurized")
+
+    print(f"Labelling {len(SYNTHETIC_PERSONAS)} personas x {len(jobs)} jobs...")
+    X = pair_features(X, skills_incidence(SYNTHETIC_PERSONAS, skills_vocab))
+    y = generate_labels(jobs, skills_vocab)
 
     # Ensure both classes exist; if not, relax threshold
     if len(set(y.tolist())) < 2:
         print("Labels are imbalanced (single class). Lowering threshold k to 1...")
-        y = generate_labels(jobs, k=1)
+        y = generate_labels(jobs, skills_vocab, k=1)
         if len(set(y.tolist())) < 2:
             print("Still single class. Aborting training; need more diverse data.")
             return
@@ -99,10 +154,26 @@ def main():
     joblib.dump(rf, RF_PATH)
     joblib.dump(tfidf, TFIDF_PATH)
     save_vocab(skills_vocab, str(VOCAB_PATH))
+    # Saved last so it is never older than the artifacts it describes
+    save_fingerprint(featurizer_fingerprint(tfidf, skills_vocab), MODELS_DIR)
     print(f"Saved model to {RF_PATH}")
     print(f"Saved tfidf to {TFIDF_PATH}")
     print(f"Saved skills vocab to {VOCAB_PATH}")
+    print(f"Saved featurizer fingerprint to {FINGERPRINT_PATH}")
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the job match Random Forest")
+    parser.add_argument(
+        "--reuse-featurizer",
+        action="store_true",
+        help="Reuse saved TF-IDF/vocab so unchanged jobs keep their cached features",
+    )
+    parser.add_argument(
+        "--snapshot",
+        help="Train from a catalog snapshot (manage.py snapshot_catalog) instead of the database",
+    )
+    args = parser.parse_args()
+    main(reuse_featurizer=args.reuse_featurizer, snapshot=args.snapshot)
@@ -21,6 +21,15 @@ class Job(models.Model):
     salary_currency = models.CharField(max_length=10, default="USD")
     posted_date = models.DateField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    # Set by the importers: stable identity of the posting in
+    # its source (hash of title + company) and a hash of its parsed content
+    source_key = models.CharField(
+        max_length=32, unique=True, null=True, blank=True, editable=False
+    )
+    content_hash = models.CharField(max_length=32, blank=True, editable=False)
+    # Importer that last wrote this job ("titles", "kaggle"); sync mode only
+    # deactivates jobs from the source being synced
+    source = models.CharField(max_length=20, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -100,3 +109,60 @@ class JobApplication(models.Model):
 
     def __str__(self):
         return f"{self.user.username} applied for {self.job.title} - {self.status}"
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Number of source rows an import has already committed, so an
+    interrupted import can resume where it stopped.
+    """
+
+    source = models.CharField(max_length=500, unique=True)
+    offset = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} @ row {self.offset}"
+
+
+class CatalogChange(models.Model):
+    """
+    Log of committed changes to the job catalog. Each entry bumps the
+    catalog version, so indexes and caches can catch up by applying the
+    entries newer than the version they were built from.
+    """
+
+    version = models.BigAutoField(primary_key=True)
+    source = models.CharField(max_length=20, blank=True)
+    inserted_ids = models.JSONField(default=list)
+    updated_ids = models.JSONField(default=list)
+    deactivated_ids = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["version"]
+
+    def __str__(self):
+        return (
+            f"Catalog v{self.version}: +{len(self.inserted_ids)} "
+            f"~{len(self.updated_ids)} -{len(self.deactivated_ids)}"
+        )
+
+
+class JobFeatureVector(models.Model):
+    """
+    Cached ML feature vector for a job.
+    Rows are reused while the job's content hash and the featurizer version
+    both match, so only changed jobs are re-featurized.
+    """
+
+    job = models.OneToOneField(
+        Job, on_delete=models.CASCADE, primary_key=True, related_name="feature_vector"
+    )
+    content_hash = models.CharField(max_length=64)
+    featurizer_version = models.CharField(max_length=64, db_index=True)
+    vector = models.BinaryField()  # Packed sparse vector (see jobs.ml.feature_store)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Features for job {self.job_id} ({self.featurizer_version[:8]})"
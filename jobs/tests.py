@@ -1,3 +1,60 @@
-from django.test import TestCase
+import csv
+import io
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from benchmark_create_dataset import GITHUB_PAGE_SIZE, MUSE_PAGE_SIZE, stub_server
+from create_dataset import create_job_dataset
+
+
+class CreateDatasetTests(SimpleTestCase):
+    """create_dataset against the offline stub of TheMuse and GitHub Jobs."""
+
+    def setUp(self):
+        self.work_dir = Path(tempfile.mkdtemp(prefix="dataset-test-"))
+        self.addCleanup(shutil.rmtree, self.work_dir, ignore_errors=True)
+        self.output = self.work_dir / "job_dataset.csv"
+
+    def create(self, **kwargs):
+        options = {
+            "max_pages": 5,
+            "limit_per_source": None,
+            "filename": str(self.output),
+            "cache_dir": str(self.work_dir / "cache"),
+        }
+        with redirect_stdout(io.StringIO()):
+            return create_job_dataset(**{**options, **kwargs})
+
+    def read_rows(self):
+        with open(self.output, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+
+    def test_fetches_every_page_then_revalidates_from_cache(self):
+        # 3 TheMuse pages and 2.4 GitHub pages, the last one short
+        github_jobs = 2 * GITHUB_PAGE_SIZE + 20
+        expected = 3 * MUSE_PAGE_SIZE + github_jobs
+        with stub_server(latency=0, muse_pages=3, github_jobs=github_jobs) as server:
+            self.assertEqual(self.create(), expected)
+            self.assertEqual(len(self.read_rows()), expected)
+            first_requests = sum(server.take_requests().values())
+            self.assertEqual(server.not_modified, 0)
+
+            # Every page is unchanged: all of them are 304 cache hits
+            self.assertEqual(self.create(), expected)
+            self.assertEqual(sum(server.take_requests().values()), first_requests)
+            self.assertEqual(server.not_modified, first_requests)
+        self.assertEqual(len(self.read_rows()), expected)
+
+    def test_limit_per_source(self):
+        with stub_server(latency=0, muse_pages=3, github_jobs=120) as server:
+            self.assertEqual(self.create(limit_per_source=30, use_cache=False), 60)
+            requests = server.take_requests()
+        # One TheMuse page short of 30 jobs, one GitHub page covers them
+        self.assertEqual(requests, {"/muse": 2, "/github": 1})
+        sources = [row["source"] for row in self.read_rows()]
+        self.assertEqual(sources.count("muse"), 30)
+        self.assertEqual(sources.count("github"), 30)
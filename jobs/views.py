@@ -5,13 +5,13 @@ from django.db.models import Q
 
 from jobs.models import Job, JobApplication
 from accounts.models import UserCV
+from accounts.drafts import session_cv_data
+from accounts.skill_extraction import saved_inferred_skills
 from accounts.email_utils import send_job_application_email
-from pathlib import Path
-import joblib
 import numpy as np
 
-from jobs.ml.features import load_vocab, transform_job
-from django.conf import settings
+from jobs.ml.features import skills_incidence, pair_features
+from jobs.ml.feature_store import get_job_features, load_featurizer, load_model
 
 # Create your views here.
 
@@ -86,17 +86,25 @@ def job_detail(request, job_id):
 
 @login_required
 def job_recommendations(request):
-    """Recommend jobs based on user's CV skills stored in session.
+    """Recommend jobs based on the skills in the user's CV draft.
+    Skills inferred from the CV's free text are added when the draft matches
+    a saved version (they are extracted when the version is saved).
     Uses Random Forest if model artifacts exist, falls back to skill-overlap.
     """
-    cv_data = request.session.get("cv_data")
+    cv_data = session_cv_data(request)
     if not cv_data:
         messages.error(request, "No CV data found. Please build your CV first.")
         return redirect("cv_templates")
 
-    user_skills = [
+    explicit_skills = [
         s.strip().lower() for s in cv_data.get("skills", []) if s and s.strip()
     ]
+    inferred_skills = [
+        s
+        for s in saved_inferred_skills(request.user, cv_data)
+        if s not in explicit_skills
+    ]
+    user_skills = explicit_skills + inferred_skills
     if not user_skills:
         messages.info(
             request,
@@ -120,30 +128,21 @@ def job_recommendations(request):
     rf_scores = {}
 
     try:
-        models_dir = Path(settings.BASE_DIR) / "jobs" / "ml" / "models"
-        rf_path = models_dir / "rf_model.joblib"
-        tfidf_path = models_dir / "tfidf.joblib"
-        vocab_path = models_dir / "skills_vocab.json"
-
-        if rf_path.exists() and tfidf_path.exists() and vocab_path.exists():
-            rf = joblib.load(rf_path)
-            tfidf = joblib.load(tfidf_path)
-            skills_vocab = load_vocab(str(vocab_path))
-
-            # Build feature matrix for candidate jobs
-            import numpy as np
-
-            X_jobs = np.vstack(
-                [
-                    transform_job(
-                        job.description or "",
-                        job.required_skills or [],
-                        tfidf,
-                        skills_vocab,
-                    )
-                    for job in jobs_list
-                ]
+        rf = load_model()
+        featurizer = load_featurizer()
+
+        if rf is not None and featurizer is not None:
+            tfidf, skills_vocab, fingerprint = featurizer
+
+            # Stored vectors for candidate jobs; a GET never writes the store
+            X_jobs, _ = get_job_features(
+                jobs_list, tfidf, skills_vocab, fingerprint, store=False
             )
+            if rf.n_features_in_ == X_jobs.shape[1] + len(skills_vocab):
+                # Model trained on (persona, job) pairs: append the user's skills
+                X_jobs = pair_features(
+                    X_jobs, skills_incidence([user_skills], skills_vocab)
+                )
 
             # Predict probability of being a "good" match
             probs = rf.predict_proba(X_jobs)[:, 1]
@@ -211,7 +210,8 @@ def job_recommendations(request):
 
     context = {
         "recommended": recommended,
-        "user_skills": user_skills,
+        "user_skills": explicit_skills,
+        "inferred_skills": inferred_skills,
     }
     return render(request, "jobs/recommendations.html", context)
 
@@ -0,0 +1,206 @@
+// Autosave for the CV builder: sends only what changed, as JSON Patch
+(function () {
+  "use strict";
+
+  const form = document.querySelector(".cv-builder-form");
+  const draftScript = document.getElementById("cv-draft");
+  if (!form || !form.dataset.autosaveUrl || !draftScript) {
+    return;
+  }
+
+  const url = form.dataset.autosaveUrl;
+  const csrfToken = form.querySelector("[name=csrfmiddlewaretoken]").value;
+  const SECTIONS = [
+    "personal_info",
+    "template_choice",
+    "experience",
+    "education",
+    "skills",
+    "projects",
+  ];
+  const TEMPLATE_SYNTAX = /\{[%#]\s*.*?\s*[%#]\}/g;
+  const DELAY_MS = 1000;
+
+  let revision = parseInt(form.dataset.draftRevision, 10) || 0;
+  let saved = JSON.parse(draftScript.textContent); // what the server has
+  let timer = null;
+  let inFlight = false;
+
+  function values(name) {
+    return Array.from(form.querySelectorAll(`[name="${name}"]`)).map(
+      (el) => el.value
+    );
+  }
+
+  function clean(value) {
+    return (value || "").trim().replace(TEMPLATE_SYNTAX, "");
+  }
+
+  // Rows of a repeated section, shaped like the server's parsing
+  function entries(fields) {
+    const columns = Object.fromEntries(
+      Object.entries(fields).map(([key, name]) => [key, values(name)])
+    );
+    const count = Object.values(columns)[0].length;
+    const rows = [];
+    for (let i = 0; i < count; i++) {
+      const row = {};
+      for (const key of Object.keys(fields)) {
+        row[key] = clean(columns[key][i]);
+      }
+      if (Object.values(row).some(Boolean)) {
+        rows.push(row);
+      }
+    }
+    return rows;
+  }
+
+  function snapshot() {
+    // Trimmed and sanitized, "" when missing, like parse_cv_form
+    const field = (name) => {
+      const el = form.querySelector(`[name="${name}"]`);
+      return clean(el ? el.value : "");
+    };
+    const template = form.querySelector('[name="template_choice"]:checked');
+    const names = values("project_name");
+    const links = values("project_link");
+    const descriptions = values("project_description");
+
+    return {
+      personal_info: {
+        full_name: field("full_name"),
+        email: field("email"),
+        phone: field("phone"),
+        location: field("location"),
+        summary: field("summary"),
+      },
+      template_choice: template ? template.value : saved.template_choice,
+      experience: entries({
+        title: "experience_title",
+        company: "experience_company",
+        location: "experience_location",
+        start: "experience_start",
+        end: "experience_end",
+        description: "experience_description",
+      }),
+      education: entries({
+        degree: "education_degree",
+        institution: "education_institution",
+        location: "education_location",
+        start: "education_start",
+        end: "education_end",
+        details: "education_details",
+      }),
+      skills: values("skills").flatMap((entry) =>
+        entry
+          .split(",")
+          .map((skill) => skill.trim())
+          .filter(Boolean)
+      ),
+      projects: names
+        .map((name, i) => ({
+          name: name,
+          link: links[i] || "",
+          description: descriptions[i] || "",
+        }))
+        .filter((project) => project.name.trim()),
+    };
+  }
+
+  function escapeToken(token) {
+    return String(token).replace(/~/g, "~0").replace(/\//g, "~1");
+  }
+
+  // Same operations as accounts.json_patch.make_patch
+  function diff(before, after, path, ops) {
+    if (JSON.stringify(before) === JSON.stringify(after)) {
+      return ops;
+    }
+    const isObject = (v) => v && typeof v === "object" && !Array.isArray(v);
+    if (isObject(before) && isObject(after)) {
+      for (const key of Object.keys(before)) {
+        if (!(key in after)) {
+          ops.push({ op: "remove", path: `${path}/${escapeToken(key)}` });
+        }
+      }
+      for (const [key, value] of Object.entries(after)) {
+        const child = `${path}/${escapeToken(key)}`;
+        if (!(key in before)) {
+          ops.push({ op: "add", path: child, value: value });
+        } else {
+          diff(before[key], value, child, ops);
+        }
+      }
+    } else if (Array.isArray(before) && Array.isArray(after)) {
+      const common = Math.min(before.length, after.length);
+      for (let i = 0; i < common; i++) {
+        diff(before[i], after[i], `${path}/${i}`, ops);
+      }
+      for (let i = before.length - 1; i >= common; i--) {
+        ops.push({ op: "remove", path: `${path}/${i}` });
+      }
+      for (let i = common; i < after.length; i++) {
+        ops.push({ op: "add", path: `${path}/${i}`, value: after[i] });
+      }
+    } else {
+      ops.push({ op: "replace", path: path, value: after });
+    }
+    return ops;
+  }
+
+  function schedule() {
+    clearTimeout(timer);
+    timer = setTimeout(save, DELAY_MS);
+  }
+
+  function save() {
+    if (inFlight) {
+      schedule();
+      return;
+    }
+    const current = snapshot();
+    const ops = [];
+    for (const section of SECTIONS) {
+      if (section in saved) {
+        diff(saved[section], current[section], `/${section}`, ops);
+      } else {
+        ops.push({ op: "add", path: `/${section}`, value: current[section] });
+      }
+    }
+    if (!ops.length) {
+      return;
+    }
+
+    inFlight = true;
+    fetch(url, {
+      method: "POST",
+      credentials: "same-origin",
+      headers: {
+        "Content-Type": "application/json",
+        "X-CSRFToken": csrfToken,
+      },
+      body: JSON.stringify({ revision: revision, patch: ops }),
+    })
+      .then((response) =>
+        response.json().then((body) => ({ status: response.status, body }))
+      )
+      .then(({ status, body }) => {
+        if (status === 200) {
+          revision = body.revision;
+          saved = Object.assign({}, saved, current);
+        } else if (status === 409) {
+          // Another tab saved first: diff against its version next time
+          revision = body.revision;
+          saved = body.draft;
+          schedule();
+        }
+      })
+      .catch(() => {})
+      .finally(() => {
+        inFlight = false;
+      });
+  }
+
+  form.addEventListener("input", schedule);
+  form.addEventListener("change", schedule);
+})();